@@ -1,11 +1,14 @@
 import streamlit as st
 from auth import check_password, logout
+from telemetry import page_rerun, end_page_rerun
 
 st.set_page_config(page_title="Research Lab Admin", page_icon="🔬", layout="wide")
 
 if not check_password():
     st.stop()  # Do not show anything else if authentication fails
 
+page_rerun("Dashboard")
+
 # Sidebar
 st.sidebar.title("🔬 Research Lab Config")
 st.sidebar.success(f"Logged in as {st.session_state.get('username', 'Admin')}")
@@ -16,64 +19,46 @@ if st.sidebar.button("Logout"):
 
 st.sidebar.divider()
 st.sidebar.markdown("### 🛡️ Data Backup")
-if st.sidebar.button("Download Full Backup"):
-    import shutil
-    import datetime
+backup_mode = st.sidebar.radio("Backup contents", ["Full", "Changes since last backup"], key="backup_mode")
+if st.sidebar.button("Create Backup"):
     import os
-    
-    # Create zip
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"lab_backup_{timestamp}"
-    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    data_dir = os.path.join(root_dir, "data")
-    
-    shutil.make_archive(backup_filename, 'zip', data_dir)
-    
-    with open(f"{backup_filename}.zip", "rb") as f:
-        st.sidebar.download_button(
-            label="⬇️ Click to Save Zip",
-            data=f,
-            file_name=f"{backup_filename}.zip",
-            mime="application/zip"
-        )
-    st.sidebar.success("Backup Ready!")
+    import backup
+
+    # Streamed into the backups folder (LAB_BACKUP_DIR) one file at a time, uploads included
+    try:
+        with st.spinner("Writing backup..."):
+            path, summary = backup.create_backup(incremental=backup_mode != "Full")
+    except Exception as e:
+        st.sidebar.error(f"Backup failed: {e}")
+    else:
+        st.sidebar.success(f"Backup Ready! {summary['kind'].title()}: {summary['packed']} of {summary['files']} files "
+                           f"packed, {summary['archive_bytes'] / 1e6:.1f} MB")
+        st.sidebar.caption(f"Saved to {path}")
+        if summary["kind"] == "incremental":
+            st.sidebar.caption("Restoring it also needs the earlier archives of its chain in the same folder.")
+        if summary["archive_bytes"] <= backup.DOWNLOAD_LIMIT_BYTES:
+            with open(path, "rb") as f:
+                st.sidebar.download_button(
+                    label="⬇️ Click to Save Zip",
+                    data=f,
+                    file_name=os.path.basename(path),
+                    mime="application/zip"
+                )
+        else:
+            st.sidebar.info("Too large to download through the browser; copy it from the server instead.")
 
 # --- Newsletter Generator ---
 st.sidebar.divider()
 if st.sidebar.button("📰 Generate Newsletter"):
     st.sidebar.info("Generating summary...")
     from data_manager import DataLayer
+    from newsletter import generate_newsletter
     db = DataLayer()
-    
-    # Get recent data
-    pubs = db.get_publications()
-    news = db.get_news()
-    projects = db.get_projects()
-    
+
     # Mock logic for "recent"
     current_year = 2024
-    recent_pubs = [p for p in pubs if p.year == current_year]
-    recent_news = [n for n in news if n.publish_date.startswith(str(current_year))]
-    
-    summary = f"""# 📢 SK Lab Quarterly Update ({current_year})
-
-## 🔬 Research Highlights
-We are excited to share our latest progress:
-"""
-    for p in recent_pubs[:3]:
-        summary += f"- **{p.title}** ({p.venue})\n"
-        
-    summary += "\n## 📰 Lab News\n"
-    for n in recent_news[:3]:
-        summary += f"- {n.title} ({n.publish_date})\n"
-        
-    summary += "\n## 🚀 Active Projects\n"
-    active_projs = [p for p in projects if p.status == "Ongoing"]
-    for p in active_projs[:3]:
-        summary += f"- {p.title}\n"
-        
-    summary += "\n---\n*Generated by SK Lab Admin*"
-    
+    summary = generate_newsletter(db, current_year)
+
     with st.expander("📝 Generated Draft (Copy this)", expanded=True):
         st.code(summary, language="markdown")
 
@@ -83,7 +68,6 @@ st.title("Admin Dashboard")
 
 db = DataLayer()
 people = db.get_people()
-projects = db.get_projects()
 pubs = db.get_publications()
 news = db.get_news()
 
@@ -95,7 +79,7 @@ with tab_dash:
     # Stats Row
     c1, c2, c3, c4 = st.columns(4)
     c1.metric("Total People", len(people))
-    c2.metric("Active Projects", len([p for p in projects if p.status == "Ongoing"]))
+    c2.metric("Active Projects", len(db.query_projects(status="Ongoing")))
     c3.metric("Publications", len(pubs))
     c4.metric("News Posts", len(news))
 
@@ -124,12 +108,28 @@ with tab_dash:
     st.divider()
 
     st.subheader("🕵️ Audit Log")
-    logs = db.get_audit_logs()
-    if not logs:
+    import datetime
+
+    f_action, f_range, f_page = st.columns([1, 2, 1])
+    action_filter = f_action.selectbox("Action", ["All"] + db.audit_log.actions())
+    date_range = f_range.date_input("Date range", value=(), key="audit_range")
+
+    action = None if action_filter == "All" else action_filter
+    since = until = None
+    if len(date_range) == 2:
+        since = datetime.datetime.combine(date_range[0], datetime.time.min)
+        until = datetime.datetime.combine(date_range[1], datetime.time.max)
+
+    AUDIT_PAGE_SIZE = 50
+    total_logs = db.count_audit_logs(action=action, since=since, until=until)
+    if not total_logs:
         st.info("No actions recorded yet.")
     else:
-        # Simple table
+        total_pages = (total_logs + AUDIT_PAGE_SIZE - 1) // AUDIT_PAGE_SIZE
+        page = f_page.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1) - 1
+        logs = db.get_audit_logs(page, AUDIT_PAGE_SIZE, action=action, since=since, until=until)
         st.dataframe(logs, use_container_width=True)
+        st.caption(f"{total_logs} entries")
 
 # --- GUIDE TAB ---
 with tab_guide:
@@ -200,3 +200,5 @@ with tab_guide:
     *   **Q: Can I edit the text on the Home Page?**
         *   A: Yes, go to **Lab Info** (`2_Lab_Info`). You can also edit SEO metadata there.
     """)
+
+end_page_rerun()
@@ -0,0 +1,184 @@
+import json
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Each index record points at one log line: byte offset, epoch timestamp, action name.
+INDEX_RECORD = struct.Struct("<Qd16s")
+
+LOG_NAME = "audit_log"
+LEGACY_FILE = "audit_log.json"
+
+_write_lock = threading.Lock()
+
+
+class AuditLog:
+    """
+    Append-only, line-delimited audit log with size-based rotation.
+
+    Entries are appended to `audit_log.jsonl`; a fixed-size binary index
+    (`audit_log.idx`) records where each line starts, when it was written and
+    its action. Paging and filtering only scan the small index and seek to the
+    lines they return, so the log itself is never loaded as a whole.
+    When the active segment grows past `max_bytes` it is rotated to
+    `audit_log.1.jsonl`, `audit_log.2.jsonl`, ... and the oldest segment is
+    dropped, so at most `max_segments` segments (the active one included) exist.
+    """
+
+    def __init__(self, data_dir: str, max_bytes: int = 1024 * 1024, max_segments: int = 5):
+        self.data_dir = data_dir
+        self.max_bytes = max_bytes
+        self.max_segments = max_segments
+        self._migrate_legacy()
+
+    # --- Paths ---
+
+    def _segment_paths(self, n: int):
+        suffix = "" if n == 0 else f".{n}"
+        base = os.path.join(self.data_dir, f"{LOG_NAME}{suffix}")
+        return base + ".jsonl", base + ".idx"
+
+    def _segments(self):
+        """Existing segments, newest first."""
+        for n in range(self.max_segments):
+            log_path, idx_path = self._segment_paths(n)
+            if os.path.exists(idx_path):
+                yield log_path, idx_path
+
+    # --- Writing ---
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive lock for appending and rotating: the thread lock within this
+        process, and the same kind of advisory file lock DataLayer takes on data
+        files across processes, so writers never interleave or rotate under
+        each other.
+        """
+        lock_dir = os.path.join(self.data_dir, ".locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        with _write_lock, open(os.path.join(lock_dir, f"{LOG_NAME}.lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def append(self, action: str, details: str, when: Optional[datetime] = None):
+        when = when or datetime.now()
+        entry = {"timestamp": when.isoformat(), "action": action, "details": details}
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+
+        with self._locked():
+            log_path, idx_path = self._segment_paths(0)
+            if os.path.exists(log_path) and os.path.getsize(log_path) + len(line) > self.max_bytes:
+                self._rotate()
+
+            with open(log_path, "ab") as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write(line)
+            with open(idx_path, "ab") as f:
+                f.write(INDEX_RECORD.pack(offset, when.timestamp(), action.encode("utf-8")[:16]))
+
+    def _rotate(self):
+        # Segment `max_segments` is one that earlier versions kept beyond the limit
+        for n in (self.max_segments - 1, self.max_segments):
+            for path in self._segment_paths(n):
+                if os.path.exists(path):
+                    os.remove(path)
+        for n in range(self.max_segments - 2, -1, -1):
+            for src, dst in zip(self._segment_paths(n), self._segment_paths(n + 1)):
+                if os.path.exists(src):
+                    os.replace(src, dst)
+
+    def _migrate_legacy(self):
+        """Moves entries from the old single-file JSON log into the new format once."""
+        legacy_path = os.path.join(self.data_dir, LEGACY_FILE)
+        if not os.path.exists(legacy_path) or os.path.exists(self._segment_paths(0)[1]):
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            entries = []
+        # The legacy log was stored newest first
+        for entry in reversed(entries):
+            try:
+                when = datetime.fromisoformat(entry["timestamp"])
+            except (KeyError, ValueError):
+                continue
+            self.append(entry.get("action", ""), entry.get("details", ""), when=when)
+        os.replace(legacy_path, legacy_path + ".migrated")
+
+    # --- Reading ---
+
+    def _matching(self, action: Optional[str], since: Optional[datetime], until: Optional[datetime]):
+        """Yields (log_path, offset) for matching entries, newest first, reading only the index."""
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        action_key = action.encode("utf-8")[:16] if action else None
+
+        for log_path, idx_path in self._segments():
+            with open(idx_path, "rb") as f:
+                raw = f.read()
+            count = len(raw) // INDEX_RECORD.size
+            for i in range(count - 1, -1, -1):
+                offset, ts, act = INDEX_RECORD.unpack_from(raw, i * INDEX_RECORD.size)
+                if until_ts is not None and ts > until_ts:
+                    continue
+                if since_ts is not None and ts < since_ts:
+                    # Timestamps only grow, so everything older is out of range too
+                    return
+                if action_key is not None and act.rstrip(b"\0") != action_key:
+                    continue
+                yield log_path, offset
+
+    def count(self, action: Optional[str] = None, since: Optional[datetime] = None,
+              until: Optional[datetime] = None) -> int:
+        return sum(1 for _ in self._matching(action, since, until))
+
+    def page(self, page: int = 0, page_size: int = 50, action: Optional[str] = None,
+             since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Returns one page of entries in reverse-chronological order."""
+        start = page * page_size
+        wanted = []
+        for i, hit in enumerate(self._matching(action, since, until)):
+            if i >= start + page_size:
+                break
+            if i >= start:
+                wanted.append(hit)
+
+        entries = []
+        handles: Dict[str, Any] = {}
+        try:
+            for log_path, offset in wanted:
+                f = handles.get(log_path)
+                if f is None:
+                    f = handles[log_path] = open(log_path, "rb")
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        finally:
+            for f in handles.values():
+                f.close()
+        return entries
+
+    def actions(self) -> List[str]:
+        """Distinct action names present in the log."""
+        seen = set()
+        for _, idx_path in self._segments():
+            with open(idx_path, "rb") as f:
+                raw = f.read()
+            for i in range(len(raw) // INDEX_RECORD.size):
+                seen.add(INDEX_RECORD.unpack_from(raw, i * INDEX_RECORD.size)[2].rstrip(b"\0"))
+        return sorted(a.decode("utf-8") for a in seen)
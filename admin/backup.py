@@ -0,0 +1,285 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+UPLOAD_DIR = os.path.join(ROOT_DIR, "web", "public", "uploads")
+BACKUP_DIR = os.environ.get("LAB_BACKUP_DIR", os.path.join(ROOT_DIR, "backups"))
+
+# Archive prefix -> live directory
+SOURCES = {"data": DATA_DIR, "uploads": UPLOAD_DIR}
+
+MANIFEST_NAME = "manifest.json"
+# The manifest of the newest backup, kept next to the archives; incremental backups diff against it
+LATEST_MANIFEST = "latest_manifest.json"
+# An incremental chain is cut with a new full backup after this many incrementals
+FULL_EVERY = 7
+CHUNK_SIZE = 1024 * 1024
+# The admin only offers archives up to this size as a browser download, which Streamlit holds in memory
+DOWNLOAD_LIMIT_BYTES = int(os.environ.get("LAB_BACKUP_DOWNLOAD_MB", "200")) * 1024 * 1024
+
+# Already compressed; deflating them again costs time for nothing
+STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".pdf", ".zip", ".gz", ".mp4", ".mov", ".zst"}
+SQLITE_EXTENSIONS = {".db", ".sqlite", ".sqlite3"}
+# Lock files, trust marks, half-written temp files and SQLite side files are never backed up
+SKIPPED_SUFFIXES = (".tmp", ".part", "-journal", "-wal", "-shm")
+
+
+def _skipped(name: str) -> bool:
+    return name.startswith(".") or name.endswith(SKIPPED_SUFFIXES)
+
+
+def scan_sources(sources: Optional[Dict[str, str]] = None) -> Dict[str, Tuple[str, os.stat_result]]:
+    """Archive path -> (live path, stat) for every file a backup covers."""
+    found = {}
+    for prefix, root in (sources or SOURCES).items():
+        for dirpath, dirnames, files in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for name in sorted(files):
+                if _skipped(name):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                rel = os.path.relpath(path, root).replace(os.sep, "/")
+                found[f"{prefix}/{rel}"] = (path, st)
+    return found
+
+
+def load_latest_manifest(backup_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(backup_dir or BACKUP_DIR, LATEST_MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class BackupPlan:
+    """
+    What one backup will contain. A full backup packs every file; an incremental
+    one packs only files whose size or mtime differ from the previous backup's
+    manifest and lists the ones that disappeared. Either way the archive's
+    manifest describes the complete state, naming for each file the archive of
+    the chain that holds its content.
+    """
+
+    def __init__(self, name: str, kind: str, parent: Optional[Dict[str, Any]],
+                 files: Dict[str, Tuple[str, os.stat_result]], pack: List[str], deleted: List[str]):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.files = files
+        self.pack = pack
+        self.deleted = deleted
+        # Set by stream_backup once the archive is complete
+        self.manifest: Optional[Dict[str, Any]] = None
+
+    @property
+    def pack_bytes(self) -> int:
+        return sum(self.files[p][1].st_size for p in self.pack)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"name": self.name, "kind": self.kind, "files": len(self.files), "packed": len(self.pack),
+                "packed_bytes": self.pack_bytes, "deleted": len(self.deleted),
+                "parent": self.parent["name"] if self.parent else None}
+
+
+def _chain_intact(manifest: Dict[str, Any], backup_dir: str) -> bool:
+    return all(os.path.exists(os.path.join(backup_dir, name)) for name in manifest.get("chain", []))
+
+
+def plan_backup(incremental: Optional[bool] = None, backup_dir: Optional[str] = None,
+                sources: Optional[Dict[str, str]] = None) -> BackupPlan:
+    """
+    Decides what to pack. `incremental=None` picks incremental when the previous
+    backup's chain is complete on disk and shorter than FULL_EVERY, else full.
+    An explicit incremental=True still falls back to full without a usable base.
+    """
+    backup_dir = backup_dir or BACKUP_DIR
+    files = scan_sources(sources)
+    parent = load_latest_manifest(backup_dir)
+    usable = parent is not None and _chain_intact(parent, backup_dir)
+    if incremental is None:
+        incremental = usable and len(parent.get("chain", [])) <= FULL_EVERY
+    kind = "incremental" if incremental and usable else "full"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    name, n = f"lab_backup_{timestamp}_{kind}.zip", 1
+    while os.path.exists(os.path.join(backup_dir, name)):
+        n += 1
+        name = f"lab_backup_{timestamp}_{n}_{kind}.zip"
+    if kind == "full":
+        return BackupPlan(name, kind, None, files, list(files), [])
+
+    before = parent["files"]
+    pack = [p for p, (_, st) in files.items()
+            if p not in before or before[p]["size"] != st.st_size or before[p]["mtime_ns"] != st.st_mtime_ns]
+    deleted = sorted(before.keys() - files.keys())
+    return BackupPlan(name, kind, parent, files, pack, deleted)
+
+
+class _Pipe(io.RawIOBase):
+    """Write-only, unseekable sink that zipfile streams into; the generator drains it."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.buffered = 0
+        self._offset = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self.buffered += len(b)
+        self._offset += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._offset
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        self.buffered = 0
+        return out
+
+
+def _sqlite_snapshot(path: str) -> str:
+    """A consistent copy of a live SQLite database, in the system temp dir."""
+    fd, tmp = tempfile.mkstemp(prefix="lab-backup-", suffix=".db")
+    os.close(fd)
+    src = sqlite3.connect(path)
+    dst = sqlite3.connect(tmp)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    return tmp
+
+
+def stream_backup(plan: BackupPlan) -> Iterator[bytes]:
+    """
+    Yields the zip archive for `plan` in chunks of about CHUNK_SIZE, reading one
+    file at a time, so memory stays flat however large the uploads are. Content
+    hashes are taken from the bytes as they are packed; the manifest is the last
+    entry. Nothing is written to disk apart from SQLite snapshots in the temp dir.
+    """
+    pipe = _Pipe()
+    entries: Dict[str, Dict[str, Any]] = {}
+    parent_files = plan.parent["files"] if plan.parent else {}
+    packing = set(plan.pack)
+
+    with zipfile.ZipFile(pipe, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for arcname, (path, st) in plan.files.items():
+            if arcname not in packing:
+                entries[arcname] = dict(parent_files[arcname])
+                continue
+            ext = os.path.splitext(arcname)[1].lower()
+            snapshot = _sqlite_snapshot(path) if ext in SQLITE_EXTENSIONS else None
+            # Zip timestamps cannot predate 1980
+            info = zipfile.ZipInfo(arcname, max((1980, 1, 1, 0, 0, 0), datetime.fromtimestamp(st.st_mtime).timetuple()[:6]))
+            info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            digest, size = hashlib.sha256(), 0
+            try:
+                with open(snapshot or path, "rb") as src, zf.open(info, "w", force_zip64=st.st_size > 1 << 30) as out:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        size += len(chunk)
+                        out.write(chunk)
+                        if pipe.buffered >= CHUNK_SIZE:
+                            yield pipe.drain()
+            except FileNotFoundError:
+                # Deleted while the backup ran
+                continue
+            finally:
+                if snapshot:
+                    os.remove(snapshot)
+            entries[arcname] = {"sha256": digest.hexdigest(), "size": size, "mtime_ns": st.st_mtime_ns, "in": plan.name}
+            if pipe.buffered >= CHUNK_SIZE:
+                yield pipe.drain()
+
+        chain = (plan.parent.get("chain", []) if plan.parent else []) + [plan.name]
+        manifest = {
+            "format": 1,
+            "name": plan.name,
+            "kind": plan.kind,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "parent": plan.parent["name"] if plan.parent else None,
+            "chain": chain,
+            "deleted": plan.deleted,
+            "files": entries,
+        }
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+        plan.manifest = manifest
+    yield pipe.drain()
+
+
+def write_backup(plan: BackupPlan, backup_dir: Optional[str] = None) -> str:
+    """
+    Streams the archive into `backup_dir` and, once it is complete, makes its
+    manifest the base of the next incremental backup. Returns the archive path.
+    """
+    backup_dir = backup_dir or BACKUP_DIR
+    os.makedirs(backup_dir, exist_ok=True)
+    path = os.path.join(backup_dir, plan.name)
+    tmp = path + ".part"
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in stream_backup(plan):
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    latest = os.path.join(backup_dir, LATEST_MANIFEST)
+    with open(latest + ".tmp", "w") as f:
+        json.dump(plan.manifest, f)
+    os.replace(latest + ".tmp", latest)
+    return path
+
+
+def create_backup(incremental: Optional[bool] = None, backup_dir: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """Plans and writes one backup; returns its path and summary."""
+    plan = plan_backup(incremental, backup_dir)
+    path = write_backup(plan, backup_dir)
+    return path, {**plan.summary(), "archive_bytes": os.path.getsize(path)}
+
+
+def list_backups(backup_dir: Optional[str] = None) -> List[str]:
+    """Archive names in `backup_dir`, newest first."""
+    backup_dir = backup_dir or BACKUP_DIR
+    try:
+        names = [n for n in os.listdir(backup_dir) if n.startswith("lab_backup_") and n.endswith(".zip")]
+    except FileNotFoundError:
+        return []
+    return sorted(names, reverse=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Back up data/ and the uploads, for example nightly from cron.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--full", dest="incremental", action="store_false", default=None,
+                      help="Pack everything, starting a new chain")
+    mode.add_argument("--incremental", dest="incremental", action="store_true",
+                      help="Pack only what changed since the last backup")
+    parser.add_argument("--dir", default=BACKUP_DIR, help=f"Where archives go (default {BACKUP_DIR}, or LAB_BACKUP_DIR)")
+    args = parser.parse_args()
+
+    path, summary = create_backup(args.incremental, args.dir)
+    print(f"Wrote {path}: {summary['kind']}, {summary['packed']} of {summary['files']} files packed, "
+          f"{summary['deleted']} deleted, {summary['archive_bytes'] / 1e6:.1f} MB")
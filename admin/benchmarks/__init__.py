@@ -0,0 +1,8 @@
+"""
+Benchmarks for the data layer and the admin pages' heavy paths, run on
+synthetic labs of any size. From the admin/ directory:
+
+    python -m benchmarks generate /tmp/lab-full --scale full
+    python -m benchmarks run /tmp/lab-full --out before.json
+    python -m benchmarks compare before.json after.json
+"""
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# Run from admin/, like the app itself, so the data layer modules import as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generate import SCALES, generate_dataset  # noqa: E402
+from benchmarks.suite import BENCHMARKS, compare, run_suite  # noqa: E402
+
+
+def _generate(args):
+    sizes = dict(SCALES[args.scale])
+    for key in sizes:
+        if getattr(args, key) is not None:
+            sizes[key] = getattr(args, key)
+    params = generate_dataset(args.dataset, seed=args.seed, **sizes)
+    print(f"Generated {args.dataset}: {json.dumps(params)}")
+
+
+def _run(args):
+    with tempfile.TemporaryDirectory(prefix="lab-bench-") as work_dir:
+        results = run_suite(args.dataset, work_dir, backend=args.backend, repeat=args.repeat, only=args.only)
+    out = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(out + "\n")
+        print(f"Results written to {args.out}")
+    else:
+        print(out)
+
+
+def _compare(args):
+    with open(args.old, "r") as f:
+        old = json.load(f)
+    with open(args.new, "r") as f:
+        new = json.load(f)
+    if old.get("dataset") != new.get("dataset") or old["meta"].get("backend") != new["meta"].get("backend"):
+        print("Warning: the runs used different datasets or backends; timings are not comparable.")
+
+    rows = compare(old, new, threshold=args.threshold, min_delta=args.min_delta / 1000, stat=args.stat)
+    print(f"{'benchmark':<16} {'old ms':>10} {'new ms':>10} {'change':>8}  status ({args.stat})")
+    for row in rows:
+        old_ms = f"{row['old'] * 1000:.1f}" if row["old"] is not None else "-"
+        new_ms = f"{row['new'] * 1000:.1f}" if row["new"] is not None else "-"
+        change = f"{(row['ratio'] - 1) * 100:+.0f}%" if row["ratio"] is not None else "-"
+        flag = "REGRESSION" if row["status"] == "regression" else row["status"]
+        print(f"{row['name']:<16} {old_ms:>10} {new_ms:>10} {change:>8}  {flag}")
+    regressions = [r["name"] for r in rows if r["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Data layer benchmarks on synthetic labs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Write a deterministic synthetic dataset")
+    gen.add_argument("dataset", help="Output directory")
+    gen.add_argument("--scale", choices=list(SCALES), default="small")
+    gen.add_argument("--seed", type=int, default=0)
+    for key in SCALES["small"]:
+        gen.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int, help=f"Override the number of {key.replace('_', ' ')}")
+    gen.set_defaults(func=_generate)
+
+    run = sub.add_parser("run", help="Run the benchmarks on a generated dataset")
+    run.add_argument("dataset", help="Directory written by generate (left untouched)")
+    run.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Run just these benchmarks")
+    run.add_argument("--out", help="Write the JSON results here instead of stdout")
+    run.set_defaults(func=_run)
+
+    cmp = sub.add_parser("compare", help="Compare two result files; exits 1 on regressions")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that counts as a regression (default 0.10)")
+    cmp.add_argument("--min-delta", type=float, default=2.0, help="Ignore changes smaller than this many ms (default 2)")
+    cmp.add_argument("--stat", choices=["min", "median", "mean"], default="median", help="Statistic to compare (default median)")
+    cmp.set_defaults(func=_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+# Dataset sizes; any of them can be overridden on the command line
+SCALES = {
+    "small": {"publications": 2000, "people": 200, "news": 300, "projects": 50, "import_entries": 500, "orphans": 100},
+    "medium": {"publications": 10000, "people": 600, "news": 1500, "projects": 150, "import_entries": 2000, "orphans": 500},
+    "full": {"publications": 50000, "people": 2000, "news": 5000, "projects": 500, "import_entries": 5000, "orphans": 2000},
+}
+
+GIVEN = ["Ana", "Ben", "Chen", "Divya", "Elif", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kwame", "Lena",
+         "Mateo", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tariq", "Uma", "Victor", "Wen", "Yara", "Zoe"]
+SURNAMES = ["Adams", "Bauer", "Costa", "Dubois", "Eriksen", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+            "Kim", "Lopez", "Moreau", "Nakamura", "Okafor", "Petrov", "Quispe", "Rossi", "Schmidt", "Tanaka",
+            "Usman", "Volkov", "Wang", "Xu", "Yilmaz", "Zhang", "Novak", "Silva", "Kowalski", "Sato"]
+ROLES = [("PhD Student", 40), ("MS Student", 20), ("Postdoc", 10), ("RA", 8), ("Alumni", 15), ("PI", 2), ("Staff", 5)]
+
+ADJECTIVES = ["Scalable", "Robust", "Efficient", "Interpretable", "Adaptive", "Distributed", "Probabilistic",
+              "Self-Supervised", "Federated", "Sparse", "Causal", "Differentiable", "Incremental", "Secure", "Neural"]
+TOPICS = ["Graph Learning", "Protein Folding", "Query Optimization", "Climate Modeling", "Speech Recognition",
+          "Program Synthesis", "Robot Navigation", "Image Segmentation", "Time Series Forecasting", "Drug Discovery",
+          "Code Search", "Recommendation", "Anomaly Detection", "Entity Resolution", "Question Answering"]
+METHODS = ["Transformers", "Diffusion Models", "Contrastive Learning", "Bayesian Inference", "Reinforcement Learning",
+           "Kernel Methods", "Message Passing", "Active Learning", "Knowledge Distillation", "Meta-Learning"]
+VENUES = [("NeurIPS", "inproceedings"), ("ICML", "inproceedings"), ("ICLR", "inproceedings"), ("CVPR", "inproceedings"),
+          ("ACL", "inproceedings"), ("SIGMOD", "inproceedings"), ("KDD", "inproceedings"),
+          ("Nature Communications", "article"), ("Bioinformatics", "article"), ("JMLR", "article"),
+          ("IEEE Transactions on Pattern Analysis and Machine Intelligence", "article"), ("PLOS ONE", "article")]
+TAGS = ["machine-learning", "nlp", "vision", "systems", "biology", "theory", "robotics", "databases", "hci",
+        "security", "graphs", "optimization", "fairness", "climate", "healthcare", "datasets", "benchmark"]
+SENTENCES = [
+    "We propose {method} for {topic} that scales to millions of examples.",
+    "Existing approaches to {topic} rely on hand-tuned heuristics and degrade on out-of-distribution inputs.",
+    "Our analysis shows that {method} recovers the optimal solution under mild assumptions.",
+    "Experiments on five public benchmarks show consistent gains over strong baselines.",
+    "We release code and data to support reproducible research on {topic}.",
+    "A user study with practitioners confirms that the method is easy to adopt.",
+    "We characterize the trade-off between accuracy and compute for {method}.",
+    "Ablations isolate the contribution of each component of the pipeline.",
+]
+NEWS_TITLES = ["{name} joins the lab", "Paper accepted at {venue}", "{name} defends PhD thesis",
+               "New grant for research on {topic}", "Lab retreat {year}", "{name} wins best paper award at {venue}",
+               "Workshop on {topic} announced", "Welcome to our new students"]
+FUNDERS = ["NSF", "NIH", "ERC", "DARPA", "Industry gift", None]
+
+
+def _id(rng: random.Random) -> str:
+    return "%012x" % rng.getrandbits(48)
+
+
+def _weighted(rng: random.Random, options):
+    return rng.choices([o for o, _ in options], weights=[w for _, w in options])[0]
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(GIVEN)} {rng.choice(SURNAMES)}"
+
+
+def _paragraph(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(SENTENCES).format(method=rng.choice(METHODS), topic=rng.choice(TOPICS).lower())
+                    for _ in range(n))
+
+
+def _bibtex(key: str, kind: str, pub: Dict[str, Any], rng: random.Random) -> str:
+    venue_field = "journal" if kind == "article" else "booktitle"
+    authors = " and ".join(a.split(" ", 1)[1] + ", " + a.split(" ", 1)[0] for a in pub["authors"].split(", "))
+    fields = [f"  title = {{{pub['title']}}}", f"  author = {{{authors}}}", f"  {venue_field} = {{{pub['venue']}}}",
+              f"  year = {{{pub['year']}}}", f"  pages = {{{rng.randint(1, 900)}--{rng.randint(901, 1200)}}}"]
+    if kind == "article":
+        fields.append(f"  volume = {{{rng.randint(1, 60)}}}")
+    if pub.get("doi"):
+        fields.append(f"  doi = {{{pub['doi']}}}")
+    return f"@{kind}{{{key},\n" + ",\n".join(fields) + "\n}"
+
+
+def _publication(rng: random.Random, i: int, uploads: List[str]) -> Dict[str, Any]:
+    venue, kind = rng.choice(VENUES)
+    # Skewed towards recent years, like a growing lab
+    year = 2025 - min(int(rng.expovariate(0.15)), 30)
+    title = f"{rng.choice(ADJECTIVES)} {rng.choice(METHODS)} for {rng.choice(TOPICS)}"
+    if rng.random() < 0.5:
+        title += f": {rng.choice(['A Case Study', 'Theory and Practice', 'Revisited', 'at Scale', 'Without Labels'])}"
+    authors = ", ".join(_name(rng) for _ in range(rng.randint(1, 8)))
+    pub: Dict[str, Any] = {
+        "id": _id(rng), "version": 0, "title": title, "authors": authors, "year": year, "venue": venue,
+        "abstract": _paragraph(rng, rng.randint(3, 6)),
+        "tags": rng.sample(TAGS, rng.randint(0, 4)),
+    }
+    if rng.random() < 0.8:
+        pub["doi"] = f"10.{rng.randint(1000, 99999)}/{venue.split()[0].lower()}.{year}.{i}"
+    if rng.random() < 0.3:
+        pub["pdf_link"] = f"/uploads/paper_{i}.pdf"
+        uploads.append(f"paper_{i}.pdf")
+    if rng.random() < 0.2:
+        pub["code_link"] = f"https://github.com/example-lab/project-{i}"
+    if rng.random() < 0.03:
+        pub["visible"] = False
+    pub["bibtex"] = _bibtex(f"{pub['authors'].split(', ')[0].split()[-1].lower()}{year}p{i}", kind, pub, rng)
+    return pub
+
+
+def _person(rng: random.Random, i: int, uploads: List[str]) -> Dict[str, Any]:
+    name = _name(rng)
+    role = _weighted(rng, ROLES)
+    start = rng.randint(2000, 2025)
+    person: Dict[str, Any] = {
+        "id": _id(rng), "version": 0, "name": name, "role": role,
+        "bio": f"{name.split()[0]} works on {rng.choice(TOPICS).lower()} and {rng.choice(TOPICS).lower()}. "
+               + _paragraph(rng, rng.randint(1, 2)),
+        "start_year": start,
+    }
+    if role == "Alumni":
+        person["end_year"] = min(2025, start + rng.randint(1, 6))
+    if rng.random() < 0.8:
+        person["photo"] = f"/uploads/person_{i}.jpg"
+        uploads.append(f"person_{i}.jpg")
+    if rng.random() < 0.7:
+        person["email"] = f"{name.lower().replace(' ', '.')}{i}@cs.stateu.edu"
+    if rng.random() < 0.3:
+        person["personal_website"] = f"https://{name.split()[1].lower()}{i}.github.io/"
+    return person
+
+
+def _news(rng: random.Random, i: int, people: List[Dict[str, Any]], uploads: List[str]) -> Dict[str, Any]:
+    year = rng.randint(2010, 2025)
+    title = rng.choice(NEWS_TITLES).format(name=rng.choice(people)["name"] if people else _name(rng),
+                                           venue=rng.choice(VENUES)[0], topic=rng.choice(TOPICS).lower(), year=year)
+    parts = [f"## {title}", _paragraph(rng, rng.randint(2, 5))]
+    if rng.random() < 0.5:
+        parts.append("\n".join(f"- {rng.choice(ADJECTIVES)} {rng.choice(TOPICS).lower()}" for _ in range(rng.randint(2, 5))))
+    if rng.random() < 0.4:
+        parts.append(f"![{title}](/uploads/news_{i}.jpg)")
+        uploads.append(f"news_{i}.jpg")
+    if rng.random() < 0.3:
+        parts.append(f"Read more in the [full announcement](https://news.stateu.edu/{year}/{i}).")
+    return {
+        "id": _id(rng), "version": 0, "title": title, "content": "\n\n".join(parts),
+        "publish_date": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "featured": rng.random() < 0.05,
+    }
+
+
+def _project(rng: random.Random, i: int, pubs: List[Dict[str, Any]], uploads: List[str]) -> Dict[str, Any]:
+    images = []
+    for k in range(rng.randint(0, 3)):
+        images.append(f"/uploads/project_{i}_{k}.png")
+        uploads.append(f"project_{i}_{k}.png")
+    related = [p.get("doi") or p["title"] for p in rng.sample(pubs, min(len(pubs), rng.randint(0, 5)))]
+    return {
+        "id": _id(rng), "version": 0,
+        "title": f"{rng.choice(ADJECTIVES)} {rng.choice(TOPICS)}",
+        "description": _paragraph(rng, rng.randint(2, 6)),
+        "status": rng.choice(["Ongoing", "Completed"]),
+        "related_publications": related, "images": images,
+        "collaborators": [_name(rng) for _ in range(rng.randint(0, 4))],
+        "funding_source": rng.choice(FUNDERS),
+    }
+
+
+def _import_file(rng: random.Random, pubs: List[Dict[str, Any]], n: int, start: int) -> str:
+    """A .bib upload: mostly new entries, some exact duplicates of stored publications, a few broken ones."""
+    entries = ['@string{lab = "State University Lab"}', "@comment{Exported for the benchmark suite}"]
+    for k in range(n):
+        roll = rng.random()
+        if roll < 0.15 and pubs:
+            entries.append(rng.choice(pubs)["bibtex"])
+        elif roll < 0.18:
+            entries.append(f"@misc{{broken{k},\n  title = {{No year here}},\n  author = {{{_name(rng)}}}\n}}")
+        else:
+            entries.append(_publication(rng, start + k, [])["bibtex"])
+    return "\n\n".join(entries) + "\n"
+
+
+def _write_json(path: str, data: Any):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def generate_dataset(out_dir: str, seed: int = 0, **sizes: int) -> Dict[str, Any]:
+    """
+    Writes a synthetic lab into `out_dir`: data/*.json in the format the DataLayer
+    stores, uploads/ with every referenced file plus some orphans, and import.bib.
+    The same seed and sizes always produce byte-identical files.
+    Returns the parameters, which are also saved as dataset.json.
+    """
+    rng = random.Random(seed)
+    data_dir = os.path.join(out_dir, "data")
+    upload_dir = os.path.join(out_dir, "uploads")
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(upload_dir, exist_ok=True)
+
+    uploads = ["profile.jpg", "lab.jpg"]
+    profile = {
+        "name": "Dr. Sam Rivera", "title": "Professor of Computer Science", "affiliation": "State University",
+        "bio_short": "Sam leads the lab.", "bio_long": _paragraph(rng, 6), "profile_photo": "/uploads/profile.jpg",
+        "email": "sam.rivera@cs.stateu.edu", "google_scholar_url": "https://scholar.google.com/citations?user=abc",
+    }
+    lab_info = {
+        "lab_name": "Synthetic Systems Lab", "mission_statement": _paragraph(rng, 3),
+        "research_focus_areas": rng.sample(TOPICS, 5), "lab_photo": "/uploads/lab.jpg",
+        "join_lab_text": "We are hiring PhD students every year.",
+    }
+    pubs = [_publication(rng, i, uploads) for i in range(sizes["publications"])]
+    people = [_person(rng, i, uploads) for i in range(sizes["people"])]
+    news = [_news(rng, i, people, uploads) for i in range(sizes["news"])]
+    projects = [_project(rng, i, pubs, uploads) for i in range(sizes["projects"])]
+
+    for name, data in (("profile.json", profile), ("lab_info.json", lab_info), ("people.json", people),
+                       ("publications.json", pubs), ("projects.json", projects), ("news.json", news)):
+        _write_json(os.path.join(data_dir, name), data)
+
+    with open(os.path.join(out_dir, "import.bib"), "w") as f:
+        f.write(_import_file(rng, pubs, sizes["import_entries"], sizes["publications"]))
+
+    orphans = [f"orphan_{i}.jpg" for i in range(sizes["orphans"])]
+    for name in uploads + orphans:
+        with open(os.path.join(upload_dir, name), "wb") as f:
+            f.write(name.encode() * 4)
+
+    params = {"seed": seed, **sizes, "uploads": len(uploads) + len(orphans)}
+    _write_json(os.path.join(out_dir, "dataset.json"), params)
+    return params
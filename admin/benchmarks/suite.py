@@ -0,0 +1,283 @@
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Benchmark name -> setup(workspace) returning the function to time; setup itself is not timed
+BENCHMARKS: Dict[str, Callable[["Workspace"], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class Workspace:
+    """
+    A private copy of a generated dataset, brought into the state of a lab that
+    has been using the admin app: every collection saved once through the
+    DataLayer, so trust marks, history and the upload/dedup indexes exist.
+    All benchmarks of a run share it and leave it the same size.
+    """
+
+    def __init__(self, dataset_dir: str, work_dir: str, backend: str = "json"):
+        self.backend = backend
+        self.data_dir = os.path.join(work_dir, "data")
+        self.upload_dir = os.path.join(work_dir, "uploads")
+        self.bib_path = os.path.join(dataset_dir, "import.bib")
+        self.trust_backup = os.path.join(work_dir, "trusted")
+        shutil.copytree(os.path.join(dataset_dir, "data"), self.data_dir)
+        shutil.copytree(os.path.join(dataset_dir, "uploads"), self.upload_dir)
+        if backend == "sqlite":
+            from sqlite_store import import_json
+            import_json(self.data_dir, os.path.join(self.data_dir, "lab.db"))
+
+        db = self.db()
+        db.save_profile(db.get_profile())
+        db.save_lab_info(db.get_lab_info())
+        db.save_people(db.get_people())
+        db.save_publications(db.get_publications())
+        db.save_projects(db.get_projects())
+        db.save_news(db.get_news())
+        db.refs.ensure_built(db)
+        db.dedup.ensure_built(db)
+
+    def db(self):
+        from data_manager import DataLayer
+        return DataLayer(backend=self.backend, data_dir=self.data_dir)
+
+    def cold(self):
+        """Forgets every parsed model, as in a freshly started admin process."""
+        from data_manager import _model_cache
+        _model_cache.invalidate()
+
+    def forget_trust(self):
+        """Moves the trust marks aside, as a restore or hand edit would invalidate them."""
+        os.makedirs(self.trust_backup, exist_ok=True)
+        for path in glob.glob(os.path.join(self.data_dir, ".locks", "*.trusted")):
+            os.replace(path, os.path.join(self.trust_backup, os.path.basename(path)))
+
+    def restore(self):
+        """Undoes forget_trust after a repeat, so later benchmarks see the usual state."""
+        for path in glob.glob(os.path.join(self.trust_backup, "*.trusted")):
+            os.replace(path, os.path.join(self.data_dir, ".locks", os.path.basename(path)))
+
+
+def _load_all(db):
+    db.get_profile()
+    db.get_lab_info()
+    db.get_people()
+    db.get_publications()
+    db.get_projects()
+    db.get_news()
+
+
+@benchmark("load")
+def _load(ws: Workspace):
+    """Every collection from storage into models, data last written by the app."""
+    ws.cold()
+    db = ws.db()
+    return lambda: _load_all(db)
+
+
+@benchmark("load_untrusted")
+def _load_untrusted(ws: Workspace):
+    """The same after a restore or hand edit, when every field is validated again."""
+    ws.cold()
+    ws.forget_trust()
+    db = ws.db()
+    return lambda: _load_all(db)
+
+
+@benchmark("load_cached")
+def _load_cached(ws: Workspace):
+    """What each Streamlit rerun pays once the models are cached."""
+    db = ws.db()
+    _load_all(db)
+    return lambda: _load_all(db)
+
+
+@benchmark("save")
+def _save(ws: Workspace):
+    """Saving the whole publication list, including history, reference and dedup index updates."""
+    ws.cold()
+    db = ws.db()
+    pubs = db.get_publications()
+    version = db.versions["publications.json"]
+    return lambda: db.save_publications(pubs, version)
+
+
+@benchmark("upsert")
+def _upsert(ws: Workspace):
+    """Saving one edited publication from its edit form."""
+    db = ws.db()
+    pub = db.get_publications()[len(db.get_publications()) // 2]
+    title = pub.title[:-len(" (revised)")] if pub.title.endswith(" (revised)") else pub.title + " (revised)"
+    edited = pub.model_copy(update={"title": title})
+    return lambda: db.upsert("publications", edited)
+
+
+@benchmark("bulk_edit")
+def _bulk_edit(ws: Workspace):
+    """The publications spreadsheet: dump, one row in a hundred edited, validate and save."""
+    db = ws.db()
+    pubs = db.get_publications()
+    version = db.versions["publications.json"]
+
+    def run():
+        rows = db.dump_records("publications", pubs, exclude_none=False)
+        for row in rows[::100]:
+            row["abstract"] = row["abstract"][:-len(" Updated.")] if row["abstract"].endswith(" Updated.") else row["abstract"] + " Updated."
+        db.save_publications(db.validate_records("publications", rows, previous=pubs), version)
+    return run
+
+
+@benchmark("bibtex_import")
+def _bibtex_import(ws: Workspace):
+    """Parsing, validating and duplicate-checking an uploaded .bib file, as the import tab does before saving."""
+    from bibtex_import import count_entries, import_bibtex
+    db = ws.db()
+    db.dedup.ensure_built(db)
+    with open(ws.bib_path, "rb") as f:
+        raw = f.read()
+
+    def run():
+        count_entries(raw)
+        lines = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8", errors="replace")
+        for chunk_pubs, _ in import_bibtex(lines):
+            for p in chunk_pubs:
+                record = p.model_dump()
+                if not db.dedup.find(record):
+                    db.dedup.add(record)
+    return run
+
+
+@benchmark("orphan_scan")
+def _orphan_scan(ws: Workspace):
+    """The Media Library's first visit after a restore: index rebuilt from every collection, then every upload checked."""
+    from reference_index import INDEX_FILE, scan_uploads
+    ws.cold()
+    index = os.path.join(ws.data_dir, INDEX_FILE)
+    if os.path.exists(index):
+        os.remove(index)
+    db = ws.db()
+    return lambda: scan_uploads(db, ws.upload_dir)
+
+
+@benchmark("newsletter")
+def _newsletter(ws: Workspace):
+    """The sidebar newsletter draft in a fresh process."""
+    from newsletter import generate_newsletter
+    ws.cold()
+    db = ws.db()
+    return lambda: generate_newsletter(db, 2024)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suite(dataset_dir: str, work_dir: str, backend: str = "json", repeat: int = 5,
+              only: Optional[List[str]] = None, log=print) -> Dict[str, Any]:
+    """
+    Runs the benchmarks on a copy of the dataset in `work_dir` and returns the
+    results as a JSON-ready dict: seconds per repeat plus min/median/mean/stdev.
+    Each benchmark gets one untimed warm-up run first.
+    """
+    import pydantic
+
+    names = only or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}")
+    with open(os.path.join(dataset_dir, "dataset.json"), "r") as f:
+        dataset = json.load(f)
+
+    # Keep the slow-operation log and metrics of the run with the workspace
+    import telemetry
+    telemetry.SLOW_LOG_PATH = os.path.join(work_dir, "slow_ops.log")
+    telemetry.METRICS_PATH = os.path.join(work_dir, "metrics.prom")
+
+    log(f"Preparing workspace in {work_dir} ({backend})...")
+    started = time.perf_counter()
+    ws = Workspace(dataset_dir, work_dir, backend)
+    log(f"Prepared in {time.perf_counter() - started:.1f}s")
+
+    results: Dict[str, Any] = {}
+    for name in names:
+        setup = BENCHMARKS[name]
+        setup(ws)()
+        ws.restore()
+        runs = []
+        for _ in range(repeat):
+            fn = setup(ws)
+            gc.collect()
+            t0 = time.perf_counter()
+            fn()
+            runs.append(time.perf_counter() - t0)
+            ws.restore()
+        results[name] = {
+            "runs": runs,
+            "min": min(runs),
+            "median": statistics.median(runs),
+            "mean": statistics.fmean(runs),
+            "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        }
+        log(f"{name:<16} median {results[name]['median'] * 1000:10.1f} ms   min {results[name]['min'] * 1000:10.1f} ms")
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "pydantic": pydantic.VERSION,
+            "platform": platform.platform(),
+            "backend": backend,
+            "repeat": repeat,
+            "argv": sys.argv[1:],
+        },
+        "dataset": dataset,
+        "results": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10,
+            min_delta: float = 0.002, stat: str = "median") -> List[Dict[str, Any]]:
+    """
+    Per-benchmark comparison of two result files on `stat`. A benchmark is a
+    regression when it got slower by more than `threshold` (a fraction) and by
+    more than `min_delta` seconds, so sub-millisecond noise is never flagged.
+    """
+    rows = []
+    for name in sorted(old["results"].keys() | new["results"].keys()):
+        a, b = old["results"].get(name), new["results"].get(name)
+        if a is None or b is None:
+            rows.append({"name": name, "old": a and a[stat], "new": b and b[stat], "ratio": None,
+                         "status": "added" if a is None else "removed"})
+            continue
+        ratio = b[stat] / a[stat] if a[stat] else float("inf")
+        delta = b[stat] - a[stat]
+        if ratio > 1 + threshold and delta > min_delta:
+            status = "regression"
+        elif ratio < 1 - threshold and -delta > min_delta:
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append({"name": name, "old": a[stat], "new": b[stat], "ratio": ratio, "status": status})
+    return rows
@@ -0,0 +1,242 @@
+import re
+from typing import Iterable, Iterator, List, Optional, Dict, Any
+
+from pydantic import ValidationError
+
+from data_manager import Publication
+
+# Entry types that carry no publication
+SKIPPED_TYPES = {"comment", "preamble", "string"}
+
+MONTHS = {m: str(i) for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+# An entry starts with @type and its opening delimiter, which may follow on the next line
+_START = re.compile(r"@\s*[A-Za-z]+\s*(?:([{(])|$)")
+_NON_SPACE = re.compile(r"\S")
+_HEAD = re.compile(r"@\s*([A-Za-z]+)\s*[{(]\s*([^,\s]*)\s*,?", re.S)
+_NAME = re.compile(r"[A-Za-z0-9_\-:.]+")
+_YEAR = re.compile(r"\d{4}")
+_DELIMITER = re.compile(r'[{}()"]')
+_BRACE = re.compile(r"[{}]")
+_QUOTED = re.compile(r'[{}"]')
+_DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+
+def iter_bibtex_entries(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields the raw text of each entry from a stream of lines, one entry at a time.
+    Only the entry being read is held in memory, so files of any size can be streamed.
+    @comment, @preamble and @string blocks are skipped, as is text between entries,
+    including a stray '@' that does not start an entry (an email address in a comment).
+    An entry still open at the end of the file is yielded as it is, so the import
+    reports it instead of dropping it.
+    """
+    buf: List[str] = []
+    in_entry = False
+    close_char = ""
+    depth = 0
+    in_quotes = False
+
+    for line in lines:
+        i = 0
+        while i < len(line):
+            if not in_entry:
+                at = line.find("@", i)
+                if at < 0:
+                    break
+                m = _START.match(line, at)
+                if not m:
+                    i = at + 1
+                    continue
+                if m.group(1) is None:
+                    # Type at the end of the line; the delimiter should open the next one
+                    buf, in_entry, close_char, depth, in_quotes = [line[at:]], True, "", 0, False
+                    break
+                start = m.start(1)
+                close_char = "}" if line[start] == "{" else ")"
+                depth, in_quotes, in_entry = 0, False, True
+                buf = [line[at:start + 1]]
+                i = start + 1
+                continue
+
+            if not close_char:
+                m = _NON_SPACE.search(line, i)
+                if not m:
+                    buf.append(line[i:])
+                    break
+                if m.group(0) not in "{(":
+                    # Not an entry after all; look for the next one from here
+                    in_entry, buf = False, []
+                    i = m.start()
+                    continue
+                start = m.start()
+                close_char = "}" if line[start] == "{" else ")"
+                buf.append(line[i:start + 1])
+                i = start + 1
+                continue
+
+            seg_start = i
+            done = False
+            # Jump between delimiter characters instead of walking every character
+            for m in _DELIMITER.finditer(line, i):
+                ch = m.group(0)
+                i = m.start()
+                if ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    if depth == 0 and close_char == "}" and not in_quotes:
+                        done = True
+                        break
+                    depth -= 1
+                elif ch == ")" and close_char == ")" and depth == 0 and not in_quotes:
+                    done = True
+                    break
+                elif ch == '"' and depth == 0:
+                    in_quotes = not in_quotes
+
+            if done:
+                buf.append(line[seg_start:i + 1])
+                raw = "".join(buf)
+                in_entry, buf, close_char = False, [], ""
+                m = _HEAD.match(raw)
+                # Anything that does not parse is passed on, to be reported as an error
+                if not m or m.group(1).lower() not in SKIPPED_TYPES:
+                    yield raw
+                i += 1
+            else:
+                buf.append(line[seg_start:])
+                break
+
+    if in_entry and close_char:
+        raw = "".join(buf)
+        m = _HEAD.match(raw)
+        if not m or m.group(1).lower() not in SKIPPED_TYPES:
+            yield raw
+
+
+def _read_value(body: str, i: int) -> tuple:
+    """Reads one field value (braced, quoted, number or macro, joined by #). Returns (value, next_index)."""
+    parts = []
+    n = len(body)
+    while i < n:
+        while i < n and body[i].isspace():
+            i += 1
+        if i >= n:
+            break
+        ch = body[i]
+        if ch == "{":
+            depth, j = 1, n
+            for m in _BRACE.finditer(body, i + 1):
+                depth += 1 if m.group(0) == "{" else -1
+                if depth == 0:
+                    j = m.start()
+                    break
+            parts.append(body[i + 1:j])
+            i = j + 1
+        elif ch == '"':
+            depth, j = 0, n
+            for m in _QUOTED.finditer(body, i + 1):
+                c = m.group(0)
+                if c == '"' and depth == 0:
+                    j = m.start()
+                    break
+                depth += {"{": 1, "}": -1}.get(c, 0)
+            parts.append(body[i + 1:j])
+            i = j + 1
+        else:
+            m = _NAME.match(body, i)
+            if not m:
+                break
+            token = m.group(0)
+            parts.append(MONTHS.get(token.lower(), token))
+            i = m.end()
+        while i < n and body[i].isspace():
+            i += 1
+        if i < n and body[i] == "#":
+            i += 1
+            continue
+        break
+    return "".join(parts), i
+
+
+def parse_entry(raw: str) -> Dict[str, Any]:
+    """Fields of one raw entry, lowercased names, plus ENTRYTYPE and ID."""
+    m = _HEAD.match(raw)
+    if not m:
+        raise ValueError("Not a BibTeX entry")
+    if not raw.endswith(("}", ")")):
+        raise ValueError("Unterminated entry: no closing brace before the end of the file")
+    fields: Dict[str, Any] = {"ENTRYTYPE": m.group(1).lower(), "ID": m.group(2)}
+    body = raw[m.end():-1]
+    i, n = 0, len(body)
+    while i < n:
+        while i < n and (body[i].isspace() or body[i] == ","):
+            i += 1
+        name = _NAME.match(body, i)
+        if not name:
+            break
+        i = name.end()
+        while i < n and body[i].isspace():
+            i += 1
+        if i >= n or body[i] != "=":
+            break
+        value, i = _read_value(body, i + 1)
+        fields[name.group(0).lower()] = value
+    return fields
+
+
+def _clean(text: Optional[str]) -> str:
+    return " ".join((text or "").replace('{', '').replace('}', '').split())
+
+
+def entry_to_publication(raw: str) -> Publication:
+    entry = parse_entry(raw)
+    year_match = _YEAR.search(entry.get('year', ''))
+    if not year_match:
+        raise ValueError(f"missing or invalid year ({entry.get('year', '')!r})")
+
+    doi = _DOI_PREFIX.sub("", entry.get('doi', '').strip()) or None
+    venue = entry.get('journal') or entry.get('booktitle') or "Unknown Venue"
+    return Publication(
+        title=_clean(entry.get('title')) or 'Unknown Title',
+        authors=_clean(entry.get('author')) or 'Unknown Authors',
+        year=int(year_match.group(0)),
+        venue=_clean(venue),
+        abstract=_clean(entry.get('abstract')),
+        doi=doi,
+        bibtex=raw.strip(),  # Only this entry's own source
+        tags=["imported"]
+    )
+
+
+def count_entries(data: bytes) -> int:
+    """Quick estimate of the number of importable entries without parsing them."""
+    return len(re.findall(rb"^\s*@\s*(?!comment|preamble|string)[A-Za-z]+\s*[{(]", data, re.M | re.I))
+
+
+def import_bibtex(lines: Iterable[str], chunk_size: int = 200) -> Iterator[tuple]:
+    """
+    Parses and validates entries in chunks.
+    Yields (publications, errors) per chunk; errors are (entry key, message).
+    """
+    chunk: List[str] = []
+
+    def validate(raws):
+        pubs, errors = [], []
+        for raw in raws:
+            try:
+                pubs.append(entry_to_publication(raw))
+            except (ValidationError, ValueError) as e:
+                key = _HEAD.match(raw)
+                msg = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+                errors.append((key.group(2) if key else raw[:40], msg))
+        return pubs, errors
+
+    for raw in iter_bibtex_entries(lines):
+        chunk.append(raw)
+        if len(chunk) >= chunk_size:
+            yield validate(chunk)
+            chunk = []
+    if chunk:
+        yield validate(chunk)
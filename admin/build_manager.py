@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_DIR = os.path.join(ROOT_DIR, "web")
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+UPLOAD_DIR = os.path.join(WEB_DIR, "public", "uploads")
+STATE_DIR = os.path.join(ROOT_DIR, ".cache", "build")
+MANIFEST_PATH = os.path.join(STATE_DIR, "manifest.json")
+LOG_PATH = os.path.join(STATE_DIR, "build.log")
+
+BUILD_COMMAND = ["npm", "run", "build"]
+
+# The data files the site is built from; admin-only state (indexes, link checks) is left out
+SOURCE_FILES = ("profile.json", "lab_info.json", "people.json", "publications.json", "projects.json", "news.json")
+
+# (path, mtime_ns, size) -> sha256, so unchanged files are only hashed once per process
+_hash_memo: Dict[tuple, str] = {}
+
+
+def _file_hash(path: str) -> str:
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _hash_memo.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = _hash_memo[key] = h.hexdigest()
+    return digest
+
+
+def content_manifest() -> Dict[str, str]:
+    """
+    Relative path -> content hash for everything the site is built from: the
+    data files (their change counters under SQLite) and the uploads. Cheap
+    enough to compare on every click, before any content is exported.
+    """
+    from data_manager import STORAGE_BACKEND, SQLITE_PATH
+    manifest = {}
+    if STORAGE_BACKEND == "sqlite":
+        from sqlite_store import SQLiteStore
+        store = SQLiteStore(SQLITE_PATH)
+        for name in SOURCE_FILES:
+            stamp = store.stamp(name)
+            if stamp is not None:
+                manifest[f"data/{name}"] = f"sqlite:{stamp[0]}"
+    else:
+        for name in SOURCE_FILES:
+            path = os.path.join(DATA_DIR, name)
+            if os.path.exists(path):
+                manifest[f"data/{name}"] = _file_hash(path)
+    for dirpath, _, files in os.walk(UPLOAD_DIR):
+        for name in files:
+            if name.startswith(".") or name.endswith(".part"):
+                continue
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, ROOT_DIR).replace(os.sep, "/")
+            try:
+                manifest[rel] = _file_hash(path)
+            except FileNotFoundError:
+                pass
+    return manifest
+
+
+def diff_manifests(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+    return {
+        "added": sorted(new.keys() - old.keys()),
+        "removed": sorted(old.keys() - new.keys()),
+        "changed": sorted(k for k in new.keys() & old.keys() if new[k] != old[k]),
+    }
+
+
+def load_manifest() -> Dict[str, str]:
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(manifest: Dict[str, str]):
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+class BuildManager:
+    """
+    Runs the website build in a background thread, one at a time.
+
+    A click only compares the content manifest with the last successful
+    build and is skipped when nothing changed. Otherwise the content export
+    (site shards, search and chat indexes) and `npm run build` both run in the
+    background. Clicks while a build runs are coalesced into a single queued
+    build, which starts when the current one ends and re-checks for changes.
+    Output goes to .cache/build/build.log so any page can tail it live.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.proc: Optional[subprocess.Popen] = None
+        self.queued = False
+        self.status = "idle"  # idle / running / succeeded / failed / unchanged
+        # Counts requests that got past the queue, so a page can tell which outcome is the one it asked for
+        self.build_id = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.returncode: Optional[int] = None
+        # What the running (or last) build was started for
+        self.last_changes: Dict[str, List[str]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def pending_changes(self) -> Dict[str, List[str]]:
+        return diff_manifests(load_manifest(), content_manifest())
+
+    def request(self, force: bool = False) -> str:
+        """
+        Asks for a build. Returns "started", "queued" (one is already running;
+        this and any further clicks share one follow-up build) or "unchanged".
+        """
+        with self._lock:
+            if self.running:
+                self.queued = True
+                return "queued"
+            self.status = "running"  # claim the slot before comparing
+            self.build_id += 1
+
+        try:
+            manifest = content_manifest()
+            changes = diff_manifests(load_manifest(), manifest)
+        except Exception:
+            with self._lock:
+                self.status = "failed"
+            raise
+        if not force and not any(changes.values()) and os.path.isdir(os.path.join(WEB_DIR, "out")):
+            with self._lock:
+                self.status = "unchanged"
+            return "unchanged"
+
+        self.last_changes = changes
+        os.makedirs(STATE_DIR, exist_ok=True)
+        self.started_at, self.finished_at, self.returncode = time.time(), None, None
+        threading.Thread(target=self._run, args=(manifest,), daemon=True).start()
+        return "started"
+
+    def _prepare_content(self):
+        """Writes data/*.json from SQLite when that backend is used, then the content shards and indexes."""
+        from data_manager import DataLayer, STORAGE_BACKEND, SQLITE_PATH
+        from site_export import export_site
+        from search_index import build_search_index
+        from chat_index import build_chat_index
+        if STORAGE_BACKEND == "sqlite":
+            from sqlite_store import export_json
+            export_json(SQLITE_PATH, DATA_DIR)
+        db = DataLayer()
+        export_site(db)
+        build_search_index(db)
+        build_chat_index(db)
+
+    def _run(self, manifest: Dict[str, str]):
+        """The build thread: content export, then the site build, both logged to LOG_PATH."""
+        with open(LOG_PATH, "w") as log:
+            try:
+                log.write("Exporting content and search indexes...\n")
+                log.flush()
+                self._prepare_content()
+                log.write("Building the site...\n")
+                log.flush()
+                self.proc = subprocess.Popen(BUILD_COMMAND, cwd=WEB_DIR, stdout=log, stderr=subprocess.STDOUT, text=True)
+                returncode = self.proc.wait()
+            except Exception as e:
+                log.write(f"Error during build: {e}\n")
+                returncode = -1
+        self._finish(returncode, manifest)
+
+    def _finish(self, returncode: int, manifest: Dict[str, str]):
+        if returncode == 0:
+            try:
+                _save_manifest(manifest)
+            except OSError as e:
+                print(f"Saving build manifest failed: {e}")
+        with self._lock:
+            self.returncode = returncode
+            self.finished_at = time.time()
+            self.status = "succeeded" if returncode == 0 else "failed"
+            follow_up, self.queued = self.queued, False
+        if follow_up:
+            try:
+                self.request()
+            except Exception as e:
+                print(f"Queued build failed to start: {e}")
+
+    def log_tail(self, max_chars: int = 20000) -> str:
+        try:
+            with open(LOG_PATH, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - max_chars))
+                return f.read().decode("utf-8", errors="replace")
+        except OSError:
+            return ""
+
+
+_manager: Optional[BuildManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> BuildManager:
+    """The process-wide manager, shared by every session of the admin app."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = BuildManager()
+        return _manager
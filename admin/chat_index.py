@@ -0,0 +1,235 @@
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Any, Tuple
+
+from data_manager import DataLayer
+from search_index import tokenize
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHAT_DIR = os.path.join(ROOT_DIR, "web", "public", "chat")
+
+# Upper bound for the index file; pruning and shorter snippets kick in above it
+BUDGET_BYTES = int(os.environ.get("LAB_CHAT_INDEX_KB", "512")) * 1024
+
+CHUNK_WORDS = 80
+CHUNK_OVERLAP = 20
+K1 = 1.2
+B = 0.75
+
+MAGIC = b"LBM1"
+MAX_CHUNKS = 65535  # chunk ids are stored as uint16
+
+# Tried in order until the file fits the budget: (snippet length, terms kept per chunk).
+# Keeping each chunk's highest-weighted terms (static index pruning) loses little recall;
+# snippet length 0 leaves only the source title and link as the answer.
+DEGRADATION_STEPS = [(snippet, top_k) for snippet in (320, 200, 120, 0) for top_k in (None, 48, 32, 24, 16, 12, 8)]
+
+
+def _words_chunks(text: str) -> List[str]:
+    words = text.split()
+    if len(words) <= CHUNK_WORDS:
+        return [" ".join(words)] if words else []
+    step = CHUNK_WORDS - CHUNK_OVERLAP
+    return [" ".join(words[i:i + CHUNK_WORDS]) for i in range(0, len(words) - CHUNK_OVERLAP, step)]
+
+
+def collect_chunks(db: DataLayer) -> Tuple[List[Tuple[str, str]], List[Tuple[int, str]]]:
+    """
+    Sources [(title, url)] and passages [(source index, text)] of all visible content,
+    long texts split into overlapping windows.
+    """
+    sources: List[Tuple[str, str, str]] = []
+    profile = db.get_profile()
+    sources.append((profile.name, "/profile", f"{profile.name}, {profile.title}, {profile.affiliation}. {profile.bio_long or profile.bio_short}"))
+    lab = db.get_lab_info()
+    sources.append((lab.lab_name, "/lab", f"{lab.mission_statement} Research areas: {', '.join(lab.research_focus_areas)}."))
+    if lab.join_lab_text:
+        sources.append(("Join the lab", "/contact", lab.join_lab_text))
+    for p in db.query_people(visible=True):
+        sources.append((p.name, "/people", f"{p.name} ({p.role}). {p.bio}"))
+    for p in sorted(db.query_publications(visible=True), key=lambda p: p.year, reverse=True):
+        sources.append((p.title, "/publications", f"{p.title}. {p.authors}. {p.venue}, {p.year}. {p.abstract}"))
+    for p in db.query_projects(visible=True):
+        sources.append((p.title, "/projects", f"{p.title} ({p.status}). {p.description}"))
+    for n in sorted(db.query_news(visible=True), key=lambda n: n.publish_date, reverse=True):
+        sources.append((n.title, "/news", f"{n.title} ({n.publish_date}). {n.content}"))
+
+    chunks = []
+    for i, (_, _, text) in enumerate(sources):
+        for passage in _words_chunks(text):
+            chunks.append((i, passage))
+    return [(title, url) for title, url, _ in sources], chunks
+
+
+def fit_chunks(sources, chunks, limit: int = MAX_CHUNKS) -> Tuple[List[Tuple[int, str]], Dict[str, int]]:
+    """
+    Keeps at most `limit` chunks, shared fairly between the site's sections
+    (people, publications, news, ...): sections needing less than an equal share
+    keep everything, the rest split what is left. Within a section the first
+    chunks are kept, which for publications and news are the newest.
+    Returns the kept chunks in their original order and the count dropped per section.
+    """
+    if len(chunks) <= limit:
+        return chunks, {}
+    by_section: Dict[str, List[int]] = {}
+    for i, (src, _) in enumerate(chunks):
+        by_section.setdefault(sources[src][1], []).append(i)
+
+    keep, remaining = set(), limit
+    ordered = sorted(by_section.items(), key=lambda item: len(item[1]))
+    for n, (section, positions) in enumerate(ordered):
+        take = min(len(positions), remaining // (len(ordered) - n))
+        keep.update(positions[:take])
+        remaining -= take
+    dropped = {section: len(positions) - sum(1 for i in positions if i in keep)
+               for section, positions in by_section.items()}
+    return [chunk for i, chunk in enumerate(chunks) if i in keep], {k: v for k, v in dropped.items() if v}
+
+
+def bm25_weights(sources, chunks) -> Dict[str, List[Tuple[int, float]]]:
+    """Term -> [(chunk id, BM25 weight)] with the query-independent part of the score precomputed."""
+    tokenized = [tokenize(f"{sources[src][0]} {text}") for src, text in chunks]
+    n = len(tokenized)
+    avgdl = sum(len(t) for t in tokenized) / max(1, n)
+
+    tf: Dict[str, Dict[int, int]] = {}
+    for cid, tokens in enumerate(tokenized):
+        for term in tokens:
+            row = tf.setdefault(term, {})
+            row[cid] = row.get(cid, 0) + 1
+
+    postings = {}
+    for term, row in tf.items():
+        idf = math.log(1 + (n - len(row) + 0.5) / (len(row) + 0.5))
+        postings[term] = [
+            (cid, idf * f * (K1 + 1) / (f + K1 * (1 - B + B * len(tokenized[cid]) / avgdl)))
+            for cid, f in sorted(row.items())
+        ]
+    return postings
+
+
+def quantize(postings: Dict[str, List[Tuple[int, float]]]) -> Tuple[float, Dict[str, List[Tuple[int, int, int]]]]:
+    """
+    Term -> [(chunk id, weight as 1..255 steps of `scale`, rank of the term within its chunk)],
+    computed once and filtered per degradation step.
+    """
+    top = max((w for rows in postings.values() for _, w in rows), default=1.0)
+    scale = top / 255
+    per_chunk: Dict[int, List[Tuple[float, str]]] = {}
+    for term, rows in postings.items():
+        for cid, w in rows:
+            per_chunk.setdefault(cid, []).append((w, term))
+    rank = {}
+    for cid, entries in per_chunk.items():
+        entries.sort(key=lambda e: (-e[0], e[1]))
+        for r, (_, term) in enumerate(entries):
+            rank[(term, cid)] = r
+    return scale, {term: [(cid, max(1, min(255, round(w / scale))), rank[(term, cid)]) for cid, w in rows]
+                   for term, rows in sorted(postings.items())}
+
+
+def _kept(rows, top_k):
+    return rows if top_k is None else [row for row in rows if row[2] < top_k]
+
+
+def estimate_size(sources, chunks, quantized, snippet_len: int, top_k) -> int:
+    """Close upper bound of the encoded size, so only the chosen step is actually encoded."""
+    size = 64 + sum(len(t.encode("utf-8")) + len(u) + 6 for t, u in sources)
+    size += sum(len(text[:snippet_len].encode("utf-8")) + 10 for _, text in chunks)
+    for term, rows in quantized.items():
+        kept = len(_kept(rows, top_k))
+        if kept:
+            size += len(term.encode("utf-8")) + 3 + 4 + 3 * kept
+    return size
+
+
+def encode(sources, chunks, scale: float, quantized, snippet_len: int, top_k) -> bytes:
+    """
+    Binary layout, little endian:
+        "LBM1", uint32 header length, header JSON (padded to 4 bytes):
+            {"scale", "terms": [...], "sources": [[title, url]], "chunks": [[source, snippet]]}
+        uint32[terms + 1]  posting offsets per term (header["terms"] order)
+        uint16[postings]   chunk ids
+        uint8[postings]    weights quantized to 1..255 (score = weight * scale)
+    """
+    terms, offsets = [], array("I", [0])
+    ids, weights = array("H"), array("B")
+    for term, rows in quantized.items():
+        kept = _kept(rows, top_k)
+        if not kept:
+            continue
+        terms.append(term)
+        for cid, q, _ in kept:
+            ids.append(cid)
+            weights.append(q)
+        offsets.append(len(ids))
+
+    header = json.dumps({
+        "scale": scale,
+        "terms": terms,
+        "sources": [list(s) for s in sources],
+        "chunks": [[src, text[:snippet_len]] for src, text in chunks],
+    }, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    header += b" " * (-len(header) % 4)
+
+    if sys.byteorder == "big":
+        offsets.byteswap()
+        ids.byteswap()
+    return MAGIC + struct.pack("<I", len(header)) + header + offsets.tobytes() + ids.tobytes() + weights.tobytes()
+
+
+def build_chat_index(db: DataLayer, out_dir: str = CHAT_DIR, budget: int = BUDGET_BYTES) -> Dict[str, Any]:
+    """
+    Chunks all visible content, scores it with BM25 and writes index.<hash>.bin.
+    When the file would exceed `budget`, each chunk keeps only its best terms
+    and snippets get shorter, step by step, until it fits.
+    """
+    sources, chunks = collect_chunks(db)
+    chunks, dropped = fit_chunks(sources, chunks)
+    if dropped:
+        print(f"Chat index holds at most {MAX_CHUNKS} passages; left out "
+              + ", ".join(f"{n} from {section}" for section, n in sorted(dropped.items())))
+    scale, quantized = quantize(bm25_weights(sources, chunks))
+
+    for snippet_len, top_k in DEGRADATION_STEPS:
+        if estimate_size(sources, chunks, quantized, snippet_len, top_k) <= budget:
+            break
+    body = encode(sources, chunks, scale, quantized, snippet_len, top_k)
+    if len(body) > budget:
+        print(f"Chat index is {len(body) // 1024} KB, over the {budget // 1024} KB budget even after pruning")
+
+    os.makedirs(out_dir, exist_ok=True)
+    name = f"index.{hashlib.sha256(body).hexdigest()[:10]}.bin"
+    path = os.path.join(out_dir, name)
+    if not os.path.exists(path):
+        with open(path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(path + ".tmp", path)
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({"index": name}, f)
+    for old in os.listdir(out_dir):
+        if old not in (name, "manifest.json"):
+            os.remove(os.path.join(out_dir, old))
+
+    return {"chunks": len(chunks), "terms": len(quantized), "bytes": len(body),
+            "snippet_len": snippet_len, "top_k": top_k, "dropped": dropped}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the chat widget's BM25 retrieval index.")
+    parser.add_argument("--out", default=CHAT_DIR)
+    parser.add_argument("--budget-kb", type=int, default=BUDGET_BYTES // 1024)
+    args = parser.parse_args()
+
+    summary = build_chat_index(DataLayer(), args.out, args.budget_kb * 1024)
+    print(f"Chat index: {summary['chunks']} chunks, {summary['terms']} terms, {summary['bytes'] // 1024} KB "
+          f"(snippets {summary['snippet_len']} chars, terms per chunk {summary['top_k'] or 'all'})")
+    if summary["dropped"]:
+        print(f"Left out {sum(summary['dropped'].values())} passages over the {MAX_CHUNKS} limit")
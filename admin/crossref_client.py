@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, Optional, Dict, Any
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(ROOT_DIR, ".cache", "crossref")
+
+# Overridable so tests and offline setups can point at a stand-in server.
+CROSSREF_URL = os.environ.get("LAB_CROSSREF_URL", "https://api.crossref.org")
+
+ATTEMPTS = 3
+FOUND_TTL = 30 * 24 * 3600
+NOT_FOUND_TTL = 24 * 3600
+
+_DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def normalize_doi(raw: str) -> str:
+    """Bare, lowercase DOI from a DOI, doi: prefix or doi.org URL."""
+    return _DOI_PREFIX.sub("", raw.strip()).strip().lower()
+
+
+def parse_work(data: Dict[str, Any], doi: str) -> Dict[str, Any]:
+    """Maps a CrossRef `message` to the Publication fields we import."""
+    title = (data.get('title') or [''])[0]
+
+    authors_list = data.get('author', [])
+    authors = ", ".join([f"{a.get('given', '')} {a.get('family', '')}".strip() for a in authors_list])
+
+    year = 2024
+    for key in ('published-print', 'published-online', 'issued', 'created'):
+        parts = data.get(key, {}).get('date-parts') or [[None]]
+        if parts[0] and parts[0][0]:
+            year = parts[0][0]
+            break
+
+    venue = (data.get('container-title') or [''])[0]
+    abstract = _TAGS.sub("", data.get('abstract', '')).strip()
+
+    return {
+        "title": title,
+        "authors": authors,
+        "year": int(year),
+        "venue": venue,
+        "abstract": abstract,
+        "doi": doi,
+        "tags": []
+    }
+
+
+class CrossRefCache:
+    """Normalized CrossRef responses on disk, one small JSON file per DOI, with a TTL."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, doi: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(doi.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, doi: str) -> Optional[Dict[str, Any]]:
+        """Cached entry {"meta": dict|None, "fetched_at": ts} if still fresh; misses cached too."""
+        try:
+            with open(self._path(doi), "r") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        ttl = FOUND_TTL if entry.get("meta") else NOT_FOUND_TTL
+        if time.time() - entry.get("fetched_at", 0) > ttl:
+            return None
+        return entry
+
+    def put(self, doi: str, meta: Optional[Dict[str, Any]]):
+        path = self._path(doi)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"doi": doi, "meta": meta, "fetched_at": time.time()}, f)
+        os.replace(tmp, path)
+
+
+class CrossRefClient:
+    """
+    CrossRef lookups with a pooled session, bounded parallelism and an on-disk cache.
+    `fetch_many` yields results as they complete so the page can show partial results.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_workers: int = 6, timeout: float = 10.0,
+                 cache: Optional[CrossRefCache] = None):
+        self.base_url = (base_url or CROSSREF_URL).rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache or CrossRefCache()
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "SK-Lab-Admin/1.0 (publication import)"
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, raw_doi: str) -> Dict[str, Any]:
+        """Returns {"doi", "meta", "error", "cached"} for one DOI."""
+        doi = normalize_doi(raw_doi)
+        if not doi.startswith("10."):
+            return {"doi": doi, "meta": None, "error": "Not a DOI", "cached": False}
+
+        entry = self.cache.get(doi)
+        if entry is not None:
+            error = None if entry["meta"] else "Not found"
+            return {"doi": doi, "meta": entry["meta"], "error": error, "cached": True}
+
+        # DOIs may contain "#", "?" or "%", which would otherwise end or alter the path
+        url = f"{self.base_url}/works/{quote(doi, safe='/')}"
+        for attempt in range(ATTEMPTS):
+            try:
+                r = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                return {"doi": doi, "meta": None, "error": f"Connection error ({type(e).__name__})", "cached": False}
+            if (r.status_code == 429 or r.status_code >= 500) and attempt < ATTEMPTS - 1:
+                time.sleep(0.5 * (2 ** attempt))
+                continue
+            break
+
+        if r.status_code == 404:
+            self.cache.put(doi, None)
+            return {"doi": doi, "meta": None, "error": "Not found", "cached": False}
+        if r.status_code != 200:
+            return {"doi": doi, "meta": None, "error": f"HTTP {r.status_code}", "cached": False}
+
+        try:
+            meta = parse_work(r.json()['message'], doi)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return {"doi": doi, "meta": None, "error": f"Malformed response ({type(e).__name__})", "cached": False}
+        self.cache.put(doi, meta)
+        return {"doi": doi, "meta": meta, "error": None, "cached": False}
+
+    def fetch_many(self, dois: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yields one result per distinct DOI; a failed lookup is reported, never ends the batch."""
+        unique = list(dict.fromkeys(normalize_doi(d) for d in dois if d.strip()))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch, doi): doi for doi in unique}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {"doi": futures[future], "meta": None, "error": f"Lookup failed ({e})", "cached": False}
+
+    def close(self):
+        self.session.close()
@@ -1,12 +1,46 @@
+import hashlib
 import json
 import os
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, EmailStr, HttpUrl, Field, ValidationError, field_validator
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from typing import Annotated, List, Optional, Dict, Any, Tuple
+from pydantic import (AfterValidator, BaseModel, HttpUrl, Field, TypeAdapter, ValidationError,
+                      ValidationInfo, field_validator)
+from pydantic.networks import validate_email
+from pydantic_core import to_json
+
+from audit_log import AuditLog
+from history_store import HistoryStore
+from reference_index import ReferenceIndex
+from dedup_index import DedupIndex
+from telemetry import instrument, span
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover threads of this process
+    fcntl = None
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 
+# Storage engine: "json" (data/*.json, the default) or "sqlite" (data/lab.db).
+# The website always reads the JSON files; with SQLite run `python admin/sqlite_store.py export` before building.
+STORAGE_BACKEND = os.environ.get("LAB_STORAGE_BACKEND", "json")
+SQLITE_PATH = os.environ.get("LAB_SQLITE_PATH", os.path.join(DATA_DIR, "lab.db"))
+
 # --- Pydantic Models ---
 
+def _trusted(info: ValidationInfo) -> bool:
+    """True while loading data this layer wrote itself; the checks below were applied when it was saved."""
+    return bool(info.context and info.context.get("trusted"))
+
+def _check_email(value: str, info: ValidationInfo) -> str:
+    return value if _trusted(info) else validate_email(value)[1]
+
+# EmailStr that trusted loads skip; email-validator is most of the cost of loading people
+Email = Annotated[str, AfterValidator(_check_email)]
+
 class ProfessorProfile(BaseModel):
     name: str
     title: str
@@ -14,7 +48,7 @@ class ProfessorProfile(BaseModel):
     bio_short: str
     bio_long: str
     profile_photo: Optional[str] = None
-    email: EmailStr
+    email: Email
     google_scholar_url: Optional[HttpUrl] = None
     orcid: Optional[str] = None
     twitter_url: Optional[HttpUrl] = None
@@ -32,7 +66,38 @@ class LabInfo(BaseModel):
     seo_description: Optional[str] = "A leading research group."
     seo_keywords: Optional[str] = "research, science, lab"
 
-class Person(BaseModel):
+def new_record_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+def fill_record_ids(filename: str, data: List[Dict[str, Any]]) -> bool:
+    """
+    Gives records saved before records had ids (or pasted twice in a bulk edit)
+    an id derived from position and content, so every process that backfills
+    the same data agrees. Returns True when anything changed.
+    """
+    seen, changed = set(), False
+    for pos, item in enumerate(data):
+        if not item.get("id") or item["id"] in seen:
+            body = json.dumps({k: v for k, v in item.items() if k != "id"}, sort_keys=True)
+            item["id"] = hashlib.sha1(f"{filename}:{pos}:{body}".encode("utf-8")).hexdigest()[:12]
+            changed = True
+        seen.add(item["id"])
+    return changed
+
+class Record(BaseModel):
+    """
+    Base of the list collections; `id` stays the same across edits and reorders.
+    `version` counts saves of the record and is what upsert() compares against.
+    """
+    id: str = Field(default_factory=new_record_id)
+    version: int = 0
+
+    @field_validator('id', mode='before')
+    def id_or_new(cls, v):
+        # Rows added in the bulk editors come without one
+        return v or new_record_id()
+
+class Person(Record):
     name: str
     role: str 
     bio: str
@@ -40,10 +105,10 @@ class Person(BaseModel):
     start_year: int
     end_year: Optional[int] = None
     personal_website: Optional[HttpUrl] = None
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     visible: bool = True
 
-class Publication(BaseModel):
+class Publication(Record):
     title: str
     authors: str 
     year: int
@@ -57,20 +122,22 @@ class Publication(BaseModel):
     visible: bool = True
 
     @field_validator('year')
-    def year_must_be_realistic(cls, v):
-        if v < 1900 or v > 2100:
+    def year_must_be_realistic(cls, v, info: ValidationInfo):
+        if not _trusted(info) and (v < 1900 or v > 2100):
             raise ValueError('Year must be between 1900 and 2100')
         return v
     
     @field_validator('doi')
-    def doi_format(cls, v):
+    def doi_format(cls, v, info: ValidationInfo):
+        if _trusted(info):
+            return v
         if v and not v.strip():
             return None 
         if v and not v.startswith('10.'):
              raise ValueError('DOI must start with 10.')
         return v
 
-class Project(BaseModel):
+class Project(Record):
     title: str
     description: str
     status: str 
@@ -81,12 +148,12 @@ class Project(BaseModel):
     visible: bool = True
 
     @field_validator('status')
-    def status_must_be_valid(cls, v):
-        if v not in ["Ongoing", "Completed"]:
+    def status_must_be_valid(cls, v, info: ValidationInfo):
+        if not _trusted(info) and v not in ["Ongoing", "Completed"]:
             raise ValueError('Status must be Ongoing or Completed')
         return v
 
-class NewsItem(BaseModel):
+class NewsItem(Record):
     title: str
     content: str 
     publish_date: str 
@@ -94,143 +161,630 @@ class NewsItem(BaseModel):
     visible: bool = True
 
     @field_validator('publish_date')
-    def date_must_be_iso(cls, v):
-        from datetime import date
+    def date_must_be_iso(cls, v, info: ValidationInfo):
+        if _trusted(info):
+            return v
         try:
             date.fromisoformat(v)
         except ValueError:
             raise ValueError('Date must be in YYYY-MM-DD format')
         return v
 
+# Collection name -> (file, model) for the record-level API
+COLLECTIONS = {
+    "people": ("people.json", Person),
+    "publications": ("publications.json", Publication),
+    "projects": ("projects.json", Project),
+    "news": ("news.json", NewsItem),
+}
+COLLECTION_FILES = {filename for filename, _ in COLLECTIONS.values()}
+
+# Whole-list validation and serialization in one call each, instead of a Python loop over rows
+_ADAPTERS = {name: TypeAdapter(List[model]) for name, (_, model) in COLLECTIONS.items()}
+
+class ConflictError(Exception):
+    """A save was based on data that someone else changed after it was loaded."""
+
+def _carry_versions(old: List[Dict[str, Any]], new: List[Dict[str, Any]]):
+    """Sets record versions for a whole-collection save: stored version, plus one where the record changed."""
+    stored = {item.get("id"): item for item in old}
+    for item in new:
+        prev = stored.get(item.get("id"))
+        if prev is None:
+            continue
+        base = prev.get("version", 0)
+        item["version"] = base
+        if item != prev:
+            item["version"] = base + 1
+
+# --- Model Cache ---
+
+class ModelCache:
+    """
+    Process-wide cache of validated models, keyed by file path and (mtime, size).
+    Streamlit reruns every page from the top, so without this each click re-parses
+    and re-validates every JSON file. An entry is only reused while the file on disk
+    is unchanged, and writes through the DataLayer drop it eagerly.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, stamp: Optional[tuple]) -> Any:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, path: str, stamp: Optional[tuple], value: Any):
+        with self._lock:
+            self._entries[path] = (stamp, value)
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+_model_cache = ModelCache()
+
+# Names of the data files whose lock the current thread holds
+_held_locks = threading.local()
+# Stand-in for fcntl locks where it is unavailable
+_fallback_locks: Dict[str, threading.Lock] = {}
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters of the shared model cache."""
+    return _model_cache.stats()
+
 # --- Data Layer ---
 
+# Every method is timed (see telemetry.py), except trivial path helpers and the lock,
+# whose wait is timed inside it
+@instrument("DataLayer", skip=("_get_path", "_cache_key", "_file_stamp", "_trust_path", "_locked"))
 class DataLayer:
-    def __init__(self):
-        self.data_dir = DATA_DIR
+    def __init__(self, backend: Optional[str] = None, data_dir: Optional[str] = None):
+        self.data_dir = data_dir or DATA_DIR
+        self.lock_dir = os.path.join(self.data_dir, ".locks")
         os.makedirs(self.data_dir, exist_ok=True)
+        # filename -> version of the data this instance last loaded or saved
+        self.versions: Dict[str, str] = {}
+        self.audit_log = AuditLog(self.data_dir)
+        self.history = HistoryStore(self.data_dir)
+        self.refs = ReferenceIndex(self.data_dir)
+        self.dedup = DedupIndex(self.data_dir)
+
+        self.backend = backend or STORAGE_BACKEND
+        self.sql = None
+        if self.backend == "sqlite":
+            from sqlite_store import SQLiteStore
+            self.sql = SQLiteStore(os.path.join(data_dir, "lab.db") if data_dir else SQLITE_PATH)
 
     def _get_path(self, filename: str) -> str:
         return os.path.join(self.data_dir, filename)
 
+    def _cache_key(self, filename: str) -> str:
+        if self.sql is not None:
+            return f"{self.sql.db_path}:{filename}"
+        return self._get_path(filename)
+
+    def _data_stamp(self, filename: str) -> Optional[tuple]:
+        if self.sql is not None:
+            return self.sql.stamp(filename)
+        return self._file_stamp(self._get_path(filename))
+
+    def _read(self, filename: str, default: Any) -> Tuple[Any, str]:
+        """Data and its version: a hash of the file under JSON, the change counter under SQLite."""
+        if self.sql is not None:
+            return self.sql.read_versioned(filename, default)
+        try:
+            with open(self._get_path(filename), "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return default, ""
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        try:
+            with span("DataLayer.json_parse"):
+                return json.loads(raw), version
+        except json.JSONDecodeError:
+            return default, version
+
     def _load_json(self, filename: str, default: Any):
-        path = self._get_path(filename)
-        if not os.path.exists(path):
-            return default
-        with open(path, "r") as f:
+        return self._read(filename, default)[0]
+
+    def _file_stamp(self, path: str) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        # Saves replace the file, so the inode tells apart writes within one mtime tick
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @contextmanager
+    def _locked(self, filename: str):
+        """
+        Exclusive advisory lock on one data file, held while a save reads,
+        checks and rewrites it. Every process writing through a DataLayer takes
+        it, so saves to the same collection run one at a time. Re-entrant
+        within a thread.
+        """
+        held = _held_locks.__dict__.setdefault("names", set())
+        if filename in held:
+            yield
+            return
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with open(os.path.join(self.lock_dir, f"{filename}.lock"), "a") as f:
+            with span("DataLayer.lock_wait"):
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                else:
+                    _fallback_locks.setdefault(filename, threading.Lock()).acquire()
+            held.add(filename)
             try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return default
+                yield
+            finally:
+                held.discard(filename)
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    _fallback_locks[filename].release()
+
+    def _trust_path(self, filename: str) -> str:
+        return os.path.join(self.lock_dir, f"{filename}.trusted")
+
+    def _is_trusted(self, filename: str, version: str) -> bool:
+        """
+        Whether the data at `version` was last written by this layer from validated
+        models, so loading it can skip the per-field checks. Any other writer
+        (a restore, a hand edit, a git pull) changes the version and loses the mark.
+        """
+        if not version:
+            return False
+        try:
+            with open(self._trust_path(filename), "r") as f:
+                return f.read() == version
+        except OSError:
+            return False
+
+    def _mark_trusted(self, filename: str, version: Optional[str]):
+        """Records (or with None, clears) the trusted version; call with the file's lock held."""
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            with open(self._trust_path(filename), "w") as f:
+                f.write(version or "")
+        except OSError as e:
+            print(f"Saving trust mark failed: {e}")
+
+    def _sql_trusted(self, filename: str) -> bool:
+        stamp = self.sql.stamp(filename)
+        return stamp is not None and self._is_trusted(filename, str(stamp[0]))
+
+    def _load_models(self, filename: str, default: Any, parse):
+        """
+        Loads and validates a file through the shared cache.
+        The stamp is taken before reading, so a concurrent write can only make
+        the entry look stale, never serve old data under a new stamp.
+        Cached models are shared between sessions; treat them as read-only.
+        """
+        key = self._cache_key(filename)
+        stamp = self._data_stamp(filename)
+        cached = _model_cache.get(key, stamp)
+        if cached is None:
+            data, version = self._read(filename, default)
+            self.versions[filename] = version
+            # parse() may rewrite the file (id backfill) and update the version
+            trusted = self._is_trusted(filename, version)
+            with span("DataLayer.validate"):
+                models = parse(data, trusted)
+            cached = (models, self.versions[filename])
+            _model_cache.put(key, stamp, cached)
+        models, self.versions[filename] = cached
+        return list(models) if isinstance(models, list) else models
 
     def _backup_json(self, filename: str, data: Any):
-        """Creates a timestamped backup of the data."""
-        from datetime import datetime
-        history_dir = os.path.join(self.data_dir, "history", filename.split('.')[0])
-        os.makedirs(history_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"{timestamp}_{filename}"
-        backup_path = os.path.join(history_dir, backup_filename)
-        
-        with open(backup_path, "w") as f:
-            json.dump(data, f, indent=2)
+        """Records a new version of the data in the content-addressed history."""
+        self.history.record(filename.split('.')[0], data)
 
     def log_action(self, action: str, details: str):
-        from datetime import datetime
-        log_file = self._get_path("audit_log.json")
-        logs = []
-        if os.path.exists(log_file):
-            with open(log_file, "r") as f:
-                try:
-                    logs = json.load(f)
-                except:
-                    pass
-        
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "action": action,
-            "details": details
-        }
-        logs.insert(0, entry) # Prepend
-        # Keep last 1000 logs
-        logs = logs[:1000]
-        
-        with open(log_file, "w") as f:
-            json.dump(logs, f, indent=2)
-
-    def get_audit_logs(self):
-        return self._load_json("audit_log.json", [])
-
-    def _save_json(self, filename: str, data: Any):
-        # First save the live file
-        path = self._get_path(filename)
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
-            
+        self.audit_log.append(action, details)
+
+    def get_audit_logs(self, page: int = 0, page_size: int = 50, action: Optional[str] = None,
+                       since=None, until=None) -> List[Dict[str, Any]]:
+        """One page of audit entries, newest first."""
+        return self.audit_log.page(page, page_size, action=action, since=since, until=until)
+
+    def count_audit_logs(self, action: Optional[str] = None, since=None, until=None) -> int:
+        return self.audit_log.count(action=action, since=since, until=until)
+
+    def _write_data(self, filename: str, data: Any, trusted: bool = False) -> str:
+        """
+        Writes the data (call with the file's lock held) and returns its new version.
+        `trusted`: the data was dumped from validated models, so the next load may skip validation.
+        """
+        if filename in COLLECTION_FILES:
+            fill_record_ids(filename, data)
+        if self.sql is not None:
+            version = self.sql.write(filename, data)
+        else:
+            # Write a temp file and rename it over the old one, so readers never see half a file
+            path = self._get_path(filename)
+            # pydantic_core's encoder; json.dumps falls back to pure Python when indenting
+            with span("DataLayer.serialize"):
+                body = to_json(data, indent=2)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+            version = hashlib.sha256(body).hexdigest()[:16]
+        _model_cache.invalidate(self._cache_key(filename))
+        self._mark_trusted(filename, version if trusted else None)
+        self.versions[filename] = version
+        return version
+
+    def _save_json(self, filename: str, data: Any, expected_version: Optional[str] = None,
+                   trusted: bool = False) -> str:
+        """
+        Saves a whole file. With `expected_version` (see `versions`) this is a
+        compare-and-swap: it raises ConflictError instead of overwriting a
+        version it was not based on.
+        """
+        with self._locked(filename):
+            current, version = self._read(filename, None)
+            if expected_version is not None and expected_version != version:
+                raise ConflictError(f"{filename} was changed by someone else after it was loaded")
+            if filename in COLLECTION_FILES and current:
+                _carry_versions(current, data)
+            # First save the live data
+            version = self._write_data(filename, data, trusted)
+            self._after_save(filename, data)
+        return version
+
+    def _after_save(self, filename: str, data: Any):
         # Then create a backup
         try:
             self._backup_json(filename, data)
         except Exception as e:
             print(f"Backup failed: {e}")
 
+        # Keep the upload reference index in step with the saved collection
+        try:
+            with span("ReferenceIndex.update"):
+                self.refs.update(filename, data)
+        except Exception as e:
+            print(f"Reference index update failed: {e}")
+
+        # Publication duplicate index only recomputes signatures for new or edited rows
+        if filename == "publications.json":
+            try:
+                with span("DedupIndex.update"):
+                    self.dedup.update(data)
+            except Exception as e:
+                print(f"Dedup index update failed: {e}")
+
+    def _after_change(self, collection: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                      data: Optional[List[Dict[str, Any]]] = None):
+        """
+        Like _after_save for a single-record write: `old` is the record as stored
+        before (None when added), `new` as saved (None when deleted). History and
+        indexes only process that record. `data`, the whole collection, is used
+        when the history has to fall back to a full version; under SQLite it is
+        only read then.
+        """
+        filename, _ = COLLECTIONS[collection]
+        name = filename.split('.')[0]
+        try:
+            count = len(data) if data is not None else None
+            if self.history.record_change(name, old, new, count) is None:
+                if data is None:
+                    data = self.dump_records(collection, self._load_collection(collection))
+                self._backup_json(filename, data)
+        except Exception as e:
+            print(f"Backup failed: {e}")
+
+        try:
+            with span("ReferenceIndex.change"):
+                self.refs.change(filename, old, new)
+        except Exception as e:
+            print(f"Reference index update failed: {e}")
+
+        if filename == "publications.json":
+            try:
+                with span("DedupIndex.change"):
+                    self.dedup.change(added=[new] if new is not None else [],
+                                      removed=[old] if old is not None else [])
+            except Exception as e:
+                print(f"Dedup index update failed: {e}")
+
+    def _load_collection(self, collection: str) -> List[Record]:
+        filename, model = COLLECTIONS[collection]
+
+        def parse(data, trusted):
+            if not trusted and fill_record_ids(filename, data):
+                # Persist backfilled ids once, so they stay stable
+                try:
+                    with self._locked(filename):
+                        current, _ = self._read(filename, [])
+                        if fill_record_ids(filename, current):
+                            self._write_data(filename, current)
+                        data = current
+                except Exception as e:
+                    print(f"Saving record ids failed: {e}")
+            return _ADAPTERS[collection].validate_python(data, context={"trusted": trusted})
+
+        return self._load_models(filename, [], parse)
+
+    def dump_records(self, collection: str, records: List[Record], exclude_none: bool = True) -> List[Dict[str, Any]]:
+        """JSON-ready dicts for a list of records, serialized in one call."""
+        return _ADAPTERS[collection].dump_python(records, mode="json", exclude_none=exclude_none)
+
+    def validate_records(self, collection: str, rows: List[Dict[str, Any]],
+                         previous: Optional[List[Record]] = None) -> List[Record]:
+        """
+        Validates rows edited as a table (the Bulk Edit tabs). Rows identical to
+        the dump of the record with the same id in `previous` reuse that record;
+        the rest are validated together in one call.
+        """
+        models: List[Optional[Record]] = [None] * len(rows)
+        todo = list(range(len(rows)))
+        if previous:
+            before = dict(zip((r.id for r in previous), zip(previous, self.dump_records(collection, previous, exclude_none=False))))
+            todo = []
+            for i, row in enumerate(rows):
+                hit = before.get(row.get("id"))
+                if hit is not None and hit[1] == row:
+                    models[i] = hit[0]
+                else:
+                    todo.append(i)
+        try:
+            validated = _ADAPTERS[collection].validate_python([rows[i] for i in todo])
+        except ValidationError as e:
+            first = e.errors()[0]
+            row = todo[first["loc"][0]] + 1 if first["loc"] else "?"
+            raise ValueError(f"Row {row}, {'.'.join(str(p) for p in first['loc'][1:])}: {first['msg']}") from e
+        for i, model in zip(todo, validated):
+            models[i] = model
+        return models
+
     # --- Profile ---
     def get_profile(self) -> ProfessorProfile:
-        data = self._load_json("profile.json", {})
-        try:
-            return ProfessorProfile(**data)
-        except ValidationError:
-             return ProfessorProfile(
-                 name="", title="", affiliation="", bio_short="", bio_long="", email="user@example.com"
-             )
-
-    def save_profile(self, profile: ProfessorProfile):
-        self._save_json("profile.json", profile.dict(exclude_none=True))
+        def parse(data, trusted):
+            try:
+                return ProfessorProfile.model_validate(data, context={"trusted": trusted})
+            except ValidationError:
+                return ProfessorProfile(
+                    name="", title="", affiliation="", bio_short="", bio_long="", email="user@example.com"
+                )
+        return self._load_models("profile.json", {}, parse)
+
+    def save_profile(self, profile: ProfessorProfile, expected_version: Optional[str] = None):
+        self._save_json("profile.json", profile.model_dump(mode="json", exclude_none=True), expected_version, trusted=True)
         self.log_action("UPDATE", "Updated Profile")
 
     # --- Lab Info ---
     def get_lab_info(self) -> LabInfo:
-        data = self._load_json("lab_info.json", {})
-        try:
-            return LabInfo(**data)
-        except ValidationError:
-            return LabInfo(lab_name="", mission_statement="", join_lab_text="")
+        def parse(data, trusted):
+            try:
+                return LabInfo.model_validate(data, context={"trusted": trusted})
+            except ValidationError:
+                return LabInfo(lab_name="", mission_statement="", join_lab_text="")
+        return self._load_models("lab_info.json", {}, parse)
 
-    def save_lab_info(self, info: LabInfo):
-        self._save_json("lab_info.json", info.dict(exclude_none=True))
+    def save_lab_info(self, info: LabInfo, expected_version: Optional[str] = None):
+        self._save_json("lab_info.json", info.model_dump(mode="json", exclude_none=True), expected_version, trusted=True)
         self.log_action("UPDATE", "Updated Lab Info")
 
     # --- People ---
     def get_people(self) -> List[Person]:
-        data = self._load_json("people.json", [])
-        return [Person(**item) for item in data]
+        return self._load_collection("people")
 
-    def save_people(self, people: List[Person]):
-        self._save_json("people.json", [p.dict(exclude_none=True) for p in people])
+    def save_people(self, people: List[Person], expected_version: Optional[str] = None):
+        self._save_json("people.json", self.dump_records("people", people), expected_version, trusted=True)
         self.log_action("UPDATE", f"Updated People List ({len(people)} entries)")
 
     # --- Publications ---
     def get_publications(self) -> List[Publication]:
-        data = self._load_json("publications.json", [])
-        return [Publication(**item) for item in data]
+        return self._load_collection("publications")
 
-    def save_publications(self, pubs: List[Publication]):
-        self._save_json("publications.json", [p.dict(exclude_none=True) for p in pubs])
+    def save_publications(self, pubs: List[Publication], expected_version: Optional[str] = None):
+        self._save_json("publications.json", self.dump_records("publications", pubs), expected_version, trusted=True)
         self.log_action("UPDATE", f"Updated Publications List ({len(pubs)} entries)")
     
     # --- Projects ---
     def get_projects(self) -> List[Project]:
-        data = self._load_json("projects.json", [])
-        return [Project(**item) for item in data]
+        return self._load_collection("projects")
 
-    def save_projects(self, projects: List[Project]):
-        self._save_json("projects.json", [p.dict(exclude_none=True) for p in projects])
+    def save_projects(self, projects: List[Project], expected_version: Optional[str] = None):
+        self._save_json("projects.json", self.dump_records("projects", projects), expected_version, trusted=True)
         self.log_action("UPDATE", f"Updated Projects List ({len(projects)} entries)")
 
     # --- News ---
     def get_news(self) -> List[NewsItem]:
-        data = self._load_json("news.json", [])
-        return [NewsItem(**item) for item in data]
+        return self._load_collection("news")
 
-    def save_news(self, news: List[NewsItem]):
-        self._save_json("news.json", [n.dict(exclude_none=True) for n in news])
+    def save_news(self, news: List[NewsItem], expected_version: Optional[str] = None):
+        self._save_json("news.json", self.dump_records("news", news), expected_version, trusted=True)
         self.log_action("UPDATE", f"Updated News List ({len(news)} entries)")
+
+    # --- History ---
+    def restore_version(self, name: str, snapshot_id: str, expected_version: Optional[str] = None) -> str:
+        """
+        Makes a version from the history the current data. `name` is the file's stem
+        ("people", "lab_info", ...). Saved like any edit: under the file's lock,
+        checked against `expected_version`, with record versions carried forward.
+        """
+        filename = f"{name}.json"
+        data = self.history.load(name, snapshot_id)
+        if data is None:
+            raise ValueError(f"No version {snapshot_id} of {name} in the history")
+        version = self._save_json(filename, data, expected_version)
+        self.log_action("RESTORE", f"Restored {name} to version {snapshot_id}")
+        return version
+
+    # --- Records ---
+    # Single-record reads and writes by id, under the collection's lock and
+    # checked against the record's version. Under SQLite they touch one row;
+    # the JSON engine still rewrites the collection's file.
+
+    def get_by_id(self, collection: str, record_id: str) -> Optional[Record]:
+        filename, model = COLLECTIONS[collection]
+        if self.sql is not None:
+            data = self.sql.get(filename, record_id)
+            return model(**data) if data is not None else None
+        return next((r for r in self._load_collection(collection) if r.id == record_id), None)
+
+    def _check_version(self, collection: str, record_id: str, stored: Optional[Dict[str, Any]], expected: int):
+        if stored is None and expected > 0:
+            raise ConflictError(f"{collection} record {record_id} was deleted by someone else")
+        if stored is not None and stored.get("version", 0) != expected:
+            raise ConflictError(f"{collection} record {record_id} was changed by someone else "
+                                f"(version {stored.get('version', 0)}, edit based on {expected})")
+
+    def upsert(self, collection: str, record: Record) -> bool:
+        """
+        Replaces the record with the same id in place, or appends it. Returns True when it was new.
+        `record.version` must be the version the edit started from; if the stored
+        record has moved on (or was deleted) this raises ConflictError.
+        """
+        filename, _ = COLLECTIONS[collection]
+        with self._locked(filename):
+            if self.sql is not None:
+                # Only the one row is read and written; the collection is never dumped
+                stored = self.sql.get(filename, record.id)
+                records = None
+                trusted = self._sql_trusted(filename)
+            else:
+                records, version = self._read(filename, [])
+                trusted = self._is_trusted(filename, version)
+                stored = next((r for r in records if r.get("id") == record.id), None)
+            self._check_version(collection, record.id, stored, record.version)
+
+            item = record.model_copy(update={"version": record.version + 1}).model_dump(mode="json", exclude_none=True)
+
+            # The rest of the collection stays trusted only if it was before
+            if self.sql is not None:
+                self.versions[filename] = self.sql.upsert(filename, item)
+                _model_cache.invalidate(self._cache_key(filename))
+                self._mark_trusted(filename, self.versions[filename] if trusted else None)
+            else:
+                pos = next((i for i, r in enumerate(records) if r.get("id") == record.id), None)
+                if pos is None:
+                    records.append(item)
+                else:
+                    records[pos] = item
+                self._write_data(filename, records, trusted)
+            self._after_change(collection, stored, item, records)
+        action, verb = ("CREATE", "Added") if stored is None else ("UPDATE", "Updated")
+        self.log_action(action, f"{verb} {collection} record {record.id}")
+        return stored is None
+
+    def delete(self, collection: str, record_id: str, expected_version: Optional[int] = None) -> bool:
+        """
+        Removes the record with this id. Returns False when there was none.
+        With `expected_version`, raises ConflictError if the record changed since.
+        """
+        filename, _ = COLLECTIONS[collection]
+        with self._locked(filename):
+            if self.sql is not None:
+                stored = self.sql.get(filename, record_id)
+                records = None
+                trusted = self._sql_trusted(filename)
+            else:
+                records, version = self._read(filename, [])
+                trusted = self._is_trusted(filename, version)
+                stored = next((r for r in records if r.get("id") == record_id), None)
+            if stored is None:
+                return False
+            if expected_version is not None:
+                self._check_version(collection, record_id, stored, expected_version)
+
+            if self.sql is not None:
+                self.versions[filename] = self.sql.delete(filename, record_id)
+                _model_cache.invalidate(self._cache_key(filename))
+                self._mark_trusted(filename, self.versions[filename] if trusted else None)
+                kept = None
+            else:
+                kept = [r for r in records if r.get("id") != record_id]
+                self._write_data(filename, kept, trusted)
+            self._after_change(collection, stored, None, kept)
+        self.log_action("DELETE", f"Deleted {collection} record {record_id}")
+        return True
+
+    # --- Queries ---
+    # Filtered reads backed by indexed columns under SQLite, and by the cached
+    # model lists under the JSON engine. Results keep collection order.
+
+    def query_people(self, role: Optional[str] = None, exclude_role: Optional[str] = None,
+                     visible: Optional[bool] = None) -> List[Person]:
+        if self.sql is None:
+            return [p for p in self.get_people()
+                    if (role is None or p.role == role)
+                    and (exclude_role is None or p.role != exclude_role)
+                    and (visible is None or p.visible == visible)]
+        where, params = [], []
+        if role is not None:
+            where.append("role = ?"); params.append(role)
+        if exclude_role is not None:
+            where.append("role != ?"); params.append(exclude_role)
+        if visible is not None:
+            where.append("visible = ?"); params.append(int(visible))
+        rows = self.sql.query("people.json", where, params)
+        return _ADAPTERS["people"].validate_python(rows, context={"trusted": self._sql_trusted("people.json")})
+
+    def query_publications(self, year: Optional[int] = None, tag: Optional[str] = None,
+                           visible: Optional[bool] = None) -> List[Publication]:
+        if self.sql is None:
+            return [p for p in self.get_publications()
+                    if (year is None or p.year == year)
+                    and (tag is None or tag in p.tags)
+                    and (visible is None or p.visible == visible)]
+        where, params = [], []
+        if year is not None:
+            where.append("year = ?"); params.append(year)
+        if tag is not None:
+            where.append("publication_tags.tag = ?"); params.append(tag)
+        if visible is not None:
+            where.append("visible = ?"); params.append(int(visible))
+        rows = self.sql.query("publications.json", where, params, join_tags=tag is not None)
+        return _ADAPTERS["publications"].validate_python(rows, context={"trusted": self._sql_trusted("publications.json")})
+
+    def query_projects(self, status: Optional[str] = None, visible: Optional[bool] = None) -> List[Project]:
+        if self.sql is None:
+            return [p for p in self.get_projects()
+                    if (status is None or p.status == status)
+                    and (visible is None or p.visible == visible)]
+        where, params = [], []
+        if status is not None:
+            where.append("status = ?"); params.append(status)
+        if visible is not None:
+            where.append("visible = ?"); params.append(int(visible))
+        rows = self.sql.query("projects.json", where, params)
+        return _ADAPTERS["projects"].validate_python(rows, context={"trusted": self._sql_trusted("projects.json")})
+
+    def query_news(self, since: Optional[str] = None, until: Optional[str] = None,
+                   visible: Optional[bool] = None) -> List[NewsItem]:
+        """News with since <= publish_date <= until (ISO date strings)."""
+        if self.sql is None:
+            return [n for n in self.get_news()
+                    if (since is None or n.publish_date >= since)
+                    and (until is None or n.publish_date <= until)
+                    and (visible is None or n.visible == visible)]
+        where, params = [], []
+        if since is not None:
+            where.append("publish_date >= ?"); params.append(since)
+        if until is not None:
+            where.append("publish_date <= ?"); params.append(until)
+        if visible is not None:
+            where.append("visible = ?"); params.append(int(visible))
+        rows = self.sql.query("news.json", where, params)
+        return _ADAPTERS["news"].validate_python(rows, context={"trusted": self._sql_trusted("news.json")})
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import zlib
+from typing import List, Optional, Dict, Any
+
+INDEX_FILE = "dedup_index.json"
+
+# MinHash/LSH parameters: 32 hashes in 8 bands of 4 rows puts the LSH threshold
+# around a Jaccard similarity of 0.6, which catches preprint vs published titles.
+NUM_HASHES = 32
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+SIMILARITY_THRESHOLD = 0.6
+# The change log is folded into the base file once it is larger than this and half the base
+COMPACT_MIN_BYTES = 256 * 1024
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+_DOI_PREFIX = re.compile(r"^(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+
+_lock = threading.Lock()
+_states: Dict[str, Dict[str, Any]] = {}
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    if not doi:
+        return None
+    return _DOI_PREFIX.sub("", doi.strip()).lower() or None
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", (title or "").lower()).split())
+
+
+def _surnames(authors: str) -> List[str]:
+    """Rough family names from "A. Smith, B. Jones" or "Smith, A. and Jones, B."."""
+    names = []
+    for part in re.split(r"\band\b|;|,(?=\s*[A-Z][a-z]+\s+[A-Z])", authors or ""):
+        words = normalize_title(part).split()
+        if words:
+            names.append(words[0] if "," in part else words[-1])
+    return names
+
+
+def shingles(title: str, authors: str) -> set:
+    """Character 4-grams of the title plus author surnames."""
+    t = normalize_title(title).replace(" ", "_")
+    grams = {t[i:i + 4] for i in range(max(1, len(t) - 3))}
+    grams.update(f"@{name}" for name in _surnames(authors))
+    return grams
+
+
+def minhash(grams: set) -> List[int]:
+    hashed = [zlib.crc32(g.encode("utf-8")) for g in grams] or [0]
+    return [min((a * h + b) % _PRIME for h in hashed) for a, b in _PERMUTATIONS]
+
+
+def fingerprint(record: Dict[str, Any]) -> str:
+    key = "|".join([normalize_title(record.get("title", "")), record.get("authors", "") or "",
+                    str(record.get("year", "")), normalize_doi(record.get("doi")) or ""])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def merge_publications(existing, incoming):
+    """Fills empty fields of `existing` from `incoming` and unions the tags."""
+    updates = {}
+    for field in ("abstract", "doi", "pdf_link", "code_link", "bibtex", "venue"):
+        if not getattr(existing, field) and getattr(incoming, field):
+            updates[field] = getattr(incoming, field)
+    tags = list(dict.fromkeys([*existing.tags, *incoming.tags]))
+    if tags != existing.tags:
+        updates["tags"] = tags
+    return existing.model_copy(update=updates)
+
+
+class DedupIndex:
+    """
+    Duplicate and near-duplicate lookup for publications.
+
+    Three layers, all answered from dictionaries: normalized DOI, exact
+    normalized-title hash, and MinHash/LSH buckets over title 4-grams and
+    author surnames for near duplicates (preprint vs published version).
+    Signatures are keyed by a record fingerprint, with a count of the records
+    sharing it. They persist as a compacted base file, data/dedup_index.json,
+    plus an append-only log of changed fingerprints, so a save writes only what
+    it changed and readers replay only the lines appended since they last looked.
+    Writers hold the publications.json lock, as every DataLayer save does.
+    """
+
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, INDEX_FILE)
+        self._state = _states.setdefault(self.path, {"stamp": None, "generation": 0, "offset": 0, "records": {}})
+        # Records added during one import, visible to this instance only
+        self._local = {"records": {}, "by_doi": {}, "by_title": {}, "buckets": {}}
+
+    # --- Persistence ---
+
+    def _log_path(self, generation: int) -> str:
+        return f"{os.path.splitext(self.path)[0]}.{generation}.log"
+
+    def _load(self):
+        """Catches up with the files: rereads the base after a compaction, else only new log lines."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            # Not built yet; only a first build's log may exist
+            if self._state["stamp"] is not None:
+                self._state.update(stamp=None, generation=0, offset=0, records={})
+                self._rebuild_maps()
+            self._replay()
+            return
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp != self._state["stamp"]:
+            try:
+                with open(self.path, "r") as f:
+                    base = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                base = {}
+            self._state.update(stamp=stamp, generation=base.get("generation", 0), offset=0,
+                               records=base.get("records", {}))
+            self._rebuild_maps()
+        self._replay()
+
+    def _replay(self):
+        try:
+            with open(self._log_path(self._state["generation"]), "rb") as f:
+                f.seek(self._state["offset"])
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        # A line still being written is picked up next time
+        end = raw.rfind(b"\n") + 1
+        if not end:
+            return
+        if "buckets" not in self._state:
+            self._rebuild_maps()
+        for line in raw[:end].splitlines():
+            fp, delta, rec = json.loads(line)
+            self._apply(fp, delta, rec)
+        self._state["offset"] += end
+
+    def _apply(self, fp: str, delta: int, rec: Optional[Dict[str, Any]]):
+        """Applies one log entry: `delta` more (or fewer) records with fingerprint `fp`."""
+        records = self._state["records"]
+        current = records.get(fp)
+        count = (current.get("n", 1) if current else 0) + delta
+        if count <= 0:
+            if current is not None:
+                del records[fp]
+                self._remove_from_maps(fp, current)
+        elif current is not None:
+            current["n"] = count
+        elif rec is not None:
+            records[fp] = dict(rec, n=count)
+            self._add_to_maps(fp, records[fp], self._state["by_doi"], self._state["by_title"], self._state["buckets"])
+
+    def _append(self, ops: List[list]):
+        """Writes log entries and applies them; compacts once the log outgrows half the base."""
+        if not ops:
+            return
+        lines = "".join(json.dumps(op, separators=(",", ":")) + "\n" for op in ops).encode("utf-8")
+        log_path = self._log_path(self._state["generation"])
+        with open(log_path, "ab") as f:
+            f.write(lines)
+        self._load()
+        base_bytes = self._state["stamp"][1] if self._state["stamp"] else 0
+        if os.path.getsize(log_path) > max(COMPACT_MIN_BYTES, base_bytes // 2):
+            self._compact()
+
+    def _compact(self):
+        """Folds the log into a new base; the next generation starts with an empty log."""
+        old_log = self._log_path(self._state["generation"])
+        generation = self._state["generation"] + 1
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"generation": generation, "records": self._state["records"]}, f)
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._state.update(stamp=(st.st_mtime_ns, st.st_size, st.st_ino), generation=generation, offset=0)
+        for path in (old_log, self._log_path(generation)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _rebuild_maps(self):
+        by_doi: Dict[str, List[str]] = {}
+        by_title: Dict[str, List[str]] = {}
+        buckets: Dict[str, List[str]] = {}
+        for fp, rec in self._state["records"].items():
+            self._add_to_maps(fp, rec, by_doi, by_title, buckets)
+        self._state.update(by_doi=by_doi, by_title=by_title, buckets=buckets)
+
+    @staticmethod
+    def _band_keys(sig: List[int]) -> List[str]:
+        return [f"{b}:{hash(tuple(sig[b * ROWS:(b + 1) * ROWS]))}" for b in range(BANDS)]
+
+    def _add_to_maps(self, fp, rec, by_doi, by_title, buckets):
+        if rec.get("doi"):
+            by_doi.setdefault(rec["doi"], []).append(fp)
+        by_title.setdefault(rec["title_hash"], []).append(fp)
+        for key in self._band_keys(rec["sig"]):
+            buckets.setdefault(key, []).append(fp)
+
+    def _remove_from_maps(self, fp, rec):
+        state = self._state
+        for index, key in ([(state["by_doi"], rec.get("doi")), (state["by_title"], rec["title_hash"])]
+                           + [(state["buckets"], k) for k in self._band_keys(rec["sig"])]):
+            fps = index.get(key)
+            if fps and fp in fps:
+                fps.remove(fp)
+                if not fps:
+                    del index[key]
+
+    @staticmethod
+    def _entry(record: Dict[str, Any]) -> Dict[str, Any]:
+        title = normalize_title(record.get("title", ""))
+        return {
+            "doi": normalize_doi(record.get("doi")),
+            "title_hash": hashlib.sha1(title.encode("utf-8")).hexdigest()[:16],
+            "sig": minhash(shingles(record.get("title", ""), record.get("authors", ""))),
+            "label": f"[{record.get('year', '')}] {record.get('title', '')}",
+        }
+
+    def update(self, data: List[Dict[str, Any]]):
+        """Syncs the index with a whole saved publication list, logging only the fingerprints that changed."""
+        with _lock:
+            self._load()
+            wanted: Dict[str, int] = {}
+            by_fp: Dict[str, Dict[str, Any]] = {}
+            for record in data:
+                fp = fingerprint(record)
+                wanted[fp] = wanted.get(fp, 0) + 1
+                by_fp.setdefault(fp, record)
+            records = self._state["records"]
+            ops = []
+            for fp in wanted.keys() | records.keys():
+                have = records[fp].get("n", 1) if fp in records else 0
+                delta = wanted.get(fp, 0) - have
+                if delta:
+                    ops.append([fp, delta, None if fp in records else self._entry(by_fp[fp])])
+            self._append(ops)
+            if not os.path.exists(self.path):
+                self._compact()
+
+    def change(self, added: List[Dict[str, Any]] = (), removed: List[Dict[str, Any]] = ()):
+        """Updates the index for single records: `removed` as they were stored, `added` as saved now."""
+        deltas: Dict[str, int] = {}
+        for record in removed:
+            fp = fingerprint(record)
+            deltas[fp] = deltas.get(fp, 0) - 1
+        new = {}
+        for record in added:
+            fp = fingerprint(record)
+            deltas[fp] = deltas.get(fp, 0) + 1
+            new.setdefault(fp, record)
+        with _lock:
+            self._load()
+            records = self._state["records"]
+            self._append([[fp, delta, None if fp in records or fp not in new else self._entry(new[fp])]
+                          for fp, delta in deltas.items() if delta])
+
+    def ensure_built(self, db):
+        if not os.path.exists(self.path):
+            with db._locked("publications.json"):
+                if not os.path.exists(self.path):
+                    self.update(db._load_json("publications.json", []))
+
+    # --- Lookups ---
+
+    def is_indexed(self, fp: str) -> bool:
+        with _lock:
+            self._load()
+            return fp in self._state["records"]
+
+    def add(self, record: Dict[str, Any]):
+        """Adds a record for this instance only, so one import batch can detect duplicates within itself."""
+        fp = fingerprint(record)
+        if fp in self._local["records"]:
+            return
+        rec = self._entry(record)
+        self._local["records"][fp] = rec
+        self._add_to_maps(fp, rec, self._local["by_doi"], self._local["by_title"], self._local["buckets"])
+
+    def find(self, record: Dict[str, Any], present: Optional[set] = None) -> List[Dict[str, Any]]:
+        """
+        Publications that look like `record`, best match first: saved ones plus any added with `add`.
+        `present` limits saved matches to those fingerprints (rows still in an edited list).
+        Each match is {"fingerprint", "label", "reason" ("doi"/"title"/"similar"), "score"}.
+        """
+        doi = normalize_doi(record.get("doi"))
+        title_hash = hashlib.sha1(normalize_title(record.get("title", "")).encode("utf-8")).hexdigest()[:16]
+        sig = minhash(shingles(record.get("title", ""), record.get("authors", "")))
+        keys = self._band_keys(sig)
+
+        with _lock:
+            self._load()
+            if "buckets" not in self._state:
+                self._rebuild_maps()
+            saved = dict(self._state)
+
+        matches: Dict[str, Dict[str, Any]] = {}
+        for state in (saved, self._local):
+            found: Dict[str, Dict[str, Any]] = {}
+            if doi:
+                for fp in state["by_doi"].get(doi, []):
+                    found[fp] = {"reason": "doi", "score": 1.0}
+            for fp in state["by_title"].get(title_hash, []):
+                found.setdefault(fp, {"reason": "title", "score": 1.0})
+            candidates = set()
+            for key in keys:
+                candidates.update(state["buckets"].get(key, []))
+            for fp in candidates - found.keys():
+                other = state["records"][fp]["sig"]
+                score = sum(1 for x, y in zip(sig, other) if x == y) / NUM_HASHES
+                if score >= SIMILARITY_THRESHOLD:
+                    found[fp] = {"reason": "similar", "score": round(score, 2)}
+            if state is saved and present is not None:
+                found = {fp: m for fp, m in found.items() if fp in present}
+            for fp, m in found.items():
+                matches.setdefault(fp, {"fingerprint": fp, "label": state["records"][fp]["label"], **m})
+
+        return sorted(matches.values(), key=lambda m: -m["score"])
+
+
+def positions(pubs) -> Dict[str, int]:
+    """Fingerprint -> index for a loaded publication list."""
+    return {fingerprint(p.model_dump()): i for i, p in enumerate(pubs)}
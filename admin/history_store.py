@@ -0,0 +1,247 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+from typing import List, Optional, Dict, Any
+
+# Every Nth snapshot stores its full reference list, so rebuilding any version
+# never has to replay more than this many deltas.
+KEYFRAME_INTERVAL = 20
+
+# Name of the file in each snapshot directory holding the newest snapshot id
+HEAD_FILE = "HEAD"
+
+_lock = threading.Lock()
+# Reference list of the newest snapshot per collection, so a save can diff
+# against it without reading the chain back from disk.
+_head_cache: Dict[str, tuple] = {}
+
+
+def _canonical(record: Any) -> bytes:
+    return json.dumps(record, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _digest(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=20).hexdigest()
+
+
+def _delta(parent: List[str], refs: List[str]) -> list:
+    """
+    Encodes `refs` against `parent` as a list of ops:
+    ["c", start, length] copies a run from the parent, ["n", [hashes]] inserts new refs.
+    Reordering, appends and single-record edits all become a handful of ops.
+    """
+    positions: Dict[str, int] = {}
+    for i, h in enumerate(parent):
+        positions.setdefault(h, i)
+
+    ops: list = []
+    i = 0
+    while i < len(refs):
+        start = positions.get(refs[i])
+        if start is None:
+            if ops and ops[-1][0] == "n":
+                ops[-1][1].append(refs[i])
+            else:
+                ops.append(["n", [refs[i]]])
+            i += 1
+            continue
+        length = 1
+        while (i + length < len(refs) and start + length < len(parent)
+               and refs[i + length] == parent[start + length]):
+            length += 1
+        ops.append(["c", start, length])
+        i += length
+    return ops
+
+
+def _apply(parent: List[str], ops: list) -> List[str]:
+    refs: List[str] = []
+    for op in ops:
+        if op[0] == "c":
+            refs.extend(parent[op[1]:op[1] + op[2]])
+        else:
+            refs.extend(op[1])
+    return refs
+
+
+class HistoryStore:
+    """
+    Content-addressed version history for the data collections.
+
+    Each record is stored once under `history/objects/` by the hash of its
+    canonical JSON, zlib-compressed. A snapshot is a compressed list of
+    references, written as a delta against the previous snapshot with a full
+    keyframe every KEYFRAME_INTERVAL saves. A save therefore costs roughly the
+    size of what changed, and any version is rebuilt from at most one keyframe
+    plus a bounded chain of deltas.
+    """
+
+    def __init__(self, data_dir: str):
+        self.root = os.path.join(data_dir, "history")
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.snapshots_dir = os.path.join(self.root, "snapshots")
+
+    # --- Objects ---
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _put_object(self, record: Any) -> str:
+        raw = _canonical(record)
+        digest = _digest(raw)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(raw))
+            os.replace(tmp, path)
+        return digest
+
+    def _get_object(self, digest: str) -> Any:
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    # --- Snapshots ---
+
+    def _snapshot_dir(self, name: str) -> str:
+        return os.path.join(self.snapshots_dir, name)
+
+    def _read_snapshot(self, name: str, snapshot_id: str) -> Dict[str, Any]:
+        with open(os.path.join(self._snapshot_dir(name), f"{snapshot_id}.snap"), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def _resolve_refs(self, name: str, snapshot_id: str) -> tuple:
+        """Returns (snapshot, refs) by walking back to the nearest keyframe."""
+        chain = []
+        current = snapshot_id
+        while True:
+            snap = self._read_snapshot(name, current)
+            chain.append(snap)
+            if "refs" in snap:
+                break
+            current = snap["parent"]
+        refs = chain[-1]["refs"]
+        for snap in reversed(chain[:-1]):
+            refs = _apply(refs, snap["ops"])
+        return chain[0], refs
+
+    def list_snapshots(self, name: str) -> List[str]:
+        """Snapshot ids for a collection, newest first."""
+        snap_dir = self._snapshot_dir(name)
+        if not os.path.isdir(snap_dir):
+            return []
+        return sorted((f[:-5] for f in os.listdir(snap_dir) if f.endswith(".snap")), reverse=True)
+
+    def _latest(self, name: str) -> Optional[str]:
+        """
+        Id of the newest snapshot, from the HEAD file so it costs one small read
+        however many versions exist. Directories written before HEAD existed
+        (or whose HEAD points at a missing snapshot) fall back to a listing.
+        """
+        snap_dir = self._snapshot_dir(name)
+        try:
+            with open(os.path.join(snap_dir, HEAD_FILE), "r") as f:
+                snapshot_id = f.read().strip()
+            if snapshot_id and os.path.exists(os.path.join(snap_dir, f"{snapshot_id}.snap")):
+                return snapshot_id
+        except FileNotFoundError:
+            pass
+        existing = self.list_snapshots(name)
+        return existing[0] if existing else None
+
+    def _head(self, name: str) -> Optional[tuple]:
+        """(snapshot id, refs, depth) of the newest snapshot; call with the lock held."""
+        snap_dir = self._snapshot_dir(name)
+        head = _head_cache.get(snap_dir)
+        latest = self._latest(name)
+        if head is None or head[0] != latest:
+            head = None
+            if latest is not None:
+                snap, parent_refs = self._resolve_refs(name, latest)
+                head = (latest, parent_refs, snap.get("depth", 0))
+        return head
+
+    def _commit(self, name: str, kind: str, refs: List[str], head: Optional[tuple]) -> str:
+        """Writes a snapshot of `refs` after `head`; call with the lock held."""
+        if head is not None and head[1] == refs:
+            # Nothing changed since the last version
+            return head[0]
+        snap_dir = self._snapshot_dir(name)
+        os.makedirs(snap_dir, exist_ok=True)
+
+        snapshot: Dict[str, Any] = {"kind": kind, "time": datetime.now().isoformat()}
+        if head is None or head[2] + 1 >= KEYFRAME_INTERVAL:
+            snapshot.update(depth=0, refs=refs)
+        else:
+            snapshot.update(depth=head[2] + 1, parent=head[0], ops=_delta(head[1], refs))
+
+        snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        if head is not None and snapshot_id <= head[0]:
+            snapshot_id = head[0] + "_1"
+        path = os.path.join(snap_dir, f"{snapshot_id}.snap")
+        with open(path, "wb") as f:
+            f.write(zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8")))
+        head_path = os.path.join(snap_dir, HEAD_FILE)
+        tmp = f"{head_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(snapshot_id)
+        os.replace(tmp, head_path)
+
+        _head_cache[snap_dir] = (snapshot_id, refs, snapshot["depth"])
+        return snapshot_id
+
+    def record(self, name: str, data: Any) -> str:
+        """Stores a new version of a collection (a list of records or a single object)."""
+        kind = "list" if isinstance(data, list) else "object"
+        refs = [self._put_object(item) for item in data] if kind == "list" else [self._put_object(data)]
+        with _lock:
+            return self._commit(name, kind, refs, self._head(name))
+
+    def record_change(self, name: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                      count: Optional[int] = None) -> Optional[str]:
+        """
+        Stores a new version of a list collection that differs from the latest one
+        in a single record: `old` replaced by `new`, `new` appended (no `old`) or
+        `old` removed (no `new`). Only that record is hashed and stored. With
+        `count`, the new version must hold that many records. Returns None and
+        stores nothing when the latest version does not match; the caller then
+        records the whole collection.
+        """
+        new_ref = self._put_object(new) if new is not None else None
+        with _lock:
+            head = self._head(name)
+            if head is None:
+                return None
+            refs = list(head[1])
+            if old is None:
+                refs.append(new_ref)
+            else:
+                try:
+                    i = refs.index(_digest(_canonical(old)))
+                except ValueError:
+                    return None
+                if new_ref is None:
+                    del refs[i]
+                else:
+                    refs[i] = new_ref
+            if count is not None and len(refs) != count:
+                return None
+            return self._commit(name, "list", refs, head)
+
+    def load(self, name: str, snapshot_id: Optional[str] = None) -> Any:
+        """Rebuilds a collection as it was at `snapshot_id` (default: latest)."""
+        if snapshot_id is None:
+            snapshot_id = self._latest(name)
+            if snapshot_id is None:
+                return None
+        snap, refs = self._resolve_refs(name, snapshot_id)
+        records = [self._get_object(digest) for digest in refs]
+        return records if snap["kind"] == "list" else records[0]
+
+    def snapshot_info(self, name: str, snapshot_id: str) -> Dict[str, Any]:
+        snap, refs = self._resolve_refs(name, snapshot_id)
+        return {"id": snapshot_id, "time": snap.get("time"), "kind": snap["kind"], "records": len(refs)}
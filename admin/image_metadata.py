@@ -0,0 +1,158 @@
+import os
+import struct
+import zlib
+from typing import List, Optional
+
+from PIL import Image
+
+# The one EXIF tag that survives stripping, so rotated photos still display upright
+ORIENTATION_TAG = 0x0112
+
+# JPEG segments holding EXIF/XMP (APP1) and Photoshop/IPTC data (APP13); ICC profiles (APP2) stay
+_JPEG_METADATA = {0xE1, 0xED}
+_PNG_METADATA = {b"eXIf", b"tEXt", b"zTXt", b"iTXt"}
+_WEBP_METADATA = {b"EXIF", b"XMP "}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _orientation_exif(path: str) -> Optional[bytes]:
+    """TIFF-encoded EXIF holding only the image's orientation, or None when it is upright."""
+    with Image.open(path) as img:
+        orientation = img.getexif().get(ORIENTATION_TAG, 1)
+    if orientation == 1:
+        return None
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = orientation
+    # Without the "Exif\0\0" prefix that only JPEG uses
+    return exif.tobytes()[6:]
+
+
+def _strip_jpeg(data: bytes, exif: Optional[bytes]) -> Optional[bytes]:
+    segments: List[tuple] = []
+    pos = 2
+    while pos < len(data):
+        if data[pos] != 0xFF:
+            raise ValueError("Malformed JPEG segment")
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            # Fill byte
+            pos += 1
+            continue
+        if marker == 0xDA:
+            # Start of scan: the entropy-coded image data and everything after it is kept as is
+            segments.append((marker, data[pos:]))
+            break
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            segments.append((marker, data[pos:pos + 2]))
+            pos += 2
+            continue
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        segments.append((marker, data[pos:pos + 2 + length]))
+        pos += 2 + length
+
+    if not any(marker in _JPEG_METADATA for marker, _ in segments):
+        return None
+    out = [data[:2]]
+    pending = exif
+    for marker, raw in segments:
+        if marker in _JPEG_METADATA:
+            continue
+        if pending is not None and marker != 0xE0:
+            # After the JFIF header, if there is one
+            body = b"Exif\x00\x00" + pending
+            out.append(b"\xff\xe1" + struct.pack(">H", len(body) + 2) + body)
+            pending = None
+        out.append(raw)
+    return b"".join(out)
+
+
+def _png_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def _strip_png(data: bytes, exif: Optional[bytes]) -> Optional[bytes]:
+    chunks: List[tuple] = []
+    pos = len(_PNG_SIGNATURE)
+    while pos < len(data):
+        length = struct.unpack(">I", data[pos:pos + 4])[0]
+        kind = data[pos + 4:pos + 8]
+        chunks.append((kind, data[pos:pos + 12 + length]))
+        pos += 12 + length
+        if kind == b"IEND":
+            break
+
+    if not any(kind in _PNG_METADATA for kind, _ in chunks):
+        return None
+    out = [_PNG_SIGNATURE]
+    pending = exif
+    for kind, raw in chunks:
+        if kind in _PNG_METADATA:
+            continue
+        if pending is not None and kind == b"IDAT":
+            out.append(_png_chunk(b"eXIf", pending))
+            pending = None
+        out.append(raw)
+    return b"".join(out)
+
+
+def _strip_webp(data: bytes, exif: Optional[bytes]) -> Optional[bytes]:
+    chunks: List[tuple] = []
+    pos = 12
+    while pos + 8 <= len(data):
+        kind = data[pos:pos + 4]
+        length = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        padded = length + (length & 1)
+        chunks.append((kind, data[pos:pos + 8 + padded]))
+        pos += 8 + padded
+
+    if not any(kind in _WEBP_METADATA for kind, _ in chunks):
+        return None
+    out = []
+    for kind, raw in chunks:
+        if kind in _WEBP_METADATA:
+            continue
+        if kind == b"VP8X":
+            # Feature flags: clear XMP (0x04), and EXIF (0x08) unless an orientation is kept
+            flags = (raw[8] & ~0x0C) | (0x08 if exif is not None else 0)
+            raw = raw[:8] + bytes([flags]) + raw[9:]
+        out.append(raw)
+    if exif is not None:
+        out.append(b"EXIF" + struct.pack("<I", len(exif)) + exif + b"\x00" * (len(exif) & 1))
+    body = b"WEBP" + b"".join(out)
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _stripper(head: bytes):
+    if head.startswith(b"\xff\xd8\xff"):
+        return _strip_jpeg
+    if head.startswith(_PNG_SIGNATURE):
+        return _strip_png
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _strip_webp
+    return None
+
+
+def strip_metadata(path: str) -> bool:
+    """
+    Removes EXIF (GPS position, camera, timestamps), XMP and text metadata from a
+    JPEG, PNG or WebP file in place, keeping only the orientation. The image data
+    is copied byte for byte, never re-encoded, and a file without metadata is
+    left untouched. Returns whether the file changed.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    strip = _stripper(data[:12])
+    if strip is None:
+        return False
+    try:
+        stripped = strip(data, _orientation_exif(path))
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        print(f"Stripping image metadata failed: {e}")
+        return False
+    if stripped is None:
+        return False
+    tmp = f"{path}.{os.getpid()}.strip"
+    with open(tmp, "wb") as f:
+        f.write(stripped)
+    os.replace(tmp, path)
+    return True
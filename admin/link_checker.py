@@ -0,0 +1,239 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional, Dict, Any
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+WEB_PUBLIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web", "public")
+
+# Statuses worth another attempt; everything else is a definitive answer.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# How long a stored result stays trusted, by status class (seconds).
+RESULT_TTL = {
+    "ok": 7 * 24 * 3600,
+    "not_found": 24 * 3600,
+    "client_error": 12 * 3600,
+    "server_error": 3600,
+    "unreachable": 15 * 60,
+}
+# A long run saves its results this often, so an interrupted run keeps what it probed
+FLUSH_EVERY = 25
+
+
+def collect_links(db) -> List[tuple]:
+    """Every (kind, name, url) the site links to."""
+    links = []
+    for p in db.get_people():
+        if p.photo: links.append(("Person Photo", p.name, p.photo))
+
+    for pub in db.get_publications():
+        if pub.pdf_link: links.append(("Pub PDF", pub.title, pub.pdf_link))
+        if pub.code_link: links.append(("Pub Code", pub.title, pub.code_link))
+        if pub.doi: links.append(("Pub DOI", pub.title, f"https://doi.org/{pub.doi}"))
+
+    for proj in db.get_projects():
+        for img in proj.images:
+            if img: links.append(("Project Image", proj.title, img))
+    return links
+
+
+class LinkChecker:
+    """
+    Concurrent link checker.
+
+    One pooled `requests.Session` is shared by a thread pool, a semaphore per
+    host caps how many requests hit the same server at once (doi.org, GitHub),
+    and transient failures are retried with exponential backoff. Results are
+    yielded as they complete so the UI can show progress.
+    """
+
+    def __init__(self, max_workers: int = 16, per_host: int = 4, timeout: float = 5.0,
+                 retries: int = 2, backoff: float = 0.5):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "SK-Lab-LinkChecker/1.0"
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots: Dict[str, threading.Semaphore] = defaultdict(lambda: threading.Semaphore(self.per_host))
+        self._slots_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._slots_lock:
+            return self._host_slots[host]
+
+    def _request(self, url: str) -> requests.Response:
+        # Some servers reject HEAD; fall back to a streamed GET without reading the body
+        r = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        if r.status_code >= 400 and r.status_code not in RETRY_STATUSES:
+            r = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True)
+            r.close()
+        return r
+
+    def check_url(self, url: str) -> Dict[str, Any]:
+        """Returns {"status", "ok", "error", "latency", "final_url"} for one URL."""
+        if url.startswith("/"):
+            exists = os.path.exists(WEB_PUBLIC_DIR + url)
+            return {"status": None if exists else 404, "ok": exists,
+                    "error": None if exists else "Local file not found", "latency": 0.0, "final_url": url}
+
+        start = time.perf_counter()
+        error: Optional[str] = None
+        status: Optional[int] = None
+        final_url = url
+        for attempt in range(self.retries + 1):
+            try:
+                with self._slot(url):
+                    r = self._request(url)
+                status, final_url, error = r.status_code, r.url, None
+                if status not in RETRY_STATUSES:
+                    break
+                delay = r.headers.get("Retry-After")
+                delay = float(delay) if delay and delay.isdigit() else self.backoff * (2 ** attempt)
+            except requests.Timeout:
+                status, error = None, "Timeout"
+                delay = self.backoff * (2 ** attempt)
+            except requests.RequestException as e:
+                status, error = None, f"Connection Error ({type(e).__name__})"
+                delay = self.backoff * (2 ** attempt)
+            if attempt < self.retries:
+                time.sleep(min(delay, 10))
+
+        ok = status is not None and status < 400
+        return {"status": status, "ok": ok, "error": error, "latency": time.perf_counter() - start,
+                "final_url": final_url}
+
+    def check_all(self, links: Iterable[tuple]) -> Iterator[Dict[str, Any]]:
+        """Checks (kind, name, url) tuples concurrently, yielding results as they complete."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.check_url, url): (kind, name, url) for kind, name, url in links}
+            for future in as_completed(futures):
+                kind, name, url = futures[future]
+                yield {"kind": kind, "name": name, "url": url, **future.result()}
+
+    def close(self):
+        self.session.close()
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used as the result key: lowercase scheme/host, no default port or fragment."""
+    if url.startswith("/"):
+        return url
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ""
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+def status_class(result: Dict[str, Any]) -> str:
+    status = result.get("status")
+    if result.get("ok"):
+        return "ok"
+    if status is None:
+        return "unreachable"
+    if status in (404, 410):
+        return "not_found"
+    if status == 429 or status >= 500:
+        return "server_error"
+    return "client_error"
+
+
+class LinkResultStore:
+    """
+    Persistent link-check results keyed by normalized URL.
+
+    Each entry keeps status, latency and when it was checked; it is reused
+    until the TTL for its status class runs out, so a run only probes new or
+    expired links. Local /uploads paths are never stored since checking them is free.
+    """
+
+    def __init__(self, data_dir: str, filename: str = "link_checks.json"):
+        self.path = os.path.join(data_dir, filename)
+        self.results: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    self.results = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.results = {}
+
+    def fresh(self, url: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """The stored result for `url` if it has not expired yet."""
+        entry = self.results.get(normalize_url(url))
+        if entry is None:
+            return None
+        now = now or time.time()
+        if now - entry["checked_at"] > RESULT_TTL[status_class(entry)]:
+            return None
+        return entry
+
+    def put(self, url: str, result: Dict[str, Any]):
+        if url.startswith("/"):
+            return
+        self.results[normalize_url(url)] = {
+            "status": result["status"], "ok": result["ok"], "error": result["error"],
+            "latency": round(result["latency"], 3), "checked_at": time.time(),
+        }
+
+    def prune(self, keep_urls: Iterable[str]):
+        """Drops results for links that no longer appear in the data."""
+        keep = {normalize_url(u) for u in keep_urls}
+        self.results = {k: v for k, v in self.results.items() if k in keep}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.results, f)
+        os.replace(tmp, self.path)
+
+
+def check_incremental(checker: LinkChecker, store: LinkResultStore, links: List[tuple],
+                      force: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Yields a result for every (kind, name, url): still-fresh stored results
+    first (marked "cached"), then new probes as they complete. The same URL
+    linked from several records, however it is written, is probed once.
+    Results are saved every FLUSH_EVERY probes and at the end.
+    """
+    now = time.time()
+    # Normalized URL -> the records linking to it, as (kind, name, url as written)
+    to_probe: Dict[str, List[tuple]] = {}
+    for kind, name, url in links:
+        stored = None if force else store.fresh(url, now)
+        if stored is not None:
+            yield {"kind": kind, "name": name, "url": url, "cached": True, "final_url": url, **stored}
+        else:
+            to_probe.setdefault(normalize_url(url), []).append((kind, name, url))
+
+    probed = 0
+    try:
+        # The normalized URL rides along in the name slot, to find the records again
+        for result in checker.check_all(("", key, refs[0][2]) for key, refs in to_probe.items()):
+            store.put(result["url"], result)
+            probed += 1
+            if probed % FLUSH_EVERY == 0:
+                store.save()
+            for kind, name, url in to_probe[result["name"]]:
+                yield {**result, "kind": kind, "name": name, "url": url, "cached": False, "checked_at": now}
+    finally:
+        if probed % FLUSH_EVERY:
+            store.save()
+
+    store.prune(url for _, _, url in links)
+    store.save()
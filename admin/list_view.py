@@ -0,0 +1,102 @@
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+PAGE_SIZES = (10, 25, 50, 100)
+
+# Sort option label -> (key function, descending)
+SortOptions = Dict[str, Tuple[Callable[[Any], Any], bool]]
+
+_lock = threading.Lock()
+# Collection cache key -> {"stamp", "size", "text": [...], "orders": {sort label: [...]}}
+_indexes: Dict[str, Dict[str, Any]] = {}
+
+
+def _list_index(db, filename: str, items: List[Any], search_text: Callable[[Any], str]) -> Dict[str, Any]:
+    """
+    Lowercased search text per row and sorted row orders, rebuilt only when the
+    collection changes on disk, so reruns (every keystroke) filter precomputed
+    strings instead of re-deriving and re-sorting the whole list.
+    """
+    cache_key = db._cache_key(filename)
+    stamp = db._data_stamp(filename)
+    with _lock:
+        entry = _indexes.get(cache_key)
+        if entry is None or entry["stamp"] != stamp or entry["size"] != len(items):
+            entry = {"stamp": stamp, "size": len(items), "text": [search_text(x).lower() for x in items], "orders": {}}
+            _indexes[cache_key] = entry
+    return entry
+
+
+def _order(entry: Dict[str, Any], items: List[Any], label: str, sort_options: SortOptions) -> List[int]:
+    order = entry["orders"].get(label)
+    if order is None:
+        key_fn, descending = sort_options[label]
+        order = sorted(range(len(items)), key=lambda i: key_fn(items[i]), reverse=descending)
+        entry["orders"][label] = order
+    return order
+
+
+def paged_list(db, filename: str, items: List[Any], key: str, *,
+               row_label: Callable[[Any], str],
+               search_text: Callable[[Any], str],
+               sort_options: SortOptions,
+               render_editor: Callable[[int, Any], None],
+               filters: Optional[List[Callable[[Any], bool]]] = None,
+               placeholder: str = "Search...",
+               default_page_size: int = 25):
+    """
+    One page of compact rows with search, sort and page size controls.
+    Only the row the user opens gets its full edit form (`render_editor(index, item)`),
+    so the cost of a rerun no longer grows with the number of records.
+    """
+    c_search, c_sort, c_size = st.columns([3, 2, 1])
+    query = c_search.text_input("Search", key=f"{key}_query", placeholder=placeholder).strip().lower()
+    sort_label = c_sort.selectbox("Sort by", list(sort_options), key=f"{key}_sort")
+    page_size = c_size.selectbox("Per page", PAGE_SIZES, index=PAGE_SIZES.index(default_page_size), key=f"{key}_size")
+
+    entry = _list_index(db, filename, items, search_text)
+    text = entry["text"]
+    rows = [i for i in _order(entry, items, sort_label, sort_options)
+            if (not query or query in text[i]) and all(f(items[i]) for f in filters or [])]
+    if not rows:
+        st.info("No matching entries.")
+        return
+
+    pages = max(1, math.ceil(len(rows) / page_size))
+    page_key = f"{key}_page"
+    page = min(max(1, st.session_state.get(page_key, 1)), pages)
+
+    # The open row is remembered by record id, so it survives reorders and deletes,
+    # together with the record version it was opened at: saves are checked against that
+    open_key, base_key = f"{key}_open", f"{key}_open_version"
+    opened = st.session_state.get(open_key)
+    for i in rows[(page - 1) * page_size: page * page_size]:
+        item = items[i]
+        c_label, c_toggle = st.columns([8, 1])
+        c_label.markdown(row_label(item))
+        if c_toggle.button("Close" if opened == item.id else "Edit", key=f"{key}_toggle_{item.id}"):
+            st.session_state[open_key] = None if opened == item.id else item.id
+            st.session_state[base_key] = item.version
+            st.rerun()
+        if opened == item.id:
+            base = st.session_state.get(base_key, item.version)
+            with st.container(border=True):
+                if base != item.version:
+                    c_warn, c_reload = st.columns([5, 1])
+                    c_warn.warning("Someone else saved this entry after you opened it. Reload to edit the latest version.")
+                    if c_reload.button("Reload", key=f"{key}_reload_{item.id}"):
+                        st.session_state[base_key] = item.version
+                        st.rerun()
+                render_editor(i, item.model_copy(update={"version": base}))
+
+    c_prev, c_info, c_next = st.columns([1, 4, 1])
+    if c_prev.button("◀ Prev", key=f"{key}_prev", disabled=page <= 1):
+        st.session_state[page_key] = page - 1
+        st.rerun()
+    c_info.caption(f"Page {page} of {pages} · {len(rows)} of {len(items)} entries")
+    if c_next.button("Next ▶", key=f"{key}_next", disabled=page >= pages):
+        st.session_state[page_key] = page + 1
+        st.rerun()
@@ -0,0 +1,24 @@
+def generate_newsletter(db, year: int, limit: int = 3) -> str:
+    """Markdown draft of the lab update for `year`: latest publications, news and ongoing projects."""
+    recent_pubs = db.query_publications(year=year)
+    recent_news = db.query_news(since=f"{year}-01-01", until=f"{year}-12-31")
+
+    summary = f"""# 📢 SK Lab Quarterly Update ({year})
+
+## 🔬 Research Highlights
+We are excited to share our latest progress:
+"""
+    for p in recent_pubs[:limit]:
+        summary += f"- **{p.title}** ({p.venue})\n"
+
+    summary += "\n## 📰 Lab News\n"
+    for n in recent_news[:limit]:
+        summary += f"- {n.title} ({n.publish_date})\n"
+
+    summary += "\n## 🚀 Active Projects\n"
+    active_projs = db.query_projects(status="Ongoing")
+    for p in active_projs[:limit]:
+        summary += f"- {p.title}\n"
+
+    summary += "\n---\n*Generated by SK Lab Admin*"
+    return summary
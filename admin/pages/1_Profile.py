@@ -1,10 +1,13 @@
 import streamlit as st
-from data_manager import DataLayer, ProfessorProfile
+from data_manager import DataLayer, ProfessorProfile, ConflictError
 from auth import check_password
+from telemetry import page_rerun, end_page_rerun
 
 if not check_password():
     st.stop()
 
+page_rerun("Profile")
+
 st.title("👤 Professor Profile")
 
 # Initialize DataLayer
@@ -12,6 +15,8 @@ db = DataLayer()
 
 # Load current data
 current_profile = db.get_profile()
+# Version the form was last shown with; a save is checked against it
+base_version = st.session_state.get("profile_version", db.versions["profile.json"])
 
 with st.form("profile_form"):
     col1, col2 = st.columns(2)
@@ -43,7 +48,8 @@ with st.form("profile_form"):
     with c4:
         li = st.text_input("LinkedIn URL", value=current_profile.linkedin_url)
 
-    if st.form_submit_button("Save Profile"):
+    submitted = st.form_submit_button("Save Profile")
+    if submitted:
         new_profile = ProfessorProfile(
             name=name, title=title, affiliation=affiliation,
             bio_short=bio_short, bio_long=bio_long,
@@ -55,12 +61,18 @@ with st.form("profile_form"):
             linkedin_url=li or None
         )
         try:
-            db.save_profile(new_profile)
+            db.save_profile(new_profile, base_version)
             st.success("Profile saved successfully!")
+            st.session_state["profile_version"] = db.versions["profile.json"]
             # Update current_profile reference for preview immediately after save
             current_profile = new_profile 
+        except ConflictError:
+            st.error("Not saved: someone else changed the profile while you were editing. "
+                     "Reload the page to see their version, then apply your change again.")
         except Exception as e:
             st.error(f"Error saving profile: {e}")
+if not submitted:
+    st.session_state["profile_version"] = db.versions["profile.json"]
 
 # Live Preview Section
 st.divider()
@@ -71,3 +83,5 @@ if st.checkbox("Show Preview"):
     # Or just use the loaded/saved object? 
     # Use current_profile (which is either loaded or just saved)
     render_profile_preview(current_profile)
+
+end_page_rerun()
@@ -1,15 +1,20 @@
 import streamlit as st
-from data_manager import DataLayer, LabInfo
+from data_manager import DataLayer, LabInfo, ConflictError
 from auth import check_password
+from telemetry import page_rerun, end_page_rerun
 from upload_utils import image_uploader_widget
 
 if not check_password():
     st.stop()
 
+page_rerun("Lab Info")
+
 st.title("🧪 Lab Information")
 
 db = DataLayer()
 current_info = db.get_lab_info()
+# Version the form was last shown with; a save is checked against it
+base_version = st.session_state.get("lab_info_version", db.versions["lab_info.json"])
 
 with st.form("lab_info_form"):
     lab_name = st.text_input("Lab Name", value=current_info.lab_name)
@@ -30,7 +35,8 @@ with st.form("lab_info_form"):
     s_desc = st.text_input("Meta Description (Google)", value=current_info.seo_description or "A leading research group.")
     s_keys = st.text_input("Keywords (comma separated)", value=current_info.seo_keywords or "research, science")
 
-    if st.form_submit_button("Save Lab Info"):
+    submitted = st.form_submit_button("Save Lab Info")
+    if submitted:
         areas = [line.strip() for line in areas_text.split("\n") if line.strip()]
         new_info = LabInfo(
             lab_name=lab_name,
@@ -44,8 +50,15 @@ with st.form("lab_info_form"):
         )
 
         try:
-            db.save_lab_info(new_info)
+            db.save_lab_info(new_info, base_version)
             st.success("Lab Info updated successfully!")
+            st.session_state["lab_info_version"] = db.versions["lab_info.json"]
+        except ConflictError:
+            st.error("Not saved: someone else changed the lab info while you were editing. "
+                     "Reload the page to see their version, then apply your change again.")
         except Exception as e:
             st.error(f"Error saving lab info: {e}")
+if not submitted:
+    st.session_state["lab_info_version"] = db.versions["lab_info.json"]
 
+end_page_rerun()
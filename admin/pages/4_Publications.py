@@ -1,27 +1,42 @@
 import streamlit as st
-from data_manager import DataLayer, Publication
+from data_manager import DataLayer, Publication, ConflictError
 from auth import check_password
+from telemetry import page_rerun, end_page_rerun
 
 if not check_password():
     st.stop()
 
+page_rerun("Publications")
+
 st.title("📚 Publications")
 
 db = DataLayer()
 pubs = db.get_publications()
+# Whole-list saves below are checked against the version this run loaded
+pubs_version = db.versions["publications.json"]
+db.dedup.ensure_built(db)
 
-def save_pub(pub: Publication, index: int = -1):
-    if index >= 0:
-        pubs[index] = pub
-    else:
-        pubs.append(pub)
-    db.save_publications(pubs)
+DUPLICATE_CHOICES = ["Skip", "Merge into existing", "Import anyway"]
+
+def describe_match(match) -> str:
+    reason = {"doi": "same DOI", "title": "same title", "similar": f"{int(match['score'] * 100)}% similar"}[match["reason"]]
+    return f"{match['label']} ({reason})"
+
+def save_pub(pub: Publication):
+    try:
+        db.upsert("publications", pub)
+    except ConflictError as e:
+        st.error(f"Not saved: {e}. Reload the entry and apply your change again.")
+        return
     st.success("Publication saved!")
     st.rerun()
 
-def delete_pub(index: int):
-    pubs.pop(index)
-    db.save_publications(pubs)
+def delete_pub(pub: Publication):
+    try:
+        db.delete("publications", pub.id, expected_version=pub.version)
+    except ConflictError as e:
+        st.error(f"Not deleted: {e}.")
+        return
     st.success("Deleted!")
     st.rerun()
 
@@ -41,60 +56,60 @@ with tab_bulk:
     # We need to ensure we can map back to original objects.
     
     # Let's use a standard list of dicts approach
-    data = [p.dict() for p in pubs]
+    data = db.dump_records("publications", pubs, exclude_none=False)
     
     edited_data = st.data_editor(data, num_rows="dynamic", use_container_width=True, key="pub_editor")
     
+    bulk_dup_mode = st.radio("Rows that duplicate another publication", DUPLICATE_CHOICES, horizontal=True, key="bulk_dup_mode")
+
     if st.button("Save All Bulk Changes"):
         try:
-            new_pubs = [Publication(**item) for item in edited_data]
-            db.save_publications(new_pubs)
-            st.success(f"Successfully saved {len(new_pubs)} publications!")
-            st.rerun()
+            from dedup_index import fingerprint, merge_publications
+            new_pubs = db.validate_records("publications", edited_data, previous=pubs)
+            kept, dropped = new_pubs, []
+            if bulk_dup_mode != "Import anyway":
+                # Only new or edited rows (not yet in the index, or repeated) are looked up
+                fps = [fingerprint(p.model_dump()) for p in new_pubs]
+                row_of, changed = {}, []
+                for i, fp in enumerate(fps):
+                    if fp in row_of or not db.dedup.is_indexed(fp):
+                        changed.append(i)
+                    else:
+                        row_of[fp] = i
+                unchanged = set(row_of)
+                keep = [True] * len(new_pubs)
+                for i in changed:
+                    found = db.dedup.find(new_pubs[i].model_dump(), present=unchanged)
+                    if not found:
+                        db.dedup.add(new_pubs[i].model_dump())
+                        row_of.setdefault(fps[i], i)
+                        continue
+                    keep[i] = False
+                    dropped.append(describe_match(found[0]))
+                    target = row_of.get(found[0]["fingerprint"])
+                    if bulk_dup_mode == "Merge into existing" and target is not None:
+                        new_pubs[target] = merge_publications(new_pubs[target], new_pubs[i])
+                kept = [p for p, k in zip(new_pubs, keep) if k]
+            db.save_publications(kept, pubs_version)
+            if dropped:
+                st.warning(f"{bulk_dup_mode}: {len(dropped)} duplicate rows")
+                st.dataframe([{"duplicate of": d} for d in dropped], use_container_width=True)
+            st.success(f"Successfully saved {len(kept)} publications!")
+            if not dropped:
+                st.rerun()
         except Exception as e:
             st.error(f"Error saving data: {e}")
 
 def fetch_doi_metadata(doi_input):
-    import requests
-    # Clean DOI
-    doi = doi_input.strip()
-    if doi.startswith("https://doi.org/"):
-        doi = doi.replace("https://doi.org/", "")
-    
-    # CrossRef API
-    url = f"https://api.crossref.org/works/{doi}"
+    from crossref_client import CrossRefClient
+    client = CrossRefClient()
     try:
-        r = requests.get(url, timeout=10)
-        if r.status_code == 200:
-            data = r.json()['message']
-            
-            # Extract fields
-            title = data.get('title', [''])[0]
-            
-            authors_list = data.get('author', [])
-            authors = ", ".join([f"{a.get('given', '')} {a.get('family', '')}" for a in authors_list])
-            
-            year = 2024
-            if 'published-print' in data:
-                year = data['published-print']['date-parts'][0][0]
-            elif 'created' in data:
-                year = data['created']['date-parts'][0][0]
-                
-            venue = data.get('container-title', [''])[0]
-            
-            return {
-                "title": title,
-                "authors": authors,
-                "year": int(year),
-                "venue": venue,
-                "doi": doi,
-                "tags": []
-            }
-        else:
-            return None
-    except Exception as e:
-        st.error(f"Error fetching DOI: {e}")
-        return None
+        result = client.fetch(doi_input)
+    finally:
+        client.close()
+    if result["error"] and result["error"] != "Not found":
+        st.error(f"Error fetching DOI: {result['error']}")
+    return result["meta"]
 
 with tab_import:
     st.header("Smart Import")
@@ -111,62 +126,170 @@ with tab_import:
             
     if 'import_meta' in st.session_state:
         meta = st.session_state['import_meta']
+        matches = db.dedup.find(meta)
+        if matches:
+            st.warning("This paper may already be in the list:\n\n" + "\n".join(f"- {describe_match(m)}" for m in matches[:5]))
         with st.form("import_doi_form"):
             i_title = st.text_input("Title", value=meta['title'])
             i_authors = st.text_input("Authors", value=meta['authors'])
             i_year = st.number_input("Year", value=meta['year'])
             i_venue = st.text_input("Venue", value=meta['venue'])
             i_doi = st.text_input("DOI", value=meta['doi'])
+            dup_mode = st.radio("If it is a duplicate", DUPLICATE_CHOICES, horizontal=True) if matches else "Import anyway"
             
             if st.form_submit_button("Import This Paper"):
                 p = Publication(
                     title=i_title, authors=i_authors, year=i_year, venue=i_venue,
-                    abstract="", doi=i_doi, pdf_link=None, code_link=None, bibtex=None, tags=[]
+                    abstract=meta.get('abstract', ""), doi=i_doi, pdf_link=None, code_link=None, bibtex=None, tags=[]
                 )
-                save_pub(p)
                 del st.session_state['import_meta']
+                if dup_mode == "Skip":
+                    st.info("Skipped; the existing entry was kept.")
+                elif dup_mode == "Merge into existing":
+                    from dedup_index import merge_publications, positions
+                    idx = positions(pubs).get(matches[0]["fingerprint"], -1)
+                    save_pub(merge_publications(pubs[idx], p) if idx >= 0 else p)
+                else:
+                    save_pub(p)
+
+    st.divider()
+
+    st.markdown("### Option 2: Batch DOI Import")
+    batch_input = st.text_area("Paste DOIs (one per line, or separated by spaces/commas)", key="doi_batch")
+    if st.button("Fetch All"):
+        import re
+        from crossref_client import CrossRefClient
+        dois = [d for d in re.split(r"[\s,;]+", batch_input) if d]
+        client = CrossRefClient()
+        db.dedup.ensure_built(db)
+        rows = []
+        progress = st.progress(0)
+        table = st.empty()
+        try:
+            for i, result in enumerate(client.fetch_many(dois)):
+                meta = result["meta"] or {}
+                matches = db.dedup.find(meta) if meta else []
+                if meta and not matches:
+                    db.dedup.add(meta)
+                rows.append({
+                    "import": result["meta"] is not None and not matches,
+                    "doi": result["doi"],
+                    "title": meta.get("title", ""),
+                    "authors": meta.get("authors", ""),
+                    "year": meta.get("year"),
+                    "venue": meta.get("venue", ""),
+                    "status": result["error"] or ("cached" if result["cached"] else "fetched"),
+                    "duplicate of": describe_match(matches[0]) if matches else "",
+                    "match": matches[0]["fingerprint"] if matches else "",
+                })
+                progress.progress((i + 1) / max(1, len(dois)))
+                table.dataframe(rows, use_container_width=True)
+        finally:
+            client.close()
+        st.session_state['batch_rows'] = rows
+
+    if 'batch_rows' in st.session_state:
+        st.write("Review and untick anything you don't want to import. Likely duplicates start unticked.")
+        reviewed = st.data_editor(st.session_state['batch_rows'], use_container_width=True, key="batch_review",
+                                  disabled=["doi", "status", "duplicate of"], column_config={"match": None})
+        merge_batch = st.checkbox("Merge ticked duplicates into the existing entry instead of adding them", value=True)
+        if st.button("Import Selected"):
+            from crossref_client import CrossRefCache
+            from dedup_index import merge_publications, positions
+            cache = CrossRefCache()
+            existing = positions(pubs)
+            count = 0
+            for row in reviewed:
+                if not row["import"] or not row["title"]:
+                    continue
+                # The review table has no room for abstracts; take them from the response cache
+                cached = cache.get(row["doi"]) or {}
+                abstract = (cached.get("meta") or {}).get("abstract", "")
+                p = Publication(
+                    title=row["title"], authors=row["authors"], year=int(row["year"] or 2024),
+                    venue=row["venue"], abstract=abstract, doi=row["doi"], tags=[]
+                )
+                target = existing.get(row["match"], -1)
+                if merge_batch and target >= 0:
+                    pubs[target] = merge_publications(pubs[target], p)
+                else:
+                    pubs.append(p)
+                count += 1
+            try:
+                db.save_publications(pubs, pubs_version)
+            except ConflictError as e:
+                st.error(f"Not imported: {e}. Run the import again.")
+                st.stop()
+            del st.session_state['batch_rows']
+            st.success(f"Imported {count} publications!")
+            st.rerun()
 
     st.divider()
     
-    st.markdown("### Option 2: Bulk BibTeX Upload")
+    st.markdown("### Option 3: Bulk BibTeX Upload")
     bib_file = st.file_uploader("Upload .bib file", type=["bib"])
     if bib_file:
-        import bibtexparser
-        try:
-            bib_str = bib_file.getvalue().decode("utf-8")
-            bib_db = bibtexparser.loads(bib_str)
-            
-            st.info(f"Found {len(bib_db.entries)} entries.")
-            
-            if st.button(f"Import {len(bib_db.entries)} Publications"):
-                count = 0
-                for entry in bib_db.entries:
-                    # Map fields
-                    title = entry.get('title', 'Unknown Title').replace('{', '').replace('}', '')
-                    author = entry.get('author', 'Unknown Authors').replace('{', '').replace('}', '')
-                    year = int(entry.get('year', 2024))
-                    venue = entry.get('journal') or entry.get('booktitle') or "Unknown Venue"
-                    venue = venue.replace('{', '').replace('}', '')
-                    
-                    p = Publication(
-                        title=title,
-                        authors=author,
-                        year=year,
-                        venue=venue,
-                        abstract=entry.get('abstract', ''),
-                        doi=entry.get('doi'),
-                        bibtex=bib_str, # Store full bib? Or just this entry? Ideally just this entry but raw string is okay.
-                        tags=["imported"]
-                    )
-                    pubs.append(p)
-                    count += 1
-                
-                db.save_publications(pubs)
-                st.success(f"Successfully imported {count} papers!")
+        import io
+        from bibtex_import import count_entries, import_bibtex
+
+        n_entries = count_entries(bib_file.getbuffer())
+        st.info(f"Found about {n_entries} entries.")
+
+        bib_dup_mode = st.radio("Entries that duplicate an existing publication", DUPLICATE_CHOICES, horizontal=True, key="bib_dup_mode")
+
+        if st.button(f"Import {n_entries} Publications"):
+            # Entries are parsed one at a time straight from the upload buffer and validated in chunks
+            bib_file.seek(0)
+            lines = io.TextIOWrapper(bib_file, encoding="utf-8", errors="replace")
+            progress = st.progress(0)
+            imported, errors, duplicates = [], [], []
+            if bib_dup_mode != "Import anyway":
+                from dedup_index import fingerprint, merge_publications, positions
+                merged = list(pubs)
+                row_of = positions(merged)
+            for chunk_pubs, chunk_errors in import_bibtex(lines):
+                errors.extend(chunk_errors)
+                for p in chunk_pubs:
+                    if bib_dup_mode == "Import anyway":
+                        imported.append(p)
+                        continue
+                    record = p.model_dump()
+                    matches = db.dedup.find(record)
+                    if not matches:
+                        # Later entries in the same file are checked against this one too
+                        db.dedup.add(record)
+                        row_of.setdefault(fingerprint(record), len(merged))
+                        merged.append(p)
+                        imported.append(p)
+                        continue
+                    duplicates.append({"entry": p.title, "duplicate of": describe_match(matches[0])})
+                    target = row_of.get(matches[0]["fingerprint"], -1)
+                    if bib_dup_mode == "Merge into existing" and target >= 0:
+                        merged[target] = merge_publications(merged[target], p)
+                done = len(imported) + len(errors) + len(duplicates)
+                progress.progress(min(1.0, done / max(1, n_entries)), text=f"Parsed {done} of ~{n_entries} entries")
+            lines.detach()
+
+            try:
+                if bib_dup_mode != "Import anyway":
+                    if imported or (duplicates and bib_dup_mode == "Merge into existing"):
+                        db.save_publications(merged, pubs_version)
+                elif imported:
+                    db.save_publications(pubs + imported, pubs_version)
+            except ConflictError as e:
+                st.error(f"Not imported: {e}. Run the import again.")
+                st.stop()
+            if imported:
+                st.success(f"Successfully imported {len(imported)} papers!")
+            if duplicates:
+                verb = "Merged" if bib_dup_mode == "Merge into existing" else "Skipped"
+                st.info(f"{verb} {len(duplicates)} duplicate entries.")
+                st.dataframe(duplicates, use_container_width=True)
+            if errors:
+                st.warning(f"Skipped {len(errors)} entries with errors.")
+                st.dataframe([{"entry": key, "error": msg} for key, msg in errors], use_container_width=True)
+            elif imported and not duplicates:
                 st.rerun()
-                
-        except Exception as e:
-            st.error(f"Error parsing BibTeX: {e}")
 
 with tab_add:
     st.subheader("Add Publication")
@@ -203,54 +326,65 @@ with tab_list:
         if st.checkbox("Show Preview of All Publications"):
             from preview_utils import render_publications_preview
             render_publications_preview(pubs)
-        
-        # Sort by year desc
-        sorted_pubs = sorted(list(enumerate(pubs)), key=lambda x: x[1].year, reverse=True)
-        
-        for original_idx, pub in sorted_pubs:
-            with st.expander(f"[{pub.year}] {pub.title}"):
-                with st.form(f"edit_pub_{original_idx}"):
-                    e_title = st.text_input("Title", value=pub.title)
-                    e_authors = st.text_input("Authors", value=pub.authors)
-                    e_year = st.number_input("Year", value=pub.year)
-                    e_venue = st.text_input("Venue", value=pub.venue)
-                    e_abstract = st.text_area("Abstract", value=pub.abstract)
-                    e_doi = st.text_input("DOI", value=pub.doi or "")
-                    e_pdf = st.text_input("PDF Link", value=pub.pdf_link or "")
-                    e_code = st.text_input("Code Link", value=pub.code_link or "")
-                    e_bibtex = st.text_area("BibTeX Citation", value=pub.bibtex or "")
-                    e_bibtex = st.text_area("BibTeX Citation", value=pub.bibtex or "")
-                    e_tags = st.text_input("Tags", value=", ".join(pub.tags))
-                    
-                    e_visible = st.toggle("Published", value=pub.visible)
-                    if not e_visible:
-                        st.caption("🚫 This publication is hidden.")
-
-                    saved = st.form_submit_button("Update")
-                    if saved:
-                        tag_list = [t.strip() for t in e_tags.split(",") if t.strip()]
-                        p = Publication(
-                            title=e_title, authors=e_authors, year=e_year, venue=e_venue,
-                            abstract=e_abstract, doi=e_doi if e_doi else None,
-                            pdf_link=e_pdf if e_pdf else None, code_link=e_code if e_code else None,
-                            bibtex=e_bibtex if e_bibtex else None,
-                            tags=tag_list,
-                            visible=e_visible
-                        )
-                        save_pub(p, original_idx)
-                
-                c_del, c_promote = st.columns([1, 1])
-                with c_del:
-                    if st.button(f"Delete '{pub.title[:20]}...'", key=f"del_pub_{original_idx}"):
-                        delete_pub(original_idx)
-                
-                with c_promote:
-                    if st.button(f"📢 Promote to News", key=f"prom_pub_{original_idx}"):
-                        from data_manager import NewsItem
-                        n_title = f"New Paper Published: {pub.title}"
-                        n_content = f"We are excited to announce our new paper **{pub.title}** has been published in *{pub.venue}* ({pub.year}).\n\nAuthors: {pub.authors}\n\n[Read PDF]({pub.pdf_link or '#'}) | [DOI](https://doi.org/{pub.doi or ''})"
-                        
-                        from datetime import date
-                        n = NewsItem(title=n_title, content=n_content, publish_date=date.today().isoformat(), featured=True)
-                        db.save_news(db.get_news() + [n])
-                        st.success("News Draft Created! Check the News tab.")
+
+        def render_pub_editor(_, pub: Publication):
+            with st.form(f"edit_pub_{pub.id}"):
+                e_title = st.text_input("Title", value=pub.title)
+                e_authors = st.text_input("Authors", value=pub.authors)
+                e_year = st.number_input("Year", value=pub.year)
+                e_venue = st.text_input("Venue", value=pub.venue)
+                e_abstract = st.text_area("Abstract", value=pub.abstract)
+                e_doi = st.text_input("DOI", value=pub.doi or "")
+                e_pdf = st.text_input("PDF Link", value=pub.pdf_link or "")
+                e_code = st.text_input("Code Link", value=pub.code_link or "")
+                e_bibtex = st.text_area("BibTeX Citation", value=pub.bibtex or "")
+                e_tags = st.text_input("Tags", value=", ".join(pub.tags))
+
+                e_visible = st.toggle("Published", value=pub.visible)
+                if not e_visible:
+                    st.caption("🚫 This publication is hidden.")
+
+                saved = st.form_submit_button("Update")
+                if saved:
+                    tag_list = [t.strip() for t in e_tags.split(",") if t.strip()]
+                    p = Publication(
+                        id=pub.id, version=pub.version, title=e_title, authors=e_authors, year=e_year, venue=e_venue,
+                        abstract=e_abstract, doi=e_doi if e_doi else None,
+                        pdf_link=e_pdf if e_pdf else None, code_link=e_code if e_code else None,
+                        bibtex=e_bibtex if e_bibtex else None,
+                        tags=tag_list,
+                        visible=e_visible
+                    )
+                    save_pub(p)
+
+            c_del, c_promote = st.columns([1, 1])
+            with c_del:
+                if st.button(f"Delete '{pub.title[:20]}...'", key=f"del_pub_{pub.id}"):
+                    delete_pub(pub)
+
+            with c_promote:
+                if st.button(f"📢 Promote to News", key=f"prom_pub_{pub.id}"):
+                    from data_manager import NewsItem
+                    n_title = f"New Paper Published: {pub.title}"
+                    n_content = f"We are excited to announce our new paper **{pub.title}** has been published in *{pub.venue}* ({pub.year}).\n\nAuthors: {pub.authors}\n\n[Read PDF]({pub.pdf_link or '#'}) | [DOI](https://doi.org/{pub.doi or ''})"
+
+                    from datetime import date
+                    n = NewsItem(title=n_title, content=n_content, publish_date=date.today().isoformat(), featured=True)
+                    db.upsert("news", n)
+                    st.success("News Draft Created! Check the News tab.")
+
+        from list_view import paged_list
+        paged_list(
+            db, "publications.json", pubs, "pubs_list",
+            row_label=lambda p: f"**{p.year}** · {p.title}" + ("" if p.visible else " 🚫"),
+            search_text=lambda p: f"{p.title} {p.authors} {p.venue} {p.year} {' '.join(p.tags)} {p.doi or ''}",
+            sort_options={
+                "Year (newest first)": (lambda p: p.year, True),
+                "Year (oldest first)": (lambda p: p.year, False),
+                "Title": (lambda p: p.title.lower(), False),
+            },
+            render_editor=render_pub_editor,
+            placeholder="Title, author, venue, tag or year...",
+        )
+
+end_page_rerun()
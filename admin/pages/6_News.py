@@ -1,28 +1,34 @@
 import streamlit as st
-from data_manager import DataLayer, NewsItem
+from data_manager import DataLayer, NewsItem, ConflictError
 from auth import check_password
+from telemetry import page_rerun, end_page_rerun
 from datetime import date
 
 if not check_password():
     st.stop()
 
+page_rerun("News")
+
 st.title("📰 News")
 
 db = DataLayer()
 news = db.get_news()
 
-def save_news(item: NewsItem, index: int = -1):
-    if index >= 0:
-        news[index] = item
-    else:
-        news.append(item)
-    db.save_news(news)
+def save_news(item: NewsItem):
+    try:
+        db.upsert("news", item)
+    except ConflictError as e:
+        st.error(f"Not saved: {e}. Reload the entry and apply your change again.")
+        return
     st.success("News item saved!")
     st.rerun()
 
-def delete_news(index: int):
-    news.pop(index)
-    db.save_news(news)
+def delete_news(item: NewsItem):
+    try:
+        db.delete("news", item.id, expected_version=item.version)
+    except ConflictError as e:
+        st.error(f"Not deleted: {e}.")
+        return
     st.success("Deleted!")
     st.rerun()
 
@@ -61,44 +67,56 @@ with tab_add:
                 save_news(n)
 
 with tab_list:
-    if not news:
-        st.info("No news items.")
-    else:
-        # Sort by date desc
-        sorted_news = sorted(list(enumerate(news)), key=lambda x: x[1].publish_date, reverse=True)
-
-        for original_idx, item in sorted_news:
-            with st.expander(f"{item.publish_date} - {item.title}"):
-                with st.form(f"edit_news_{original_idx}"):
-                    e_title = st.text_input("Title", value=item.title)
-                    
-                    # Parse date string back to date object
-                    try:
-                        e_date_val = date.fromisoformat(item.publish_date)
-                    except ValueError:
-                        e_date_val = date.today()
-                    
-                    e_date = st.date_input("Date", value=e_date_val)
-                    
-                    ec_edit, ec_view = st.columns(2)
-                    with ec_edit:
-                        e_content = st.text_area("Content", value=item.content, height=300)
-                    with ec_view:
-                        st.markdown("### Preview")
-                        if e_content:
-                            st.markdown(e_content)
-                    
-                    e_featured = st.checkbox("Featured?", value=item.featured)
-
-                    saved = st.form_submit_button("Update")
-                    if saved:
-                        n = NewsItem(
-                            title=e_title,
-                            content=e_content,
-                            publish_date=e_date.isoformat(),
-                            featured=e_featured
-                        )
-                        save_news(n, original_idx)
-                
-                if st.button(f"Delete '{item.title}'", key=f"del_news_{original_idx}"):
-                    delete_news(original_idx)
+    def render_news_editor(_, item: NewsItem):
+        with st.form(f"edit_news_{item.id}"):
+            e_title = st.text_input("Title", value=item.title)
+
+            # Parse date string back to date object
+            try:
+                e_date_val = date.fromisoformat(item.publish_date)
+            except ValueError:
+                e_date_val = date.today()
+
+            e_date = st.date_input("Date", value=e_date_val)
+
+            ec_edit, ec_view = st.columns(2)
+            with ec_edit:
+                e_content = st.text_area("Content", value=item.content, height=300)
+            with ec_view:
+                st.markdown("### Preview")
+                if e_content:
+                    st.markdown(e_content)
+
+            e_featured = st.checkbox("Featured?", value=item.featured)
+            e_visible = st.toggle("Published (Visible on Website)", value=item.visible)
+
+            if st.form_submit_button("Update"):
+                n = NewsItem(
+                    id=item.id,
+                    version=item.version,
+                    title=e_title,
+                    content=e_content,
+                    publish_date=e_date.isoformat(),
+                    featured=e_featured,
+                    visible=e_visible
+                )
+                save_news(n)
+
+        if st.button(f"Delete '{item.title}'", key=f"del_news_{item.id}"):
+            delete_news(item)
+
+    from list_view import paged_list
+    paged_list(
+        db, "news.json", news, "news_list",
+        row_label=lambda n: f"**{n.publish_date}** · {n.title}" + (" ⭐" if n.featured else "") + ("" if n.visible else " 🚫"),
+        search_text=lambda n: f"{n.title} {n.publish_date} {n.content}",
+        sort_options={
+            "Date (newest first)": (lambda n: n.publish_date, True),
+            "Date (oldest first)": (lambda n: n.publish_date, False),
+            "Title": (lambda n: n.title.lower(), False),
+        },
+        render_editor=render_news_editor,
+        placeholder="Title, date or text...",
+    )
+
+end_page_rerun()
@@ -3,10 +3,13 @@ import os
 import shutil
 from data_manager import DataLayer
 from auth import check_password
+from telemetry import page_rerun, end_page_rerun
 
 if not check_password():
     st.stop()
 
+page_rerun("Media")
+
 st.title("🖼️ Media Library")
 
 db = DataLayer()
@@ -19,53 +22,47 @@ if not os.path.exists(uploads_dir):
     st.error(f"Uploads directory not found: {uploads_dir}")
     st.stop()
     
-all_files = [f for f in os.listdir(uploads_dir) if os.path.isfile(os.path.join(uploads_dir, f))]
-
-# 2. Check usage
-used_files = set()
+# 2. Check usage against the reference index (kept up to date on every save)
+from reference_index import scan_uploads
+active_files, orphaned_files = scan_uploads(db, uploads_dir)
 
-# Check People
-for p in db.get_people():
-    if p.photo and p.photo.startswith("/uploads/"):
-        used_files.add(p.photo.replace("/uploads/", ""))
+# --- UI ---
 
-# Check Projects
-for p in db.get_projects():
-    for img in p.images:
-        if img and img.startswith("/uploads/"):
-            used_files.add(img.replace("/uploads/", ""))
-            
-# Check Lab Info
-info = db.get_lab_info()
-if info.lab_photo and info.lab_photo.startswith("/uploads/"):
-    used_files.add(info.lab_photo.replace("/uploads/", ""))
+from thumbnails import thumbnail
 
-# 3. Categorize
-orphaned_files = []
-active_files = []
+MEDIA_PAGE_SIZE = 24
 
-for f in all_files:
-    if f in used_files:
-        active_files.append(f)
-    else:
-        # Ignore system files
-        if not f.startswith("."):
-            orphaned_files.append(f)
-
-# --- UI ---
+def thumbnail_grid(files, key):
+    """Paginated 4-column grid; only the current page's thumbnails are decoded."""
+    total_pages = max(1, (len(files) + MEDIA_PAGE_SIZE - 1) // MEDIA_PAGE_SIZE)
+    page = 0
+    if total_pages > 1:
+        page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1, key=f"{key}_page") - 1
+    page_files = files[page * MEDIA_PAGE_SIZE:(page + 1) * MEDIA_PAGE_SIZE]
+    cols = st.columns(4)
+    for i, f in enumerate(page_files):
+        with cols[i % 4]:
+            users = db.refs.users_of(f)
+            caption = f"{f} · {', '.join(users)}" if users else f
+            st.image(thumbnail(os.path.join(uploads_dir, f)), caption=caption, use_container_width=True)
 
 tab_orphans, tab_active = st.tabs([f"🗑️ Clean Up ({len(orphaned_files)})", f"✅ Active ({len(active_files)})"])
 
 with tab_orphans:
     st.markdown("### Orphaned Files")
-    st.info("These files are in your `uploads` folder but are NOT used by any Person, Project, or Lab Info. You can safely delete them.")
+    st.info("These files are in your `uploads` folder but are NOT used by the profile, lab info, any person, publication, project, or news post (including images embedded in Markdown). You can safely delete them.")
     
     if orphaned_files:
         if st.button(f"🗑️ Delete ALL {len(orphaned_files)} Orphaned Files", type="primary"):
+             from upload_utils import delete_upload
              count = 0
              for f in orphaned_files:
+                 # Re-check right before deleting in case a record started using it meanwhile
+                 if db.refs.is_referenced(f):
+                     st.warning(f"Skipped {f}: now used by {', '.join(db.refs.users_of(f))}")
+                     continue
                  try:
-                     os.remove(os.path.join(uploads_dir, f))
+                     delete_upload(f)
                      count += 1
                  except Exception as e:
                      st.error(f"Failed to delete {f}: {e}")
@@ -74,10 +71,7 @@ with tab_orphans:
              
         st.divider()
         st.write("Preview:")
-        cols = st.columns(4)
-        for i, f in enumerate(orphaned_files):
-             with cols[i % 4]:
-                 st.image(os.path.join(uploads_dir, f), caption=f, use_container_width=True)
+        thumbnail_grid(orphaned_files, "orphans")
     else:
         st.success("Clean! No orphaned files found.")
 
@@ -86,9 +80,8 @@ with tab_active:
     st.info("These files are currently in use.")
     
     if active_files:
-        cols = st.columns(4)
-        for i, f in enumerate(active_files):
-             with cols[i % 4]:
-                 st.image(os.path.join(uploads_dir, f), caption=f, use_container_width=True)
+        thumbnail_grid(active_files, "active")
     else:
         st.info("No active files found.")
+
+end_page_rerun()
@@ -1,12 +1,15 @@
 import streamlit as st
-import subprocess
 import os
+import time
 
 from auth import check_password
+from telemetry import page_rerun, end_page_rerun
 
 if not check_password():
     st.stop()
 
+page_rerun("Settings")
+
 st.title("⚙️ Settings & Deployment")
 
 st.markdown("""
@@ -16,62 +19,173 @@ The website is **static**, meaning it needs to be rebuilt to show the changes yo
 Click the button below to trigger a rebuild of the public website.
 """)
 
-if st.button("♻️ Rebuild Website Changes", type="primary"):
-    with st.spinner("Rebuilding website... this may take a minute..."):
-        try:
-            # pages -> admin -> root
-            root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            web_dir = os.path.join(root_dir, "web")
-            
-            # Run npm run build
-            result = subprocess.run(
-                ["npm", "run", "build"], 
-                cwd=web_dir, 
-                capture_output=True, 
-                text=True
-            )
-            
-            if result.returncode == 0:
-                st.success("✅ Website successfully rebuilt!")
-                with st.expander("Show Build Logs"):
-                    st.code(result.stdout)
-            else:
-                st.error("❌ Build failed!")
-                st.error(result.stderr)
-        except Exception as e:
-            st.error(f"Error triggering build: {e}")
+from build_manager import get_manager
+builder = get_manager()
+
+if not builder.running:
+    pending = builder.pending_changes()
+    n_pending = sum(len(v) for v in pending.values())
+    if n_pending:
+        st.caption(f"{n_pending} file(s) changed since the last successful build.")
+        with st.expander("Show changed files"):
+            st.json(pending)
+    else:
+        st.caption("No content changes since the last successful build.")
+
+c_build, c_force = st.columns([2, 1])
+with c_force:
+    force_build = st.checkbox("Rebuild even if nothing changed")
+with c_build:
+    build_clicked = st.button("♻️ Rebuild Website Changes", type="primary")
+
+if build_clicked:
+    try:
+        outcome = builder.request(force=force_build)
+    except Exception as e:
+        st.error(f"Error triggering build: {e}")
+    else:
+        if outcome == "unchanged":
+            st.info("Nothing changed since the last build; skipped.")
+        elif outcome == "queued":
+            st.info("A build is already running; another one will follow it with the latest changes.")
+            # The follow-up claims the next id when the running build ends
+            st.session_state["watched_build"] = builder.build_id + 1
+        else:
+            st.session_state["watched_build"] = builder.build_id
+
+
+@st.fragment(run_every=1)
+def build_progress():
+    """Tails the build log once a second, without holding up the rest of the page."""
+    if not builder.running:
+        # Rerun the whole page, for the result and the refreshed pending changes
+        st.rerun()
+    queued = " (another build queued)" if builder.queued else ""
+    st.info(f"⏳ Building… {int(time.time() - (builder.started_at or time.time()))}s{queued}")
+    with st.expander("Changed files in this build"):
+        st.json(builder.last_changes)
+    st.code(builder.log_tail() or "(no output yet)")
+
 
-    st.error(f"Error triggering build: {e}")
+if builder.running:
+    build_progress()
+elif st.session_state.get("watched_build") == builder.build_id:
+    # The outcome of the build this session asked for; other sessions do not see it
+    if builder.status == "succeeded":
+        st.success(f"✅ Website successfully rebuilt in {int(builder.finished_at - builder.started_at)}s!")
+    elif builder.status == "unchanged":
+        st.info("Queued build skipped; nothing changed.")
+    elif builder.status == "failed":
+        st.error(f"❌ Build failed (exit code {builder.returncode})!")
+        st.code(builder.log_tail() or "(no output)")
 
 st.divider()
 
 st.subheader("🚑 Disaster Recovery")
-st.warning("Restoring from backup will OVERWRITE all current data. Proceed with caution.")
-uploaded_backup = st.file_uploader("Upload Backup Zip", type="zip")
-if uploaded_backup:
-    if st.button("🚨 Restore Data Now"):
-        import zipfile
-        import shutil
-        
-        try:
-            # Save upload to temp
-            with open("temp_restore.zip", "wb") as f:
-                f.write(uploaded_backup.getbuffer())
-            
-            # Unzip to data dir
-            root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            data_dir = os.path.join(root_dir, "data")
-            
-            with zipfile.ZipFile("temp_restore.zip", 'r') as zip_ref:
-                zip_ref.extractall(data_dir)
-                
-            st.success("✅ Data Restored Successfully! Refreshing...")
-            os.remove("temp_restore.zip")
+st.warning("Restoring from backup will OVERWRITE all current data. The backup is checked first and nothing changes until you confirm.")
+from backup import BACKUP_DIR, list_backups
+from restore import RestoreError, stage_restore
+
+backup_names = list_backups()
+restore_from = st.radio("Restore from", ["Backups folder", "Upload a backup zip"], horizontal=True,
+                        index=0 if backup_names else 1)
+restore_source, restore_label = None, None
+if restore_from == "Backups folder":
+    if backup_names:
+        restore_label = st.selectbox("Backup", backup_names)
+        restore_source = os.path.join(BACKUP_DIR, restore_label)
+    else:
+        st.info(f"No backups in {BACKUP_DIR} yet.")
+else:
+    uploaded_backup = st.file_uploader("Upload Backup Zip", type="zip",
+                                       help="Large archives are better copied into the backups folder on the server.")
+    if uploaded_backup:
+        restore_source, restore_label = uploaded_backup, uploaded_backup.name
+
+if restore_source is not None and st.button("🔍 Check Backup"):
+    previous_stage = st.session_state.pop("staged_restore", None)
+    if previous_stage is not None:
+        previous_stage.discard()
+    progress_bar = st.progress(0.0, text="Unpacking...")
+    try:
+        st.session_state["staged_restore"] = stage_restore(
+            restore_source, restore_label, progress=lambda fraction, text: progress_bar.progress(min(fraction, 1.0), text=text))
+    except RestoreError as e:
+        st.error(f"Cannot restore this backup: {e}")
+    except Exception as e:
+        st.error(f"Checking the backup failed: {e}")
+    progress_bar.empty()
+
+staged = st.session_state.get("staged_restore")
+if staged is not None:
+    st.markdown(f"**Checked:** {staged.label}")
+    for message in staged.errors:
+        st.error(message)
+    for message in staged.warnings:
+        st.warning(message)
+    st.caption("What the restore changes, compared with the current data:")
+    st.dataframe(staged.diff, hide_index=True, use_container_width=True)
+
+    c_restore, c_discard = st.columns([2, 1])
+    with c_discard:
+        if st.button("Discard"):
+            staged.discard()
+            st.session_state.pop("staged_restore", None)
             st.rerun()
-        except Exception as e:
-            st.error(f"Restore failed: {e}")
+    with c_restore:
+        if staged.ok:
+            confirmed = st.checkbox(f"Replace the current data with {staged.label}")
+            if st.button("🚨 Restore Data Now", type="primary", disabled=not confirmed):
+                try:
+                    previous_dir = staged.apply()
+                except Exception as e:
+                    st.error(f"Restore failed: {e}")
+                else:
+                    st.session_state.pop("staged_restore", None)
+                    st.success(f"✅ Data restored. The replaced data is kept in {previous_dir}.")
+                    time.sleep(1)
+                    st.rerun()
+        else:
+            st.error("This backup did not pass the checks and cannot be restored.")
 
-            st.error(f"Restore failed: {e}")
+st.divider()
+
+st.subheader("🕰️ Version History")
+with st.expander("Browse past versions"):
+    from data_manager import DataLayer, ConflictError
+    history_db = DataLayer()
+    HISTORY_COLLECTIONS = {
+        "People": "people", "Publications": "publications", "Projects": "projects",
+        "News": "news", "Profile": "profile", "Lab Info": "lab_info",
+    }
+    h_label = st.selectbox("Collection", list(HISTORY_COLLECTIONS.keys()))
+    h_name = HISTORY_COLLECTIONS[h_label]
+    snapshots = history_db.history.list_snapshots(h_name)
+    if not snapshots:
+        st.info("No versions recorded yet.")
+    else:
+        h_id = st.selectbox("Version", snapshots[:200])
+        h_info = history_db.history.snapshot_info(h_name, h_id)
+        st.caption(f"Saved {h_info['time']} · {h_info['records']} record(s)")
+        # Load through the getter so the current version is known; a restore is checked against
+        # the version shown on the previous run, like any other save
+        getattr(history_db, f"get_{h_name}")()
+        current_version = history_db.versions[f"{h_name}.json"]
+        base_version = st.session_state.get("history_versions", {}).get(h_name, current_version)
+        if st.button("⏪ Restore this version"):
+            try:
+                history_db.restore_version(h_name, h_id, base_version)
+            except ConflictError:
+                st.error(f"Not restored: {h_label} was changed by someone else in the meantime. Check the versions again.")
+                st.session_state["history_versions"] = {h_name: current_version}
+            except Exception as e:
+                st.error(f"Restore failed: {e}")
+            else:
+                st.session_state.pop("history_versions", None)
+                st.success(f"{h_label} restored to {h_id}.")
+                st.rerun()
+        else:
+            st.session_state["history_versions"] = {h_name: current_version}
 
 st.divider()
 
@@ -140,61 +254,90 @@ st.divider()
 st.subheader("🏥 Health Check")
 st.info("Check for broken links (404s) in your data.")
 
+force_recheck = st.checkbox("Re-check every link (ignore stored results)")
 if st.button("Run Health Check"):
-    import requests
+    import datetime
     from data_manager import DataLayer
+    from link_checker import LinkChecker, LinkResultStore, check_incremental, collect_links
     db = DataLayer()
-    
-    links_to_check = []
-    
-    # Collect links
-    for p in db.get_people():
-        if p.photo: links_to_check.append(("Person Photo", p.name, p.photo))
-    
-    for pub in db.get_publications():
-        if pub.pdf_link: links_to_check.append(("Pub PDF", pub.title, pub.pdf_link))
-        if pub.code_link: links_to_check.append(("Pub Code", pub.title, pub.code_link))
-        if pub.doi: links_to_check.append(("Pub DOI", pub.title, f"https://doi.org/{pub.doi}"))
-        
-    for proj in db.get_projects():
-        for img in proj.images:
-            if img: links_to_check.append(("Project Image", proj.title, img))
-            
+
+    links_to_check = collect_links(db)
+    store = LinkResultStore(db.data_dir)
     st.write(f"checking {len(links_to_check)} links...")
-    
+
     issues = []
+    probed = 0
     progress_bar = st.progress(0)
-    
-    for i, (kind, name, url) in enumerate(links_to_check):
-        progress_bar.progress((i + 1) / len(links_to_check))
-        
-        # Skip local relative paths for now or check file existence
-        if url.startswith("/"):
-            # Local file check
-            web_public = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web", "public")
-            if not os.path.exists(web_public + url):
-                issues.append(f"❌ {kind} - {name}: Local file not found ({url})")
-            continue
-            
-        try:
-            r = requests.head(url, timeout=3)
-            if r.status_code >= 400:
-                 # Fallback to get
-                 r = requests.get(url, timeout=3)
-                 if r.status_code >= 400:
-                    issues.append(f"❌ {kind} - {name}: {r.status_code} ({url})")
-        except:
-            issues.append(f"❌ {kind} - {name}: Connection Error ({url})")
-            
+    issues_table = st.empty()
+
+    checker = LinkChecker()
+    try:
+        for i, result in enumerate(check_incremental(checker, store, links_to_check, force=force_recheck)):
+            progress_bar.progress((i + 1) / len(links_to_check))
+            probed += not result["cached"]
+            if not result["ok"]:
+                reason = result["error"] or result["status"]
+                checked = datetime.datetime.fromtimestamp(result["checked_at"]).strftime("%Y-%m-%d %H:%M")
+                issues.append({"Kind": result["kind"], "Name": result["name"], "Problem": str(reason),
+                               "URL": result["url"], "Checked": checked})
+                issues_table.dataframe(issues, use_container_width=True)
+    finally:
+        checker.close()
+
+    st.caption(f"Probed {probed} link(s); {len(links_to_check) - probed} result(s) reused from earlier runs.")
     if not issues:
         st.success("✅ All links are healthy!")
     else:
-        st.error(f"Found {len(issues)} broken links:")
-        for issue in issues:
-            st.write(issue)
+        st.error(f"Found {len(issues)} broken links.")
 
 st.divider()
 
 st.subheader("System Info")
-st.info("Data Storage: JSON Files (Local)")
+from data_manager import STORAGE_BACKEND, SQLITE_PATH
+if STORAGE_BACKEND == "sqlite":
+    st.info(f"Data Storage: SQLite ({SQLITE_PATH})")
+    if st.button("📤 Export SQLite to JSON (for the website build)"):
+        from sqlite_store import export_json
+        export_json(SQLITE_PATH, os.path.join(root_dir, "data"))
+        st.success("Exported data/*.json")
+else:
+    st.info("Data Storage: JSON Files (Local)")
 st.info(f"Data Directory: {os.path.join(root_dir, 'data')}")
+
+from data_manager import get_cache_stats
+cache_stats = get_cache_stats()
+st.caption(f"Model cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['entries']} files cached)")
+
+# --- Diagnostics (hidden: open the page with ?diagnostics=1) ---
+if st.query_params.get("diagnostics") == "1":
+    import telemetry
+    st.divider()
+    st.subheader("🩺 Diagnostics")
+    st.caption(f"Timings of page reruns and data layer operations since this admin process started. "
+               f"Anything slower than {telemetry.SLOW_SECONDS:g} s is logged with its breakdown to {telemetry.SLOW_LOG_PATH}.")
+    rows = telemetry.summary()
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nothing timed yet.")
+
+    slow = telemetry.slow_operations()
+    st.markdown(f"**Slow operations** ({len(slow)} recent)")
+    for entry in slow[:10]:
+        with st.expander(f"{entry['time']} · {entry['name']} · {entry['seconds']:.2f} s"):
+            st.code("\n".join(entry["breakdown"]), language=None)
+
+    c_export, c_reset = st.columns(2)
+    if c_export.button("Write Prometheus metrics file"):
+        try:
+            telemetry.write_prometheus()
+            st.success(f"Written to {telemetry.METRICS_PATH}")
+        except OSError as e:
+            st.error(f"Writing metrics failed: {e}")
+    if c_reset.button("Reset timings"):
+        telemetry.reset()
+        st.rerun()
+    with st.expander("Prometheus text"):
+        st.code(telemetry.prometheus_text(), language=None)
+
+end_page_rerun()
@@ -0,0 +1,191 @@
+import json
+import os
+import re
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+# Matches upload paths anywhere in a string: plain fields, Markdown images and links, raw HTML.
+UPLOAD_REF = re.compile(r"/uploads/[^\s\"'()<>\[\]]+")
+
+INDEX_FILE = "upload_refs.json"
+
+# Every file whose records may point at uploads, with a label for single-object files.
+INDEXED_FILES = {
+    "profile.json": "Profile",
+    "lab_info.json": "Lab Info",
+    "people.json": None,
+    "publications.json": None,
+    "projects.json": None,
+    "news.json": None,
+}
+
+_lock = threading.Lock()
+# Parsed index per file, shared by every DataLayer in the process and reloaded only when the file changes
+_states: Dict[str, Dict[str, Any]] = {}
+
+
+def _strings(value: Any):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+
+
+def _record_label(filename: str, record: Dict[str, Any]) -> str:
+    collection = filename.split('.')[0].replace('_', ' ').title()
+    return f"{collection}: {record.get('name') or record.get('title') or '(untitled)'}"
+
+
+def _record_refs(filename: str, record: Any) -> Tuple[str, List[str]]:
+    """The label of one record and the distinct uploads it references."""
+    if not isinstance(record, dict):
+        return "", []
+    uploads: Dict[str, None] = {}
+    for text in _strings(record):
+        if "/uploads/" in text:
+            uploads.update(dict.fromkeys(UPLOAD_REF.findall(text)))
+    return INDEXED_FILES.get(filename) or _record_label(filename, record), list(uploads)
+
+
+def extract_refs(filename: str, data: Any) -> Dict[str, List[str]]:
+    """
+    Maps each /uploads/... path referenced in a collection to the records that
+    use it, one label per record, so one record's change can be applied alone.
+    """
+    refs: Dict[str, List[str]] = {}
+    records = data if isinstance(data, list) else [data]
+    for record in records:
+        label, uploads = _record_refs(filename, record)
+        for upload in uploads:
+            refs.setdefault(upload, []).append(label)
+    return refs
+
+
+class ReferenceIndex:
+    """
+    Which records use which uploads, across every collection and Markdown field.
+
+    Stored per collection in data/upload_refs.json and replaced for one
+    collection on every DataLayer save, so the Media Library can answer
+    "is this file used, and by whom?" with a dictionary lookup instead of
+    loading every collection on each rerun.
+    """
+
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, INDEX_FILE)
+        self._state = _states.setdefault(self.path, {"stamp": None, "collections": {}, "merged": {}})
+
+    def _load(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._state.update(stamp=None, collections={}, merged={})
+            return
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._state["stamp"]:
+            return
+        try:
+            with open(self.path, "r") as f:
+                collections = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            collections = {}
+        self._state.update(stamp=stamp, collections=collections)
+        self._merge()
+
+    def _merge(self):
+        merged: Dict[str, List[str]] = {}
+        for refs in self._state["collections"].values():
+            for upload, users in refs.items():
+                merged.setdefault(upload, []).extend(users)
+        self._state["merged"] = merged
+
+    def _write(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._state["collections"], f)
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._state["stamp"] = (st.st_mtime_ns, st.st_size)
+
+    def update(self, filename: str, data: Any):
+        """Replaces the references of one collection after it was saved."""
+        if filename not in INDEXED_FILES:
+            return
+        with _lock:
+            self._load()
+            self._state["collections"][filename] = extract_refs(filename, data)
+            self._write()
+            self._merge()
+
+    def change(self, filename: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        """
+        Applies a single-record save: the references of `old` (as stored before,
+        None when added) replaced by those of `new` (None when deleted). The index
+        file is only rewritten when the record's references actually changed.
+        """
+        if filename not in INDEXED_FILES:
+            return
+        before, after = _record_refs(filename, old), _record_refs(filename, new)
+        if before == after:
+            return
+        with _lock:
+            self._load()
+            refs = self._state["collections"].get(filename)
+            if refs is None:
+                # Not indexed yet; ensure_built will read the whole collection
+                return
+            label, uploads = before
+            for upload in uploads:
+                users = refs.get(upload, [])
+                if label in users:
+                    users.remove(label)
+                    if not users:
+                        del refs[upload]
+            label, uploads = after
+            for upload in uploads:
+                refs.setdefault(upload, []).append(label)
+            self._write()
+            self._merge()
+
+    def ensure_built(self, db):
+        """Indexes any collection missing from the index (first run, or after a restore)."""
+        with _lock:
+            self._load()
+            missing = [f for f in INDEXED_FILES if f not in self._state["collections"]]
+            if not missing:
+                return
+            for filename in missing:
+                self._state["collections"][filename] = extract_refs(filename, db._load_json(filename, {} if INDEXED_FILES[filename] else []))
+            self._write()
+            self._merge()
+
+    def references(self) -> Dict[str, List[str]]:
+        """Upload path -> labels of the records using it."""
+        with _lock:
+            self._load()
+            return self._state["merged"]
+
+    def users_of(self, upload_name: str) -> List[str]:
+        """Records using the file `upload_name` in web/public/uploads (empty if unused)."""
+        return list(dict.fromkeys(self.references().get(f"/uploads/{upload_name}", [])))
+
+    def is_referenced(self, upload_name: str) -> bool:
+        return bool(self.users_of(upload_name))
+
+
+def scan_uploads(db, uploads_dir: str) -> Tuple[List[str], List[str]]:
+    """(active, orphaned) files in `uploads_dir`, checked against the reference index; hidden files are never orphans."""
+    db.refs.ensure_built(db)
+    active, orphaned = [], []
+    for f in os.listdir(uploads_dir):
+        if not os.path.isfile(os.path.join(uploads_dir, f)):
+            continue
+        if db.refs.is_referenced(f):
+            active.append(f)
+        elif not f.startswith("."):
+            orphaned.append(f)
+    return active, orphaned
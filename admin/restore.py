@@ -0,0 +1,475 @@
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import stat
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backup import BACKUP_DIR, DATA_DIR, MANIFEST_NAME, SOURCES, SQLITE_EXTENSIONS
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Staged restores and the data they replaced; inside the repo so renames stay on one filesystem
+RESTORE_DIR = os.path.join(ROOT_DIR, ".cache", "restore")
+# Restores kept around (staged or replaced data), newest first; older ones are deleted
+KEEP_RESTORES = 3
+CHUNK_SIZE = 1024 * 1024
+
+# Files validated against the models; single objects load as blank forms when invalid, so they only warn
+MODEL_FILES = {"profile.json": "profile", "lab_info.json": "lab_info", "people.json": "people",
+               "publications.json": "publications", "projects.json": "projects", "news.json": "news"}
+SINGLE_OBJECT_FILES = {"profile.json", "lab_info.json"}
+MAX_REPORTED_ERRORS = 5
+
+
+class RestoreError(Exception):
+    """The archive cannot be restored (unreadable, unsafe, incomplete or invalid)."""
+
+
+# --- Archive entries ---
+
+def _check_name(name: str):
+    """Rejects entries that could write outside the staging directory."""
+    parts = name.split("/")
+    if (name.startswith("/") or "\\" in name or "\0" in name or ":" in parts[0]
+            or any(p in ("", ".", "..") for p in parts)):
+        raise RestoreError(f"Unsafe path in archive: {name!r}")
+
+
+def _is_symlink(info: zipfile.ZipInfo) -> bool:
+    return stat.S_ISLNK(info.external_attr >> 16)
+
+
+def _hidden(name: str) -> bool:
+    return any(p.startswith(".") for p in name.split("/"))
+
+
+class _Source:
+    """The files to restore: archive path -> (zip file, member, expected sha256 or None)."""
+
+    def __init__(self, archive, backup_dir: str):
+        self.stack = ExitStack()
+        self.archives: Dict[str, zipfile.ZipFile] = {}
+        self.entries: Dict[str, Tuple[zipfile.ZipFile, zipfile.ZipInfo, Optional[str]]] = {}
+        self.manifest: Optional[Dict[str, Any]] = None
+        self.warnings: List[str] = []
+        try:
+            head = self.stack.enter_context(zipfile.ZipFile(archive))
+        except (zipfile.BadZipFile, OSError) as e:
+            self.close()
+            raise RestoreError(f"Not a readable zip archive: {e}")
+        try:
+            self._collect(head, backup_dir)
+        except BaseException:
+            self.close()
+            raise
+
+    def _members(self, zf: zipfile.ZipFile) -> Dict[str, zipfile.ZipInfo]:
+        members = {}
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            _check_name(info.filename)
+            if _is_symlink(info):
+                raise RestoreError(f"Symbolic link in archive: {info.filename!r}")
+            if info.filename in members:
+                raise RestoreError(f"Duplicate entry in archive: {info.filename!r}")
+            members[info.filename] = info
+        return members
+
+    def _collect(self, head: zipfile.ZipFile, backup_dir: str):
+        members = self._members(head)
+        if MANIFEST_NAME not in members:
+            # Archives from before uploads were backed up: the contents of data/ at the root
+            for name, info in members.items():
+                if _hidden(name):
+                    continue
+                self.entries[f"data/{name}"] = (head, info, None)
+            self.warnings.append("Older backup format without uploads: only data/ will be replaced.")
+            return
+
+        try:
+            self.manifest = json.loads(head.read(MANIFEST_NAME))
+            files = self.manifest["files"]
+            own_name = self.manifest["name"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise RestoreError(f"Unreadable backup manifest: {e}")
+        self.archives[own_name] = head
+        by_archive = {own_name: members}
+        for name, entry in files.items():
+            _check_name(name)
+            if name.split("/")[0] not in SOURCES:
+                raise RestoreError(f"Unexpected path in backup manifest: {name!r}")
+            holder = entry.get("in", own_name)
+            if holder not in self.archives:
+                # Incremental backups take unchanged files from earlier archives of their chain
+                path = os.path.join(backup_dir, os.path.basename(holder))
+                if not os.path.exists(path):
+                    raise RestoreError(f"This incremental backup needs {holder}, which is not in {backup_dir}.")
+                try:
+                    self.archives[holder] = self.stack.enter_context(zipfile.ZipFile(path))
+                except (zipfile.BadZipFile, OSError) as e:
+                    raise RestoreError(f"Cannot read {holder}: {e}")
+                by_archive[holder] = self._members(self.archives[holder])
+            info = by_archive[holder].get(name)
+            if info is None:
+                raise RestoreError(f"{name} is missing from {holder}.")
+            self.entries[name] = (self.archives[holder], info, entry.get("sha256"))
+
+    def close(self):
+        self.stack.close()
+
+
+# --- Validation (runs in worker processes) ---
+
+def _record_digest(record: Any) -> str:
+    body = {k: v for k, v in record.items() if k != "version"} if isinstance(record, dict) else record
+    return hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def inspect_data_file(path: str, filename: str, validate: bool = True) -> Dict[str, Any]:
+    """
+    Parses one data file and, for the model files, validates it the way a load
+    of data from outside the app would be validated. Returns errors, warnings and
+    a digest per record id (one under "" for single objects), for the diff.
+    """
+    from pydantic import TypeAdapter, ValidationError
+    from data_manager import COLLECTIONS, LabInfo, ProfessorProfile, fill_record_ids
+
+    result: Dict[str, Any] = {"file": filename, "errors": [], "warnings": [], "records": None}
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError) as e:
+        result["errors"].append(f"{filename}: not valid JSON ({e})")
+        return result
+    if filename not in MODEL_FILES:
+        return result
+
+    collection = MODEL_FILES[filename]
+    if filename in SINGLE_OBJECT_FILES:
+        model = ProfessorProfile if collection == "profile" else LabInfo
+        if validate:
+            try:
+                model.model_validate(data)
+            except ValidationError as e:
+                result["warnings"].append(f"{filename} is incomplete and will load as empty fields "
+                                          f"({len(e.errors())} problem(s), first: {e.errors()[0]['msg']})")
+        result["records"] = {"": _record_digest(data)}
+        return result
+
+    if not isinstance(data, list):
+        result["errors"].append(f"{filename}: expected a list of records")
+        return result
+    fill_record_ids(filename, data)
+    if validate:
+        try:
+            TypeAdapter(List[COLLECTIONS[collection][1]]).validate_python(data)
+        except ValidationError as e:
+            for err in e.errors()[:MAX_REPORTED_ERRORS]:
+                loc = err["loc"]
+                where = f"row {loc[0] + 1}, {'.'.join(str(p) for p in loc[1:])}" if loc else "?"
+                result["errors"].append(f"{filename} {where}: {err['msg']}")
+            if e.error_count() > MAX_REPORTED_ERRORS:
+                result["errors"].append(f"{filename}: {e.error_count() - MAX_REPORTED_ERRORS} more error(s)")
+    result["records"] = {r.get("id"): _record_digest(r) for r in data if isinstance(r, dict)}
+    return result
+
+
+def inspect_sqlite_file(path: str, filename: str) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"file": filename, "errors": [], "warnings": [], "records": None}
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            status = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        status = str(e)
+    if status != "ok":
+        result["errors"].append(f"{filename}: database check failed ({status})")
+    return result
+
+
+# --- Staging ---
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _live_files(prefix: str) -> Dict[str, str]:
+    """Archive path -> live path for one source directory, skipping what backups skip."""
+    from backup import scan_sources
+    return {name: path for name, (path, _) in scan_sources({prefix: SOURCES[prefix]}).items()}
+
+
+class StagedRestore:
+    """
+    A backup unpacked and checked next to the live data, waiting to be applied.
+    `errors` block the restore; `warnings` and `diff` are shown before confirming.
+    """
+
+    def __init__(self, restore_id: str, label: str):
+        self.id = restore_id
+        self.label = label
+        self.dir = os.path.join(RESTORE_DIR, restore_id)
+        self.staged = os.path.join(self.dir, "staged")
+        self.targets: List[str] = []
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.diff: List[Dict[str, Any]] = []
+        self.applied = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def discard(self):
+        if not self.applied:
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+    def apply(self) -> str:
+        """
+        Swaps each staged directory with the live one, holding every data file's
+        lock so no save lands in between. Returns where the replaced data was kept.
+        """
+        if not self.ok:
+            raise RestoreError("The backup did not pass validation.")
+        if self.applied:
+            raise RestoreError("This restore was already applied.")
+        from data_manager import DataLayer, _model_cache
+
+        db = DataLayer()
+        previous = os.path.join(self.dir, "previous")
+        os.makedirs(previous, exist_ok=True)
+        with ExitStack() as locks:
+            for filename in MODEL_FILES:
+                locks.enter_context(db._locked(filename))
+            for target in self.targets:
+                staged, live = os.path.join(self.staged, target), SOURCES[target]
+                locks_dir = os.path.join(live, ".locks")
+                moved_locks = target == "data" and os.path.isdir(locks_dir)
+                if moved_locks:
+                    # Lock files move along, so saves waiting on them see the restored files;
+                    # trust marks do not, so restored data is validated on its first load
+                    os.rename(locks_dir, os.path.join(staged, ".locks"))
+                    for name in os.listdir(os.path.join(staged, ".locks")):
+                        if name.endswith(".trusted"):
+                            os.remove(os.path.join(staged, ".locks", name))
+                try:
+                    if os.path.exists(live):
+                        _exchange(staged, live)
+                        os.rename(staged, os.path.join(previous, target))
+                    else:
+                        os.rename(staged, live)
+                except OSError as e:
+                    if moved_locks and not os.path.exists(locks_dir):
+                        os.rename(os.path.join(staged, ".locks"), locks_dir)
+                    raise RestoreError(f"Swapping in {target}/ failed: {e}")
+        self.applied = True
+        _model_cache.invalidate()
+        DataLayer().log_action("RESTORE", f"Restored backup {self.label} ({', '.join(self.targets)})")
+        _prune()
+        return previous
+
+
+def _renameat2():
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return None
+    try:
+        fn = ctypes.CDLL(libc_name, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    return fn
+
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+
+def _exchange(a: str, b: str):
+    """
+    Swaps two directories in one step with renameat2(RENAME_EXCHANGE) where the
+    kernel and libc have it (Linux); elsewhere two renames leave `b` missing for
+    an instant.
+    """
+    fn = _renameat2()
+    if fn is not None and fn(_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE) == 0:
+        return
+    side = a + ".swap"
+    os.rename(b, side)
+    os.rename(a, b)
+    os.rename(side, a)
+
+
+def _prune():
+    try:
+        names = sorted(os.listdir(RESTORE_DIR), reverse=True)
+    except FileNotFoundError:
+        return
+    for name in names[KEEP_RESTORES:]:
+        shutil.rmtree(os.path.join(RESTORE_DIR, name), ignore_errors=True)
+
+
+def _extract(source: _Source, staged_dir: str, progress: Callable[[float, str], None]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Streams every entry into the staging directory, checking hashes against the
+    manifest. Returns the errors and the sha256 of every unpacked file.
+    """
+    errors, digests = [], {}
+    total = sum(info.file_size for _, info, _ in source.entries.values()) or 1
+    done = 0
+    root = os.path.realpath(staged_dir)
+    for name, (zf, info, expected) in source.entries.items():
+        dest = os.path.realpath(os.path.join(staged_dir, *name.split("/")))
+        if not dest.startswith(root + os.sep):
+            raise RestoreError(f"Unsafe path in archive: {name!r}")
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        digest = hashlib.sha256()
+        try:
+            with zf.open(info) as src, open(dest, "wb") as out:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+        except (zipfile.BadZipFile, OSError, EOFError) as e:
+            errors.append(f"{name}: damaged in the archive ({e})")
+            continue
+        digests[name] = digest.hexdigest()
+        if expected and digests[name] != expected:
+            errors.append(f"{name}: content does not match the backup manifest")
+        done += info.file_size
+        progress(done / total * 0.6, f"Unpacked {name}")
+    return errors, digests
+
+
+def _diff_rows(targets: List[str], staged: Dict[str, str], results: Dict[Tuple[str, str], Dict[str, Any]],
+               sizes: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Per collection: records added, removed, changed; then history, other data files and uploads by file."""
+    rows = []
+    for filename, collection in MODEL_FILES.items():
+        new = (results.get(("staged", filename)) or {}).get("records")
+        old = (results.get(("live", filename)) or {}).get("records")
+        if new is None and old is None:
+            continue
+        new, old = new or {}, old or {}
+        rows.append({
+            "Item": collection.replace("_", " ").title(),
+            "Added": len(new.keys() - old.keys()),
+            "Removed": len(old.keys() - new.keys()),
+            "Changed": sum(1 for k in new.keys() & old.keys() if new[k] != old[k]),
+            "Unchanged": sum(1 for k in new.keys() & old.keys() if new[k] == old[k]),
+        })
+
+    for target in targets:
+        live = _live_files(target)
+        prefix = target + "/"
+        names = {n for n in staged if n.startswith(prefix)} | live.keys()
+        groups: Dict[str, Dict[str, int]] = {}
+
+        def group(name: str) -> str:
+            if target == "uploads":
+                return "Uploads"
+            parts = name.split("/")
+            return "History" if len(parts) > 2 and parts[1] == "history" else "Other data files"
+
+        for name in names:
+            if target == "data" and name.count("/") == 1 and name.split("/")[1] in MODEL_FILES:
+                continue
+            row = groups.setdefault(group(name), {"Added": 0, "Removed": 0, "Changed": 0, "Unchanged": 0})
+            if name not in live:
+                row["Added"] += 1
+            elif name not in staged:
+                row["Removed"] += 1
+            elif os.path.getsize(live[name]) != sizes[name] or _file_sha256(live[name]) != staged[name]:
+                row["Changed"] += 1
+            else:
+                row["Unchanged"] += 1
+        rows.extend({"Item": label, **counts} for label, counts in sorted(groups.items()))
+    return rows
+
+
+def stage_restore(archive, label: str, backup_dir: Optional[str] = None,
+                  progress: Optional[Callable[[float, str], None]] = None) -> StagedRestore:
+    """
+    Unpacks a backup (a path or a binary file object) next to the live data and
+    checks it without touching anything live:
+    unsafe entry names (absolute, `..`, symlinks) reject the archive outright;
+    every file is streamed to disk in chunks and checked against the manifest
+    hashes; the data files are validated against the models in parallel worker
+    processes, which also compute the per-record diff against the live data.
+    Incremental backups read the rest of their chain from `backup_dir`.
+    """
+    progress = progress or (lambda fraction, text: None)
+    backup_dir = backup_dir or BACKUP_DIR
+    restore = StagedRestore(datetime.now().strftime("%Y%m%d_%H%M%S_%f"), label)
+    source = _Source(archive, backup_dir)
+    try:
+        restore.warnings.extend(source.warnings)
+        restore.targets = sorted({name.split("/")[0] for name in source.entries})
+        if "data" not in restore.targets:
+            raise RestoreError("The archive contains no data files.")
+        needed = sum(info.file_size for _, info, _ in source.entries.values())
+        os.makedirs(RESTORE_DIR, exist_ok=True)
+        free = shutil.disk_usage(RESTORE_DIR).free
+        if needed > free * 0.9:
+            raise RestoreError(f"Not enough disk space: the backup unpacks to {needed / 1e6:.0f} MB, "
+                               f"{free / 1e6:.0f} MB free.")
+        os.makedirs(restore.staged)
+        errors, digests = _extract(source, restore.staged, progress)
+        restore.errors.extend(errors)
+        sizes = {name: info.file_size for name, (_, info, _) in source.entries.items()}
+    except BaseException:
+        source.close()
+        restore.discard()
+        raise
+    source.close()
+
+    for filename in MODEL_FILES:
+        if not os.path.exists(os.path.join(restore.staged, "data", filename)):
+            restore.warnings.append(f"The backup has no {filename}; it will be empty after the restore.")
+
+    # Validate the staged data files and digest the live ones, all in parallel
+    staged_data = os.path.join(restore.staged, "data")
+    jobs = []
+    for name in sorted(os.listdir(staged_data)):
+        path = os.path.join(staged_data, name)
+        if name.endswith(".json"):
+            jobs.append((inspect_data_file, "staged", name, (path, name)))
+        elif os.path.splitext(name)[1] in SQLITE_EXTENSIONS:
+            jobs.append((inspect_sqlite_file, "staged", name, (path, name)))
+    for name in MODEL_FILES:
+        if os.path.exists(os.path.join(DATA_DIR, name)):
+            jobs.append((inspect_data_file, "live", name, (os.path.join(DATA_DIR, name), name, False)))
+
+    results: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    import multiprocessing
+    # Spawn rather than fork: the Streamlit server process is heavily threaded
+    with ProcessPoolExecutor(max_workers=max(1, min(len(jobs), os.cpu_count() or 2)),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(fn, *args): (side, name) for fn, side, name, args in jobs}
+        for i, future in enumerate(as_completed(futures), start=1):
+            side, name = futures[future]
+            try:
+                results[(side, name)] = result = future.result()
+            except Exception as e:
+                result = {"errors": [f"{name}: could not be checked ({e})"], "warnings": []}
+            if side == "staged":
+                restore.errors.extend(result["errors"])
+                restore.warnings.extend(result["warnings"])
+            progress(0.6 + 0.3 * i / len(jobs), f"Checked {name}")
+
+    restore.diff = _diff_rows(restore.targets, digests, results, sizes)
+    progress(1.0, "Ready")
+    return restore
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Any, Tuple
+
+from data_manager import DataLayer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCH_DIR = os.path.join(ROOT_DIR, "web", "public", "search")
+STATE_PATH = os.path.join(ROOT_DIR, ".cache", "search", "state.json")
+
+# Terms are sharded by their first PREFIX_LEN characters; the browser needs
+# that many typed characters before it fetches anything.
+PREFIX_LEN = 2
+# Document records are fetched in chunks of this many per collection
+DOC_CHUNK = 256
+# Doc id = collection number * ID_STRIDE + position in the collection
+ID_STRIDE = 1_000_000
+
+TITLE_WEIGHT = 3
+FIELD_WEIGHT = 1
+
+# tokenize() has a client-side counterpart in web/lib/tokenize.ts that splits
+# queries; the two must match, so change them together.
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "the", "to", "with", "we", "our", "via", "using",
+}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# (collection, site URL, result type); order fixes each collection's number in doc ids
+COLLECTIONS = (
+    ("people", "/people", "person"),
+    ("publications", "/publications", "publication"),
+    ("projects", "/projects", "project"),
+    ("news", "/news", "news"),
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _minified(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _records(db: DataLayer, collection: str) -> List[Tuple[str, str, List[str]]]:
+    """(title, subtitle, other searchable text) for each visible record of a collection."""
+    if collection == "people":
+        return [(p.name, p.role, [p.role]) for p in db.query_people(visible=True)]
+    if collection == "publications":
+        pubs = sorted(db.query_publications(visible=True), key=lambda p: p.year, reverse=True)
+        return [(p.title, f"{p.venue} {p.year}", [p.authors, p.venue, " ".join(p.tags)]) for p in pubs]
+    if collection == "projects":
+        return [(p.title, p.status, [" ".join(p.collaborators), p.funding_source or ""])
+                for p in db.query_projects(visible=True)]
+    news = sorted(db.query_news(visible=True), key=lambda n: n.publish_date, reverse=True)
+    return [(n.title, n.publish_date, []) for n in news]
+
+
+def index_collection(number: int, url: str, kind: str, records) -> Dict[str, Any]:
+    """Postings {term: {doc id: weight}} and doc rows [title, url, type, subtitle] for one collection."""
+    postings: Dict[str, Dict[int, int]] = {}
+    docs = []
+    for i, (title, subtitle, fields) in enumerate(records):
+        doc_id = number * ID_STRIDE + i
+        docs.append([title, url, kind, subtitle])
+        for term in tokenize(title):
+            row = postings.setdefault(term, {})
+            row[doc_id] = row.get(doc_id, 0) + TITLE_WEIGHT
+        for text in fields:
+            for term in tokenize(text):
+                row = postings.setdefault(term, {})
+                row[doc_id] = row.get(doc_id, 0) + FIELD_WEIGHT
+    return {"postings": {t: sorted(row.items()) for t, row in postings.items()}, "docs": docs}
+
+
+def _load_state() -> Dict[str, Any]:
+    try:
+        with open(STATE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state: Dict[str, Any]):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, STATE_PATH)
+
+
+def _write_hashed(out_dir: str, stem: str, data: Any) -> str:
+    """Writes `data` as <stem>.<content hash>.json unless that exact file exists already."""
+    body = _minified(data)
+    name = f"{stem}.{hashlib.sha256(body).hexdigest()[:10]}.json"
+    path = os.path.join(out_dir, name)
+    if not os.path.exists(path):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+    return name
+
+
+def build_search_index(db: DataLayer, out_dir: str = SEARCH_DIR) -> Dict[str, Any]:
+    """
+    Builds the site search index as content-hashed shards:
+
+        terms-<prefix>.<hash>.json   sorted terms starting with <prefix> and their
+                                     flat postings [doc id, weight, doc id, weight, ...]
+        docs-<c>-<n>.<hash>.json     [title, url, type, subtitle] rows of one chunk
+        index.<hash>.json            prefix -> shard file, chunk -> doc file
+        manifest.json                {"index": name of the current index file}
+
+    A collection is only re-tokenized when its records changed since the last
+    run, and shard files keep their name while their content is unchanged, so
+    browsers keep cached copies across rebuilds.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state = _load_state()
+    rebuilt = []
+
+    for number, (collection, url, kind) in enumerate(COLLECTIONS):
+        records = _records(db, collection)
+        digest = hashlib.sha256(_minified(records)).hexdigest()
+        cached = state.get(collection)
+        if cached is None or cached.get("hash") != digest:
+            state[collection] = {"hash": digest, **index_collection(number, url, kind, records)}
+            rebuilt.append(collection)
+
+    # Merge postings of all collections and group the terms by prefix
+    shards: Dict[str, Dict[str, List[int]]] = {}
+    for collection, _, _ in COLLECTIONS:
+        for term, rows in state[collection]["postings"].items():
+            flat = shards.setdefault(term[:PREFIX_LEN], {}).setdefault(term, [])
+            for doc_id, weight in rows:
+                flat.extend((doc_id, weight))
+
+    manifest = {"prefix_len": PREFIX_LEN, "id_stride": ID_STRIDE, "doc_chunk": DOC_CHUNK, "terms": {}, "docs": {}}
+    for prefix, terms in sorted(shards.items()):
+        ordered = sorted(terms)
+        manifest["terms"][prefix] = _write_hashed(out_dir, f"terms-{prefix}", {"t": ordered, "p": [terms[t] for t in ordered]})
+    for number, (collection, _, _) in enumerate(COLLECTIONS):
+        docs = state[collection]["docs"]
+        for start in range(0, len(docs), DOC_CHUNK):
+            key = f"{number}-{start // DOC_CHUNK}"
+            manifest["docs"][key] = _write_hashed(out_dir, f"docs-{key}", docs[start:start + DOC_CHUNK])
+
+    # Pages only embed this small pointer; the index file is fetched when search opens
+    index_name = _write_hashed(out_dir, "index", manifest)
+    with open(os.path.join(out_dir, "manifest.json"), "wb") as f:
+        f.write(_minified({"index": index_name}))
+
+    live = {*manifest["terms"].values(), *manifest["docs"].values(), index_name, "manifest.json"}
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name not in live:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+
+    _save_state(state)
+    return {"rebuilt": rebuilt, "shards": len(manifest["terms"]), "doc_files": len(manifest["docs"]), "removed": removed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the static site's search index.")
+    parser.add_argument("--out", default=SEARCH_DIR)
+    args = parser.parse_args()
+
+    summary = build_search_index(DataLayer(), args.out)
+    rebuilt = ", ".join(summary["rebuilt"]) or "nothing"
+    print(f"Search index: {summary['shards']} term shards, {summary['doc_files']} doc files "
+          f"(re-indexed {rebuilt}, removed {summary['removed']} stale files)")
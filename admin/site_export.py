@@ -0,0 +1,169 @@
+import json
+import os
+import re
+from typing import Dict, List, Any
+
+from data_manager import DataLayer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Under public/ so the browser can fetch detail files on demand (e.g. BibTeX for "Cite")
+CONTENT_DIR = os.path.join(ROOT_DIR, "web", "public", "content")
+
+# Fields kept out of list shards; they live in the per-publication detail files
+DETAIL_ONLY_FIELDS = ("abstract", "bibtex")
+# Written by upload_utils as images are ingested; lives in the data directory
+IMAGE_MANIFEST = "image_manifest.json"
+# Image fields per export, each holding one upload path or a list of them
+IMAGE_FIELDS = {"profile": ("profile_photo",), "lab_info": ("lab_photo",), "people": ("photo",),
+                "projects": ("images",)}
+IMAGE_INFO_KEYS = ("width", "height", "webp", "variants", "placeholder")
+
+_SLUG_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+def _minified(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _public(model) -> Dict[str, Any]:
+    """Model as the site sees it: no visibility flag or edit counter, no empty optional fields."""
+    data = model.model_dump(mode="json", exclude_none=True)
+    data.pop("visible", None)
+    data.pop("version", None)
+    return data
+
+
+def load_image_manifest(data_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(data_dir, IMAGE_MANIFEST), "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _with_images(data: Dict[str, Any], fields, manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adds `image_info`: for each ingested upload in the record's image fields, its
+    size, WebP copy, responsive variants and blur placeholder, so the site can
+    serve a srcset instead of the original file.
+    """
+    info = {}
+    for field in fields:
+        value = data.get(field)
+        for src in value if isinstance(value, list) else [value]:
+            entry = manifest.get(src) if isinstance(src, str) else None
+            if entry is not None:
+                info[src] = {k: entry[k] for k in IMAGE_INFO_KEYS if k in entry}
+    if info:
+        data["image_info"] = info
+    return data
+
+
+def publication_slug(pub) -> str:
+    base = _SLUG_CHARS.sub("-", pub.title.lower()).strip("-")[:60] or "publication"
+    return f"{base}-{pub.id[:8]}"
+
+
+class ShardWriter:
+    """Writes files under CONTENT_DIR, leaving unchanged ones untouched, and removes stale ones at the end."""
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.written: Dict[str, int] = {}
+        self.changed = 0
+
+    def write(self, rel_path: str, data: Any):
+        body = _minified(data)
+        path = os.path.join(self.out_dir, rel_path)
+        self.written[rel_path.replace(os.sep, "/")] = len(body)
+        try:
+            with open(path, "rb") as f:
+                if f.read() == body:
+                    return
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        self.changed += 1
+
+    def remove_stale(self) -> int:
+        removed = 0
+        for dirpath, _, files in os.walk(self.out_dir):
+            for name in files:
+                rel = os.path.relpath(os.path.join(dirpath, name), self.out_dir).replace(os.sep, "/")
+                if rel not in self.written and rel != "manifest.json":
+                    os.remove(os.path.join(dirpath, name))
+                    removed += 1
+        return removed
+
+
+def export_site(db: DataLayer, out_dir: str = CONTENT_DIR) -> Dict[str, Any]:
+    """
+    Writes the visible site content as minified, pre-sorted shards:
+
+        profile.json, lab_info.json
+        people.json, projects.json          visible records, in admin order
+                                            (all four with `image_info` for ingested images)
+        news.json                           visible, newest first
+        news_featured.json                  the home page's featured items
+        publications/index.json             years (newest first) with counts
+        publications/<year>.json            list fields only, no abstract/BibTeX
+        publications/items/<slug>.json      full record for one publication
+        manifest.json                       every shard with its size
+
+    Returns a summary with the number of files changed and removed.
+    """
+    writer = ShardWriter(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    images = load_image_manifest(db.data_dir)
+
+    def public(model, kind):
+        return _with_images(_public(model), IMAGE_FIELDS[kind], images)
+
+    writer.write("profile.json", public(db.get_profile(), "profile"))
+    writer.write("lab_info.json", public(db.get_lab_info(), "lab_info"))
+    writer.write("people.json", [public(p, "people") for p in db.query_people(visible=True)])
+    writer.write("projects.json", [public(p, "projects") for p in db.query_projects(visible=True)])
+
+    news = sorted(db.query_news(visible=True), key=lambda n: n.publish_date, reverse=True)
+    writer.write("news.json", [_public(n) for n in news])
+    writer.write("news_featured.json", [_public(n) for n in news if n.featured][:4])
+
+    by_year: Dict[int, List[Dict[str, Any]]] = {}
+    slugs = set()
+    for pub in sorted(db.query_publications(visible=True), key=lambda p: p.year, reverse=True):
+        detail = _public(pub)
+        slug = base = publication_slug(pub)
+        n = 1
+        while slug in slugs:
+            n += 1
+            slug = f"{base}-{n}"
+        slugs.add(slug)
+        detail["slug"] = slug
+        writer.write(f"publications/items/{slug}.json", detail)
+        summary = {k: v for k, v in detail.items() if k not in DETAIL_ONLY_FIELDS}
+        summary["has_bibtex"] = bool(pub.bibtex)
+        by_year.setdefault(pub.year, []).append(summary)
+
+    for year, items in by_year.items():
+        writer.write(f"publications/{year}.json", items)
+    writer.write("publications/index.json", [{"year": y, "count": len(items)} for y, items in by_year.items()])
+
+    removed = writer.remove_stale()
+    # Always rewritten, so its mtime tells the site the shards are newer than data/*.json
+    with open(os.path.join(out_dir, "manifest.json"), "wb") as f:
+        f.write(_minified({"files": writer.written}))
+    return {"files": len(writer.written), "changed": writer.changed, "removed": removed}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export visible lab content as static site shards.")
+    parser.add_argument("--out", default=CONTENT_DIR)
+    args = parser.parse_args()
+
+    summary = export_site(DataLayer(), args.out)
+    print(f"Exported {summary['files']} files to {args.out} ({summary['changed']} changed, {summary['removed']} removed)")
@@ -0,0 +1,248 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from typing import List, Optional, Dict, Any, Tuple
+
+from data_manager import fill_record_ids
+
+# Collections stored one row per record. Each maps a JSON file to its table and
+# the indexed columns extracted from the record; the full record lives in `data`.
+LIST_TABLES = {
+    "people.json": ("people", {
+        "id": lambda r: r.get("id"),
+        "name": lambda r: r.get("name"),
+        "role": lambda r: r.get("role"),
+        "start_year": lambda r: r.get("start_year"),
+        "visible": lambda r: int(r.get("visible", True)),
+    }),
+    "publications.json": ("publications", {
+        "id": lambda r: r.get("id"),
+        "title": lambda r: r.get("title"),
+        "year": lambda r: r.get("year"),
+        "doi": lambda r: r.get("doi"),
+        "visible": lambda r: int(r.get("visible", True)),
+    }),
+    "projects.json": ("projects", {
+        "id": lambda r: r.get("id"),
+        "title": lambda r: r.get("title"),
+        "status": lambda r: r.get("status"),
+        "visible": lambda r: int(r.get("visible", True)),
+    }),
+    "news.json": ("news", {
+        "id": lambda r: r.get("id"),
+        "title": lambda r: r.get("title"),
+        "publish_date": lambda r: r.get("publish_date"),
+        "featured": lambda r: int(r.get("featured", False)),
+        "visible": lambda r: int(r.get("visible", True)),
+    }),
+}
+
+# Single-object files (profile, lab info) are stored whole.
+DOCUMENT_FILES = ["profile.json", "lab_info.json"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS documents (name TEXT PRIMARY KEY, data TEXT NOT NULL);
+
+CREATE TABLE IF NOT EXISTS people (
+    pos INTEGER PRIMARY KEY, id TEXT, name TEXT, role TEXT, start_year INTEGER, visible INTEGER, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS people_role ON people(role);
+CREATE INDEX IF NOT EXISTS people_visible ON people(visible);
+
+CREATE TABLE IF NOT EXISTS publications (
+    pos INTEGER PRIMARY KEY, id TEXT, title TEXT, year INTEGER, doi TEXT, visible INTEGER, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS publications_year ON publications(year);
+CREATE INDEX IF NOT EXISTS publications_visible ON publications(visible);
+CREATE TABLE IF NOT EXISTS publication_tags (pos INTEGER NOT NULL, tag TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS publication_tags_tag ON publication_tags(tag);
+
+CREATE TABLE IF NOT EXISTS projects (
+    pos INTEGER PRIMARY KEY, id TEXT, title TEXT, status TEXT, visible INTEGER, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS projects_status ON projects(status);
+CREATE INDEX IF NOT EXISTS projects_visible ON projects(visible);
+
+CREATE TABLE IF NOT EXISTS news (
+    pos INTEGER PRIMARY KEY, id TEXT, title TEXT, publish_date TEXT, featured INTEGER, visible INTEGER, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS news_publish_date ON news(publish_date);
+CREATE INDEX IF NOT EXISTS news_visible ON news(visible);
+"""
+
+
+class SQLiteStore:
+    """
+    SQLite storage engine behind the DataLayer.
+
+    Reads and writes the same records as the JSON files, keyed by the same
+    filenames, but keeps the filterable fields in indexed columns so queries
+    like "publications from 2024" do not have to load a whole collection.
+    A per-collection version counter in `meta` serves as the cache stamp.
+    Records are also addressable by their `id`, so a single edit updates one row.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Adds the id column to databases created before records had ids and backfills it."""
+        for filename, (table, _) in LIST_TABLES.items():
+            columns = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+            if "id" not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN id TEXT")
+                rows = conn.execute(f"SELECT pos, data FROM {table} ORDER BY pos").fetchall()
+                records = [json.loads(row["data"]) for row in rows]
+                fill_record_ids(filename, records)
+                conn.executemany(f"UPDATE {table} SET id = ?, data = ? WHERE pos = ?",
+                                 ((r["id"], json.dumps(r), row["pos"]) for r, row in zip(records, rows)))
+                self._bump(conn, filename)
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_id ON {table}(id)")
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, filename: str) -> str:
+        conn.execute(
+            "INSERT INTO meta (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (filename,),
+        )
+        return str(conn.execute("SELECT version FROM meta WHERE name = ?", (filename,)).fetchone()["version"])
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def stamp(self, filename: str) -> Optional[tuple]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT version FROM meta WHERE name = ?", (filename,)).fetchone()
+        return (row["version"],) if row else None
+
+    def read(self, filename: str, default: Any) -> Any:
+        return self.read_versioned(filename, default)[0]
+
+    def read_versioned(self, filename: str, default: Any) -> Tuple[Any, str]:
+        """Data and its change counter, read in one transaction so they match."""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            meta = conn.execute("SELECT version FROM meta WHERE name = ?", (filename,)).fetchone()
+            version = str(meta["version"]) if meta else ""
+            if filename in LIST_TABLES:
+                if meta is None:
+                    return default, version
+                table = LIST_TABLES[filename][0]
+                return [json.loads(r["data"]) for r in conn.execute(f"SELECT data FROM {table} ORDER BY pos")], version
+            row = conn.execute("SELECT data FROM documents WHERE name = ?", (filename,)).fetchone()
+        return (json.loads(row["data"]) if row else default), version
+
+    def write(self, filename: str, data: Any) -> str:
+        with closing(self._connect()) as conn, conn:
+            if filename in LIST_TABLES:
+                table, columns = LIST_TABLES[filename]
+                fill_record_ids(filename, data)
+                conn.execute(f"DELETE FROM {table}")
+                names = ", ".join(["pos", *columns, "data"])
+                marks = ", ".join("?" * (len(columns) + 2))
+                conn.executemany(
+                    f"INSERT INTO {table} ({names}) VALUES ({marks})",
+                    ((pos, *(get(r) for get in columns.values()), json.dumps(r)) for pos, r in enumerate(data)),
+                )
+                if table == "publications":
+                    conn.execute("DELETE FROM publication_tags")
+                    conn.executemany(
+                        "INSERT INTO publication_tags (pos, tag) VALUES (?, ?)",
+                        ((pos, tag) for pos, r in enumerate(data) for tag in r.get("tags", [])),
+                    )
+            else:
+                conn.execute("INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)", (filename, json.dumps(data)))
+            return self._bump(conn, filename)
+
+    def get(self, filename: str, record_id: str) -> Optional[Dict[str, Any]]:
+        table = LIST_TABLES[filename][0]
+        with closing(self._connect()) as conn:
+            row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (record_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def upsert(self, filename: str, record: Dict[str, Any]) -> str:
+        """Replaces the row with the record's id, keeping its position, or appends a new one. Returns the new version."""
+        table, columns = LIST_TABLES[filename]
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(f"SELECT pos FROM {table} WHERE id = ?", (record["id"],)).fetchone()
+            if row is not None:
+                pos = row["pos"]
+            else:
+                pos = conn.execute(f"SELECT COALESCE(MAX(pos), -1) + 1 FROM {table}").fetchone()[0]
+            names = ", ".join(["pos", *columns, "data"])
+            marks = ", ".join("?" * (len(columns) + 2))
+            conn.execute(f"INSERT OR REPLACE INTO {table} ({names}) VALUES ({marks})",
+                         (pos, *(get(record) for get in columns.values()), json.dumps(record)))
+            if table == "publications":
+                conn.execute("DELETE FROM publication_tags WHERE pos = ?", (pos,))
+                conn.executemany("INSERT INTO publication_tags (pos, tag) VALUES (?, ?)",
+                                 ((pos, tag) for tag in record.get("tags", [])))
+            return self._bump(conn, filename)
+
+    def delete(self, filename: str, record_id: str) -> Optional[str]:
+        """Deletes the row with this id. Returns the new version, or None when there was no such row."""
+        table = LIST_TABLES[filename][0]
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(f"SELECT pos FROM {table} WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(f"DELETE FROM {table} WHERE pos = ?", (row["pos"],))
+            if table == "publications":
+                conn.execute("DELETE FROM publication_tags WHERE pos = ?", (row["pos"],))
+            return self._bump(conn, filename)
+
+    def query(self, filename: str, where: List[str], params: List[Any], join_tags: bool = False) -> List[Dict[str, Any]]:
+        """Returns records matching indexed column conditions, in collection order."""
+        table = LIST_TABLES[filename][0]
+        sql = f"SELECT {table}.data FROM {table}"
+        if join_tags:
+            sql += " JOIN publication_tags ON publication_tags.pos = publications.pos"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {table}.pos"
+        with closing(self._connect()) as conn:
+            return [json.loads(r["data"]) for r in conn.execute(sql, params)]
+
+
+def import_json(data_dir: str, db_path: str):
+    """Loads every data/*.json file into the SQLite database."""
+    store = SQLiteStore(db_path)
+    for filename in [*LIST_TABLES, *DOCUMENT_FILES]:
+        path = os.path.join(data_dir, filename)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r") as f:
+            store.write(filename, json.load(f))
+        print(f"Imported {filename}")
+
+
+def export_json(db_path: str, data_dir: str):
+    """Writes every collection back to data/*.json so the website build can read it."""
+    store = SQLiteStore(db_path)
+    for filename in [*LIST_TABLES, *DOCUMENT_FILES]:
+        data = store.read(filename, None)
+        if data is None:
+            continue
+        with open(os.path.join(data_dir, filename), "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Exported {filename}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from data_manager import DATA_DIR, SQLITE_PATH
+
+    parser = argparse.ArgumentParser(description="Move lab data between data/*.json and SQLite.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--db", default=SQLITE_PATH)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        import_json(args.data_dir, args.db)
+    else:
+        export_json(args.db, args.data_dir)
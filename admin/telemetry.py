@@ -0,0 +1,305 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.path.join(ROOT_DIR, ".cache", "telemetry")
+METRICS_PATH = os.path.join(STATE_DIR, "metrics.prom")
+SLOW_LOG_PATH = os.path.join(STATE_DIR, "slow_ops.log")
+
+ENABLED = os.environ.get("LAB_TELEMETRY", "1") != "0"
+# A page rerun or top-level operation slower than this is written to the slow-operation log
+SLOW_SECONDS = float(os.environ.get("LAB_SLOW_OP_SECONDS", "1.0"))
+# Seconds between rewrites of the Prometheus text file
+EXPORT_INTERVAL = 15.0
+SLOW_LOG_MAX_BYTES = 1024 * 1024
+
+# Upper bounds of the histogram buckets, in seconds (+Inf is implied)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Durations of one span name in fixed buckets, the way Prometheus expects them."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile (max for the last bucket)."""
+        target, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target and n:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return 0.0
+
+
+class _Node:
+    """One span name under its parent, merged over repeated calls: a loop of saves is one node with a count."""
+    __slots__ = ("name", "count", "seconds", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.seconds = 0.0
+        self.children: Dict[str, "_Node"] = {}
+
+    def child(self, name: str) -> "_Node":
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = _Node(name)
+        return node
+
+
+class _PageRun:
+    __slots__ = ("root", "start", "last")
+
+    def __init__(self, name: str):
+        self.root = _Node(name)
+        self.start = self.last = time.perf_counter()
+
+
+_lock = threading.Lock()
+_histograms: Dict[str, Histogram] = {}
+_slow_ops: Deque[Dict[str, Any]] = deque(maxlen=50)
+_slow_total = 0
+_last_export = 0.0
+
+# Innermost open span, and the page rerun it belongs to, of the current thread
+_current: ContextVar[Optional[_Node]] = ContextVar("telemetry_span", default=None)
+_run: ContextVar[Optional[_PageRun]] = ContextVar("telemetry_run", default=None)
+
+
+def _observe(name: str, seconds: float):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds)
+
+
+class span:
+    """
+    Times a block as a named span: `with span("DataLayer.validate"): ...`.
+    Nested spans form the breakdown of the page rerun (or top-level span)
+    they run under; every span also feeds the histogram of its name.
+    """
+    __slots__ = ("name", "node", "token", "t0")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if not ENABLED:
+            self.node = None
+            return self
+        parent = _current.get()
+        self.node = parent.child(self.name) if parent is not None else _Node(self.name)
+        self.token = _current.set(self.node)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        node = self.node
+        if node is None:
+            return False
+        now = time.perf_counter()
+        seconds = now - self.t0
+        _current.reset(self.token)
+        node.count += 1
+        node.seconds += seconds
+        _observe(self.name, seconds)
+        run = _run.get()
+        if run is not None:
+            run.last = now
+        elif _current.get() is None:
+            # Top-level operation outside a page rerun (a background build, a script)
+            _finish(node, seconds)
+        return False
+
+
+def instrument(prefix: str, skip=()):
+    """Class decorator: every method (except `skip` and dunders other than __init__) runs inside a span named `prefix.method`."""
+    def wrap(name, fn):
+        span_name = f"{prefix}.{name}"
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return timed
+
+    def decorate(cls):
+        if not ENABLED:
+            return cls
+        for name, value in list(vars(cls).items()):
+            if (name.startswith("__") and name != "__init__") or name in skip or not inspect.isfunction(value):
+                continue
+            setattr(cls, name, wrap(name, value))
+        return cls
+    return decorate
+
+
+# --- Page reruns ---
+
+def page_rerun(name: str):
+    """
+    Starts timing a page script's rerun; call right after the password check and
+    call `end_page_rerun()` on the page's last line. A run cut short by st.stop()
+    or st.rerun() never reaches that line, so it is closed when the session's
+    next run starts, counted up to its last recorded operation.
+    """
+    if not ENABLED:
+        return
+    import streamlit as st
+    previous = st.session_state.get("_telemetry_run")
+    if previous is not None:
+        _close(previous, previous.last)
+    run = _PageRun(f"page:{name}")
+    st.session_state["_telemetry_run"] = run
+    _run.set(run)
+    _current.set(run.root)
+
+
+def end_page_rerun():
+    run = _run.get()
+    if run is None:
+        return
+    import streamlit as st
+    st.session_state.pop("_telemetry_run", None)
+    _close(run, time.perf_counter())
+
+
+def _close(run: _PageRun, end: float):
+    if _run.get() is run:
+        _run.set(None)
+        _current.set(None)
+    seconds = max(0.0, end - run.start)
+    run.root.count, run.root.seconds = 1, seconds
+    _observe(run.root.name, seconds)
+    _finish(run.root, seconds)
+
+
+# --- Slow operations and export ---
+
+def breakdown(node: _Node, indent: int = 0) -> List[str]:
+    """The span tree as text lines, children slowest first, with the time not covered by child spans."""
+    lines = [f"{'  ' * indent}{node.name}  {node.count} × {node.seconds * 1000:.1f} ms"]
+    children = sorted(node.children.values(), key=lambda c: c.seconds, reverse=True)
+    for child in children:
+        lines.extend(breakdown(child, indent + 1))
+    own = node.seconds - sum(c.seconds for c in children)
+    if children and own >= 0.0001:
+        lines.append(f"{'  ' * (indent + 1)}(own code{' and widgets' if node.name.startswith('page:') else ''})  {own * 1000:.1f} ms")
+    return lines
+
+
+def _finish(root: _Node, seconds: float):
+    """Logs the root span if it was slow, and refreshes the metrics file now and then."""
+    global _slow_total, _last_export
+    if seconds >= SLOW_SECONDS:
+        entry = {"time": datetime.now().isoformat(timespec="seconds"), "name": root.name,
+                 "seconds": seconds, "breakdown": breakdown(root)}
+        with _lock:
+            _slow_ops.append(entry)
+            _slow_total += 1
+        try:
+            _append_slow_log(entry)
+        except OSError as e:
+            print(f"Writing slow operation log failed: {e}")
+    now = time.monotonic()
+    if now - _last_export >= EXPORT_INTERVAL:
+        _last_export = now
+        try:
+            write_prometheus()
+        except OSError as e:
+            print(f"Writing metrics failed: {e}")
+
+
+def _append_slow_log(entry: Dict[str, Any]):
+    os.makedirs(os.path.dirname(SLOW_LOG_PATH), exist_ok=True)
+    if os.path.exists(SLOW_LOG_PATH) and os.path.getsize(SLOW_LOG_PATH) > SLOW_LOG_MAX_BYTES:
+        os.replace(SLOW_LOG_PATH, SLOW_LOG_PATH + ".1")
+    text = f"{entry['time']} slow {entry['name']} {entry['seconds']:.3f} s\n" + \
+        "".join(f"  {line}\n" for line in entry["breakdown"])
+    with open(SLOW_LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    """All histograms in the Prometheus text exposition format."""
+    with _lock:
+        hists = {name: (list(h.counts), h.sum, h.count) for name, h in _histograms.items()}
+        slow_total = _slow_total
+    lines = ["# HELP lab_admin_span_seconds Time spent in admin page reruns and data layer operations.",
+             "# TYPE lab_admin_span_seconds histogram"]
+    for name in sorted(hists):
+        counts, total, count = hists[name]
+        label = _label(name)
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (None,), counts):
+            cumulative += n
+            le = "+Inf" if bound is None else repr(bound)
+            lines.append(f'lab_admin_span_seconds_bucket{{span="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'lab_admin_span_seconds_sum{{span="{label}"}} {total}')
+        lines.append(f'lab_admin_span_seconds_count{{span="{label}"}} {count}')
+    lines += ["# HELP lab_admin_slow_operations_total Page reruns and operations slower than the slow-operation threshold.",
+              "# TYPE lab_admin_slow_operations_total counter",
+              f"lab_admin_slow_operations_total {slow_total}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: Optional[str] = None):
+    """Writes the metrics for a node_exporter textfile collector (or anything that reads the format)."""
+    path = path or METRICS_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def summary() -> List[Dict[str, Any]]:
+    """One row per span name for the diagnostics panel, slowest total first."""
+    with _lock:
+        rows = [{"span": name, "count": h.count, "total s": round(h.sum, 3),
+                 "mean ms": round(h.sum / h.count * 1000, 1), "p50 ≤ ms": round(h.quantile(0.5) * 1000, 1),
+                 "p95 ≤ ms": round(h.quantile(0.95) * 1000, 1), "max ms": round(h.max * 1000, 1)}
+                for name, h in _histograms.items() if h.count]
+    return sorted(rows, key=lambda r: r["total s"], reverse=True)
+
+
+def slow_operations() -> List[Dict[str, Any]]:
+    """The most recent slow operations of this process, newest first."""
+    with _lock:
+        return list(reversed(_slow_ops))
+
+
+def reset():
+    global _slow_total
+    with _lock:
+        _histograms.clear()
+        _slow_ops.clear()
+        _slow_total = 0
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import pytest
+
+from backup import FULL_EVERY, MANIFEST_NAME, plan_backup, write_backup
+
+
+@pytest.fixture
+def site(tmp_path):
+    data, uploads = tmp_path / "data", tmp_path / "uploads"
+    (data / ".locks").mkdir(parents=True)
+    (data / "history").mkdir()
+    uploads.mkdir()
+    (data / "people.json").write_text('[{"name": "Ada"}]')
+    (data / "news.json").write_text("[]")
+    (data / "history" / "HEAD").write_text("1")
+    (uploads / "photo.jpg").write_bytes(b"\xff\xd8\xff" + os.urandom(5000))
+    return {"data": str(data), "uploads": str(uploads)}, str(tmp_path / "backups")
+
+
+def run(site, incremental=None):
+    sources, backup_dir = site
+    plan = plan_backup(incremental, backup_dir, sources)
+    path = write_backup(plan, backup_dir)
+    with zipfile.ZipFile(path) as zf:
+        contents = {name: zf.read(name) for name in zf.namelist()}
+    return plan, json.loads(contents.pop(MANIFEST_NAME)), contents
+
+
+def touch(path, data):
+    # A new mtime even on filesystems with coarse timestamps
+    with open(path, "w") as f:
+        f.write(data)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_full_backup_skips_side_files_and_hashes_what_it_packs(site):
+    sources, _ = site
+    data = sources["data"]
+    for name in (".locks/people.json.lock", ".hidden", "lab.db-wal", "lab.db-journal", "photo.jpg.part", "x.tmp"):
+        with open(os.path.join(data, name), "w") as f:
+            f.write("skip me")
+
+    plan, manifest, contents = run(site)
+    assert plan.kind == "full" and manifest["chain"] == [plan.name]
+    assert sorted(contents) == ["data/history/HEAD", "data/news.json", "data/people.json", "uploads/photo.jpg"]
+    assert manifest["files"].keys() == contents.keys()
+    for name, raw in contents.items():
+        entry = manifest["files"][name]
+        assert entry["sha256"] == hashlib.sha256(raw).hexdigest()
+        assert entry["size"] == len(raw)
+        assert entry["in"] == plan.name
+
+
+def test_incremental_packs_exactly_what_changed(site):
+    sources, _ = site
+    full, _, _ = run(site)
+    touch(os.path.join(sources["data"], "people.json"), '[{"name": "Grace"}]')
+    touch(os.path.join(sources["uploads"], "new.png"), "png")
+    os.remove(os.path.join(sources["data"], "news.json"))
+
+    plan, manifest, contents = run(site)
+    assert plan.kind == "incremental"
+    assert sorted(contents) == ["data/people.json", "uploads/new.png"]
+    assert manifest["deleted"] == ["data/news.json"]
+    assert manifest["chain"] == [full.name, plan.name]
+    assert contents["data/people.json"] == b'[{"name": "Grace"}]'
+    # Unchanged files are described by the archive that holds them
+    assert manifest["files"]["uploads/photo.jpg"]["in"] == full.name
+    assert manifest["files"]["data/people.json"]["in"] == plan.name
+    assert "data/news.json" not in manifest["files"]
+
+
+def test_auto_mode_starts_over_when_the_chain_is_broken(site):
+    sources, backup_dir = site
+    full, _, _ = run(site)
+    touch(os.path.join(sources["data"], "news.json"), "[1]")
+    incremental, _, _ = run(site)
+    assert incremental.kind == "incremental"
+
+    os.remove(os.path.join(backup_dir, full.name))
+    touch(os.path.join(sources["data"], "news.json"), "[2]")
+    assert plan_backup(None, backup_dir, sources).kind == "full"
+    # Even when asked for, an incremental needs its whole chain
+    assert plan_backup(True, backup_dir, sources).kind == "full"
+
+
+def test_auto_mode_starts_over_after_full_every_incrementals(site):
+    sources, _ = site
+    kinds = []
+    for n in range(FULL_EVERY + 2):
+        touch(os.path.join(sources["data"], "news.json"), f"[{n}]")
+        plan, manifest, _ = run(site)
+        kinds.append(plan.kind)
+    assert kinds == ["full"] + ["incremental"] * FULL_EVERY + ["full"]
+    assert manifest["chain"] == [plan.name]
+
@@ -0,0 +1,58 @@
+import io
+
+from bibtex_import import count_entries, import_bibtex, iter_bibtex_entries
+
+
+def _import(text: str):
+    pubs, errors = [], []
+    for chunk_pubs, chunk_errors in import_bibtex(io.StringIO(text)):
+        pubs += chunk_pubs
+        errors += chunk_errors
+    return pubs, errors
+
+
+def test_stray_at_sign_does_not_swallow_the_next_entry():
+    text = """% maintained by me@example.com
+@article{first, title={First}, year={2020}}
+
+@inproceedings{second,
+  title = "Second",
+  year = 2021,
+}
+Contact: lab@uni.edu
+@misc(third, title={Third}, year={2022})
+"""
+    pubs, errors = _import(text)
+    assert count_entries(text.encode()) == 3
+    assert [p.title for p in pubs] == ["First", "Second", "Third"]
+    assert errors == []
+
+
+def test_type_and_delimiter_on_separate_lines():
+    pubs, errors = _import("@article\n  {split, title={Split}, year={2019}}\n")
+    assert [p.title for p in pubs] == ["Split"] and errors == []
+
+
+def test_skipped_blocks():
+    text = '@comment{ignore @me}\n@string{jr = "Journal"}\n@article{a, title={A}, year={2020}, journal=jr}\n'
+    pubs, errors = _import(text)
+    assert [p.title for p in pubs] == ["A"] and errors == []
+
+
+def test_unterminated_entry_is_reported():
+    text = "@article{ok, title={Ok}, year={2020}}\n@article{broken, title={Broken, year={2021}\n"
+    pubs, errors = _import(text)
+    assert [p.title for p in pubs] == ["Ok"]
+    assert len(errors) == 1 and errors[0][0] == "broken" and "Unterminated" in errors[0][1]
+
+
+def test_invalid_entry_is_reported_not_dropped():
+    pubs, errors = _import("@article{noyear, title={No Year}}\n")
+    assert pubs == [] and errors[0][0] == "noyear"
+
+
+def test_entries_stream_one_at_a_time():
+    lines = iter(["@article{a, title={A},\n", " year={2020}}\n", "@article{b, title={B}, year={2021}}\n"])
+    entries = iter_bibtex_entries(lines)
+    assert next(entries).startswith("@article{a")
+    assert next(entries).startswith("@article{b")
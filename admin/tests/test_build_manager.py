@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+import pytest
+
+import build_manager
+from build_manager import BuildManager
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    for name in ("data", "uploads", "web/out", "state"):
+        (tmp_path / name).mkdir(parents=True)
+    (tmp_path / "data" / "people.json").write_text("[]")
+    monkeypatch.setattr(build_manager, "ROOT_DIR", str(tmp_path))
+    monkeypatch.setattr(build_manager, "WEB_DIR", str(tmp_path / "web"))
+    monkeypatch.setattr(build_manager, "DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(build_manager, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(build_manager, "STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(build_manager, "MANIFEST_PATH", str(tmp_path / "state" / "manifest.json"))
+    monkeypatch.setattr(build_manager, "LOG_PATH", str(tmp_path / "state" / "build.log"))
+    monkeypatch.setattr(build_manager, "BUILD_COMMAND", ["sh", "-c", "echo built; sleep 0.3"])
+    return tmp_path
+
+
+def _wait(manager, timeout=10):
+    deadline = time.time() + timeout
+    while manager.running and time.time() < deadline:
+        time.sleep(0.05)
+    assert not manager.running
+
+
+def test_export_runs_in_the_background_and_only_when_changed(site, monkeypatch):
+    exports = []
+    release = threading.Event()
+
+    def prepare(self):
+        exports.append(threading.current_thread() is not threading.main_thread())
+        release.wait(5)
+    monkeypatch.setattr(BuildManager, "_prepare_content", prepare)
+
+    manager = BuildManager()
+    started = time.time()
+    assert manager.request() == "started"
+    # The click returns while the export is still blocked
+    assert time.time() - started < 1 and manager.running
+    assert manager.last_changes["added"] == ["data/people.json"]
+    assert manager.request() == "queued"
+    release.set()
+    _wait(manager)
+    # The queued follow-up found nothing new and did not export again
+    assert manager.status == "unchanged" and manager.build_id == 2
+    assert exports == [True]
+    assert "built" in manager.log_tail()
+
+    assert manager.request() == "unchanged" and exports == [True]
+    (site / "data" / "people.json").write_text('[{"name": "New"}]')
+    assert manager.request() == "started"
+    _wait(manager)
+    assert manager.status == "succeeded" and exports == [True, True]
+    assert manager.last_changes["changed"] == ["data/people.json"]
+
+
+def test_failed_export_fails_the_build(site, monkeypatch):
+    def prepare(self):
+        raise RuntimeError("export broke")
+    monkeypatch.setattr(BuildManager, "_prepare_content", prepare)
+
+    manager = BuildManager()
+    assert manager.request() == "started"
+    _wait(manager)
+    assert manager.status == "failed" and "export broke" in manager.log_tail()
+    # Nothing was recorded as built, so the change is still pending
+    assert manager.pending_changes()["added"] == ["data/people.json"]
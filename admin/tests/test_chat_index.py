@@ -0,0 +1,25 @@
+from chat_index import fit_chunks
+
+SOURCES = [("Prof", "/profile"), ("Paper", "/publications"), ("Post", "/news"), ("Person", "/people")]
+
+
+def _chunks(counts):
+    return [(src, f"{src}-{i}") for src, n in enumerate(counts) for i in range(n)]
+
+
+def test_under_the_limit_keeps_everything():
+    chunks = _chunks([1, 5, 5, 2])
+    assert fit_chunks(SOURCES, chunks, limit=20) == (chunks, {})
+
+
+def test_limit_is_shared_between_sections():
+    chunks = _chunks([1, 40, 30, 3])
+    kept, dropped = fit_chunks(SOURCES, chunks, limit=24)
+    assert len(kept) == 24
+    per_source = [sum(1 for src, _ in kept if src == s) for s in range(4)]
+    # Small sections keep everything; news is not what gets cut first
+    assert per_source == [1, 10, 10, 3]
+    assert dropped == {"/publications": 30, "/news": 20}
+    # Original order, and the first (newest) chunks of each section
+    assert kept == sorted(kept, key=chunks.index)
+    assert (2, "2-0") in kept and (2, "2-10") not in kept
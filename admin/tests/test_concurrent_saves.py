@@ -0,0 +1,91 @@
+import multiprocessing
+import random
+import time
+
+import pytest
+
+from audit_log import AuditLog
+from data_manager import ConflictError, DataLayer, NewsItem
+
+WORKERS = 4
+ROUNDS = 15
+
+
+def _editor(data_dir, backend, record_id, worker, results):
+    """Edits one shared record over and over from its own process, retrying after conflicts."""
+    db = DataLayer(backend=backend, data_dir=data_dir)
+    wins = conflicts = 0
+    for n in range(ROUNDS):
+        while True:
+            item = next(i for i in db.get_news() if i.id == record_id)
+            # Give the other processes a chance to save in between
+            time.sleep(random.uniform(0, 0.005))
+            try:
+                db.upsert("news", item.model_copy(update={"content": f"{worker}:{n}"}))
+            except ConflictError:
+                conflicts += 1
+                continue
+            wins += 1
+            break
+        db.upsert("news", NewsItem(title=f"{worker}:{n}", content="", publish_date="2024-05-01"))
+    results.put((wins, conflicts))
+
+
+def _logger(data_dir, worker):
+    log = AuditLog(data_dir, max_bytes=4000, max_segments=50)
+    for n in range(ROUNDS * 10):
+        log.append("UPDATE", f"{worker}:{n}")
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_concurrent_saves_from_several_processes(tmp_path, backend):
+    data_dir = str(tmp_path / "data")
+    db = DataLayer(backend=backend, data_dir=data_dir)
+    shared = NewsItem(title="Shared", content="", publish_date="2024-05-01")
+    db.save_news([shared])
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_editor, args=(data_dir, backend, shared.id, w, results))
+               for w in range(WORKERS)]
+    for p in workers:
+        p.start()
+    outcomes = [results.get(timeout=120) for _ in workers]
+    for p in workers:
+        p.join(timeout=10)
+        # A worker that raised anything other than ConflictError exits non-zero
+        assert p.exitcode == 0
+
+    wins = sum(w for w, _ in outcomes)
+    conflicts = sum(c for _, c in outcomes)
+    assert wins == WORKERS * ROUNDS
+    assert conflicts > 0
+
+    items = db.get_news()
+    # Every winning edit moved the shared record one version on, none was overwritten
+    assert next(i for i in items if i.id == shared.id).version == wins
+    assert sorted(i.title for i in items if i.id != shared.id) == sorted(
+        f"{w}:{n}" for w in range(WORKERS) for n in range(ROUNDS))
+    assert db.history.load("news") == db._load_json("news.json", [])
+
+    # Every save was logged once, and every index entry points at a whole line
+    entries = db.get_audit_logs(page_size=1000)
+    assert len(entries) == db.count_audit_logs() == 1 + 2 * wins
+    assert db.count_audit_logs(action="UPDATE") == 1 + wins
+
+
+def test_concurrent_appends_and_rotations_from_several_processes(tmp_path):
+    data_dir = str(tmp_path)
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_logger, args=(data_dir, w)) for w in range(WORKERS)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+    log = AuditLog(data_dir, max_bytes=4000, max_segments=50)
+    entries = log.page(page_size=10000)
+    assert sorted(e["details"] for e in entries) == sorted(
+        f"{w}:{n}" for w in range(WORKERS) for n in range(ROUNDS * 10))
+    assert len(list(log._segments())) > 1
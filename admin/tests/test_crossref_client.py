@@ -0,0 +1,70 @@
+import json
+from urllib.parse import unquote
+
+import pytest
+
+import crossref_client
+from conftest import QuietHandler
+from crossref_client import CrossRefCache, CrossRefClient
+
+WORK = {"title": ["Fast Things"], "author": [{"given": "Ada", "family": "Lovelace"}],
+        "issued": {"date-parts": [[2021, 3]]}, "container-title": ["Journal of Speed"]}
+
+
+class StandIn(QuietHandler):
+    """Answers /works/<doi> like the CrossRef API, by DOI."""
+    requests = []
+
+    def do_GET(self):
+        doi = unquote(self.path[len("/works/"):])
+        StandIn.requests.append(doi)
+        if doi in ("10.1000/ok", "10.1000/a#b?c"):
+            self.send_body(200, json.dumps({"status": "ok", "message": WORK}).encode())
+        elif doi == "10.1000/html":
+            self.send_body(200, b"<html>Service maintenance</html>")
+        elif doi == "10.1000/nomessage":
+            self.send_body(200, b'{"status": "ok"}')
+        elif doi == "10.1000/busy":
+            self.send_body(503)
+        else:
+            self.send_body(404, b"Resource not found.")
+
+
+@pytest.fixture
+def client(http_server, tmp_path):
+    StandIn.requests = []
+    c = CrossRefClient(base_url=http_server(StandIn), cache=CrossRefCache(str(tmp_path)))
+    yield c
+    c.close()
+
+
+def test_found_and_cached(client):
+    first = client.fetch("https://doi.org/10.1000/OK")
+    assert first["error"] is None and not first["cached"]
+    assert first["meta"]["title"] == "Fast Things" and first["meta"]["year"] == 2021
+    second = client.fetch("10.1000/ok")
+    assert second["cached"] and second["meta"] == first["meta"]
+    assert StandIn.requests == ["10.1000/ok"]
+
+
+def test_doi_with_reserved_characters_is_quoted(client):
+    result = client.fetch("10.1000/a#b?c")
+    assert result["error"] is None
+    assert StandIn.requests == ["10.1000/a#b?c"]
+
+
+def test_malformed_response_fails_only_its_doi(client):
+    results = {r["doi"]: r for r in client.fetch_many(["10.1000/html", "10.1000/nomessage", "10.1000/ok", "10.1000/gone"])}
+    assert results["10.1000/html"]["error"].startswith("Malformed response")
+    assert results["10.1000/nomessage"]["error"].startswith("Malformed response")
+    assert results["10.1000/gone"]["error"] == "Not found"
+    assert results["10.1000/ok"]["meta"]["title"] == "Fast Things"
+
+
+def test_retries_without_sleeping_after_last_attempt(client, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(crossref_client.time, "sleep", sleeps.append)
+    result = client.fetch("10.1000/busy")
+    assert result["error"] == "HTTP 503"
+    assert len(StandIn.requests) == crossref_client.ATTEMPTS
+    assert len(sleeps) == crossref_client.ATTEMPTS - 1
@@ -0,0 +1,68 @@
+import pytest
+
+from data_manager import DataLayer, NewsItem, Publication
+from dedup_index import DedupIndex
+from reference_index import extract_refs
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def db(request, tmp_path):
+    return DataLayer(backend=request.param, data_dir=str(tmp_path / "data"))
+
+
+def news(title, content):
+    return NewsItem(title=title, content=content, publish_date="2024-05-01")
+
+
+def pub(title, doi=None):
+    return Publication(title=title, authors="A. Author", year=2024, venue="Venue", abstract="", doi=doi)
+
+
+def sorted_refs(refs):
+    return {upload: sorted(users) for upload, users in refs.items()}
+
+
+def test_single_record_saves_match_a_full_rebuild(db, tmp_path):
+    db.save_news([news("Old", "![](/uploads/a.png)"), news("Plain", "text")])
+    db.save_publications([pub("First paper", "10.1/a"), pub("Second paper")])
+    db.refs.ensure_built(db)
+    snapshots = len(db.history.list_snapshots("news"))
+
+    items = db.get_news()
+    added = news("New", "![](/uploads/b.png) and ![](/uploads/a.png)")
+    db.upsert("news", added)
+    db.upsert("news", items[0].model_copy(update={"content": "no image"}))
+    db.delete("news", items[1].id)
+    added = next(n for n in db.get_news() if n.id == added.id)
+    db.upsert("news", added.model_copy(update={"title": "Renamed"}))
+
+    pubs = db.get_publications()
+    db.upsert("publications", pubs[0].model_copy(update={"title": "First paper, revised"}))
+    db.upsert("publications", pub("Third paper", "10.1/c"))
+    db.delete("publications", pubs[1].id)
+
+    current = db._load_json("news.json", [])
+    assert [n["title"] for n in current] == ["Old", "Renamed"]
+    # Each write stored one more version, equal to the collection as saved
+    assert len(db.history.list_snapshots("news")) == snapshots + 4
+    assert db.history.load("news") == current
+    assert db.history.load("publications") == db._load_json("publications.json", [])
+
+    assert sorted_refs(db.refs.references()) == sorted_refs(extract_refs("news.json", current))
+    assert db.refs.users_of("a.png") == ["News: Renamed"]
+
+    (tmp_path / "rebuilt").mkdir()
+    rebuilt = DedupIndex(str(tmp_path / "rebuilt"))
+    rebuilt.update(db._load_json("publications.json", []))
+    db.dedup._load()
+    assert db.dedup._state["records"] == rebuilt._state["records"]
+
+
+def test_history_falls_back_to_a_full_version_when_out_of_step(db):
+    db.save_news([news("One", "x")])
+    # A version that does not match the stored data, as after a hand edit of the file
+    db.history.record("news", [{"title": "Something else"}])
+
+    item = db.get_news()[0]
+    db.upsert("news", item.model_copy(update={"title": "Two"}))
+    assert db.history.load("news") == db._load_json("news.json", [])
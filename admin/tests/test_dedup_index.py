@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+import dedup_index
+from dedup_index import DedupIndex, fingerprint
+
+TOPICS = ["graph neural networks", "protein folding", "program synthesis", "causal inference", "robot grasping"]
+
+
+def _pubs(n=40):
+    return [{"title": f"Learning {TOPICS[i % 5]} at scale, part {i}", "authors": f"A. Author{i}, B. Smith",
+             "year": 2000 + i % 20, "doi": f"10.1000/p{i}" if i % 3 else None} for i in range(n)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_states():
+    dedup_index._states.clear()
+    yield
+    dedup_index._states.clear()
+
+
+def _reopen(path):
+    """The index as another process sees it, from the files alone."""
+    dedup_index._states.clear()
+    index = DedupIndex(path)
+    index._load()
+    return index
+
+
+def _same(a: DedupIndex, b: DedupIndex):
+    assert a._state["records"].keys() == b._state["records"].keys()
+    assert {fp: r.get("n", 1) for fp, r in a._state["records"].items()} == \
+        {fp: r.get("n", 1) for fp, r in b._state["records"].items()}
+    for name in ("by_doi", "by_title", "buckets"):
+        assert {k: sorted(v) for k, v in a._state[name].items()} == {k: sorted(v) for k, v in b._state[name].items()}
+
+
+def test_single_record_changes_append_only_to_the_log(tmp_path):
+    pubs = _pubs()
+    index = DedupIndex(str(tmp_path))
+    index.update(pubs)
+    base = os.path.join(tmp_path, dedup_index.INDEX_FILE)
+    base_bytes, base_mtime = os.path.getsize(base), os.stat(base).st_mtime_ns
+
+    edited = dict(pubs[7], title="A different title entirely")
+    index.change(added=[edited], removed=[pubs[7]])
+    pubs[7] = edited
+    assert os.stat(base).st_mtime_ns == base_mtime
+    assert os.path.getsize(index._log_path(index._state["generation"])) < base_bytes // 10
+
+    assert index.find(edited)[0]["fingerprint"] == fingerprint(edited)
+    (tmp_path / "rebuilt").mkdir()
+    reference = DedupIndex(str(tmp_path / "rebuilt"))
+    reference.update(pubs)
+    _same(_reopen(str(tmp_path)), reference)
+
+
+def test_unchanged_save_writes_nothing(tmp_path):
+    pubs = _pubs()
+    index = DedupIndex(str(tmp_path))
+    index.update(pubs)
+    before = sorted(os.listdir(tmp_path))
+    index.update(pubs)
+    index.change(added=[pubs[1]], removed=[pubs[1]])
+    assert sorted(os.listdir(tmp_path)) == before
+
+
+def test_shared_fingerprint_survives_removing_one_copy(tmp_path):
+    pubs = _pubs()
+    index = DedupIndex(str(tmp_path))
+    index.update(pubs + [dict(pubs[2])])
+    index.change(removed=[pubs[2]])
+    assert _reopen(str(tmp_path)).is_indexed(fingerprint(pubs[2]))
+    index = DedupIndex(str(tmp_path))
+    index.change(removed=[pubs[2]])
+    assert not _reopen(str(tmp_path)).is_indexed(fingerprint(pubs[2]))
+
+
+def test_compaction_folds_the_log_into_the_base(tmp_path, monkeypatch):
+    monkeypatch.setattr(dedup_index, "COMPACT_MIN_BYTES", 1000)
+    pubs = _pubs(10)
+    index = DedupIndex(str(tmp_path))
+    index.update(pubs)
+    generation = index._state["generation"]
+    for i in range(10):
+        edited = dict(pubs[i], title=pubs[i]["title"] + " (extended version)")
+        index.change(added=[edited], removed=[pubs[i]])
+        pubs[i] = edited
+    assert index._state["generation"] > generation
+    assert not os.path.exists(index._log_path(generation))
+
+    (tmp_path / "rebuilt").mkdir()
+    reference = DedupIndex(str(tmp_path / "rebuilt"))
+    reference.update(pubs)
+    _same(_reopen(str(tmp_path)), reference)
@@ -0,0 +1,49 @@
+import os
+
+import history_store
+from history_store import KEYFRAME_INTERVAL, HistoryStore
+
+
+def test_older_versions_rebuild_across_keyframes(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    versions = []
+    data = []
+    for n in range(2 * KEYFRAME_INTERVAL + 5):
+        if n % 3 == 2 and data:
+            data = data[1:] + [{"id": n, "title": f"Edited {n}"}]
+        else:
+            data = data + [{"id": n, "title": f"Record {n}"}]
+        versions.append((history.record("news", data), list(data)))
+
+    depths = [history._read_snapshot("news", snapshot_id).get("depth") for snapshot_id, _ in versions]
+    assert depths.count(0) == 3
+    for snapshot_id, expected in versions:
+        assert history.load("news", snapshot_id) == expected
+    assert history.load("news") == data
+
+
+def test_saves_find_the_head_without_listing_snapshots(tmp_path, monkeypatch):
+    history = HistoryStore(str(tmp_path))
+    first = history.record("news", [{"id": 1}])
+    history_store._head_cache.clear()
+
+    def listing(name):
+        raise AssertionError("listed the snapshot directory")
+
+    monkeypatch.setattr(history, "list_snapshots", listing)
+    second = history.record("news", [{"id": 1}, {"id": 2}])
+    third = history.record_change("news", {"id": 2}, {"id": 3})
+    assert history._read_snapshot("news", second)["parent"] == first
+    assert history._read_snapshot("news", third)["parent"] == second
+    assert history.load("news") == [{"id": 1}, {"id": 3}]
+
+
+def test_directories_without_head_fall_back_to_the_listing(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    first = history.record("news", [{"id": 1}])
+    os.remove(os.path.join(history._snapshot_dir("news"), history_store.HEAD_FILE))
+    history_store._head_cache.clear()
+
+    second = history.record("news", [{"id": 2}])
+    assert history._read_snapshot("news", second)["parent"] == first
+    assert history.list_snapshots("news") == [second, first]
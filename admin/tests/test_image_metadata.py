@@ -0,0 +1,68 @@
+import pytest
+from PIL import Image, PngImagePlugin
+
+from image_metadata import ORIENTATION_TAG, strip_metadata
+
+GPS_IFD = 0x8825
+MAKE_TAG = 0x010F
+
+
+def _exif(orientation: int = 6):
+    exif = Image.Exif()
+    exif[MAKE_TAG] = "Phone"
+    exif[ORIENTATION_TAG] = orientation
+    exif.get_ifd(GPS_IFD)[2] = (48.0, 8.0, 30.0)
+    return exif
+
+
+def _pixels(path):
+    with Image.open(path) as img:
+        return img.convert("RGB").tobytes()
+
+
+@pytest.mark.parametrize("fmt,ext", [("JPEG", "jpg"), ("PNG", "png"), ("WEBP", "webp")])
+def test_strips_metadata_and_keeps_orientation(tmp_path, fmt, ext):
+    path = tmp_path / f"photo.{ext}"
+    Image.radial_gradient("L").convert("RGB").save(path, format=fmt, exif=_exif())
+    before = _pixels(path)
+
+    assert strip_metadata(str(path))
+    with Image.open(path) as img:
+        exif = img.getexif()
+        assert exif.get(ORIENTATION_TAG) == 6
+        assert MAKE_TAG not in exif and not exif.get_ifd(GPS_IFD)
+    # Not re-encoded: the decoded pixels are identical
+    assert _pixels(path) == before
+
+
+def test_upright_photo_keeps_no_exif(tmp_path):
+    path = tmp_path / "photo.jpg"
+    Image.new("RGB", (32, 32), "red").save(path, exif=_exif(orientation=1))
+    assert strip_metadata(str(path))
+    with Image.open(path) as img:
+        assert not img.getexif()
+
+
+def test_png_text_chunks_removed(tmp_path):
+    path = tmp_path / "scan.png"
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Author", "someone@example.com")
+    Image.new("RGB", (8, 8)).save(path, pnginfo=info)
+    assert strip_metadata(str(path))
+    with Image.open(path) as img:
+        assert "Author" not in img.info
+
+
+def test_file_without_metadata_untouched(tmp_path):
+    path = tmp_path / "plain.jpg"
+    Image.new("RGB", (32, 32), "blue").save(path, quality=70)
+    raw = path.read_bytes()
+    assert not strip_metadata(str(path))
+    assert path.read_bytes() == raw
+
+
+def test_not_an_image_untouched(tmp_path):
+    path = tmp_path / "notes.jpg"
+    path.write_bytes(b"not an image")
+    assert not strip_metadata(str(path))
+    assert path.read_bytes() == b"not an image"
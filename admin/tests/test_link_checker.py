@@ -0,0 +1,139 @@
+import threading
+import time
+
+from conftest import QuietHandler
+from link_checker import LinkChecker, LinkResultStore, check_incremental
+
+
+def test_per_host_limit(http_server):
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class Slow(QuietHandler):
+        def do_HEAD(self):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.2)
+            with lock:
+                state["active"] -= 1
+            self.send_body(200)
+
+    base = http_server(Slow)
+    checker = LinkChecker(max_workers=8, per_host=2)
+    try:
+        results = list(checker.check_all(("Pub PDF", str(i), f"{base}/paper{i}.pdf") for i in range(8)))
+    finally:
+        checker.close()
+    assert len(results) == 8 and all(r["ok"] for r in results)
+    assert state["peak"] == 2
+
+
+def test_retry_after(http_server):
+    calls = []
+
+    class Busy(QuietHandler):
+        def do_HEAD(self):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                self.send_body(503, headers={"Retry-After": "1"})
+            else:
+                self.send_body(200)
+
+    base = http_server(Busy)
+    checker = LinkChecker(retries=2, backoff=0.01)
+    try:
+        result = checker.check_url(f"{base}/busy")
+    finally:
+        checker.close()
+    assert result["ok"] and result["status"] == 200
+    assert len(calls) == 2
+    # Waited as long as the server asked, not the much shorter backoff
+    assert calls[1] - calls[0] >= 0.9
+
+
+def test_head_rejected_falls_back_to_get(http_server):
+    class NoHead(QuietHandler):
+        def do_HEAD(self):
+            self.send_body(405)
+
+        def do_GET(self):
+            self.send_body(200, b"ok")
+
+    base = http_server(NoHead)
+    checker = LinkChecker()
+    try:
+        assert checker.check_url(f"{base}/page")["status"] == 200
+    finally:
+        checker.close()
+
+
+def test_results_reused_until_ttl_expires(http_server, tmp_path):
+    hits = []
+
+    class Counting(QuietHandler):
+        def do_HEAD(self):
+            hits.append(self.path)
+            self.send_body(404 if self.path == "/gone" else 200)
+
+    base = http_server(Counting)
+    links = [("Pub PDF", "A", f"{base}/a.pdf"), ("Pub Code", "B", f"{base}/gone")]
+    checker = LinkChecker(retries=0)
+    try:
+        first = list(check_incremental(checker, LinkResultStore(str(tmp_path)), links))
+        assert not any(r["cached"] for r in first) and len(hits) == 2
+
+        # A new store reads the saved results; both are still fresh
+        store = LinkResultStore(str(tmp_path))
+        second = list(check_incremental(checker, store, links))
+        assert all(r["cached"] for r in second) and len(hits) == 2
+
+        # Past the not_found TTL (one day) only the broken link is probed again
+        for entry in store.results.values():
+            entry["checked_at"] -= 2 * 24 * 3600
+        third = {r["url"]: r for r in check_incremental(checker, store, links)}
+        assert not third[f"{base}/gone"]["cached"] and third[f"{base}/a.pdf"]["cached"]
+        assert hits.count("/gone") == 2 and hits.count("/a.pdf") == 1
+    finally:
+        checker.close()
+
+
+def test_same_url_written_differently_is_probed_once(http_server, tmp_path):
+    hits = []
+
+    class Counting(QuietHandler):
+        def do_HEAD(self):
+            hits.append(self.path)
+            self.send_body(200)
+
+    base = http_server(Counting)
+    upper = base.replace("http://", "HTTP://")
+    links = [("Pub PDF", "A", f"{base}/a.pdf"), ("Pub PDF", "B", f"{upper}/a.pdf#page=2")]
+    checker = LinkChecker()
+    try:
+        results = list(check_incremental(checker, LinkResultStore(str(tmp_path)), links))
+    finally:
+        checker.close()
+    assert hits == ["/a.pdf"]
+    assert sorted(r["url"] for r in results) == sorted(url for _, _, url in links)
+
+
+def test_interrupted_run_keeps_results(http_server, tmp_path, monkeypatch):
+    import link_checker
+    monkeypatch.setattr(link_checker, "FLUSH_EVERY", 2)
+
+    class Ok(QuietHandler):
+        def do_HEAD(self):
+            self.send_body(200)
+
+    base = http_server(Ok)
+    links = [("Pub PDF", str(i), f"{base}/{i}.pdf") for i in range(6)]
+    checker = LinkChecker(max_workers=1)
+    try:
+        run = check_incremental(checker, LinkResultStore(str(tmp_path)), links)
+        next(run)
+        next(run)
+        run.close()
+    finally:
+        checker.close()
+    assert len(LinkResultStore(str(tmp_path)).results) >= 2
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import stat
+import warnings
+import zipfile
+
+import pytest
+
+import data_manager
+import restore
+from backup import MANIFEST_NAME, plan_backup, write_backup
+from restore import RestoreError, stage_restore
+
+PERSON = {"id": "p1", "name": "Ada", "role": "PI", "bio": "", "start_year": 2020}
+
+
+@pytest.fixture
+def live(tmp_path, monkeypatch):
+    data, uploads = tmp_path / "data", tmp_path / "uploads"
+    (data / ".locks").mkdir(parents=True)
+    uploads.mkdir()
+    (data / "people.json").write_text(json.dumps([PERSON]))
+    (data / ".locks" / "people.json.lock").write_text("")
+    (data / ".locks" / "people.json.trusted").write_text("abc")
+    (uploads / "old.png").write_bytes(b"old")
+    sources = {"data": str(data), "uploads": str(uploads)}
+    monkeypatch.setattr(restore, "SOURCES", sources)
+    monkeypatch.setattr(restore, "DATA_DIR", str(data))
+    monkeypatch.setattr(restore, "RESTORE_DIR", str(tmp_path / "restore"))
+    monkeypatch.setattr(data_manager, "DATA_DIR", str(data))
+    return sources
+
+
+def make_archive(path, files, holder=None):
+    """A backup-format archive of `files` (name -> bytes), with a manifest naming their hashes."""
+    name = os.path.basename(path)
+    with zipfile.ZipFile(path, "w") as zf:
+        for arcname, raw in files.items():
+            zf.writestr(arcname, raw)
+        entries = {arcname if isinstance(arcname, str) else arcname.filename:
+                   {"sha256": hashlib.sha256(raw).hexdigest(), "size": len(raw), "in": holder or name}
+                   for arcname, raw in files.items()}
+        zf.writestr(MANIFEST_NAME, json.dumps({"name": name, "kind": "full", "chain": [name], "files": entries}))
+    return path
+
+
+def people(*records):
+    return json.dumps(list(records)).encode("utf-8")
+
+
+@pytest.mark.parametrize("bad_name", ["data/../evil.json", "/data/evil.json", "data\\evil.json", "../evil.json"])
+def test_unsafe_entry_names_reject_the_archive(live, tmp_path, bad_name):
+    path = make_archive(str(tmp_path / "bad.zip"), {"data/people.json": people(PERSON), bad_name: b"x"})
+    with pytest.raises(RestoreError, match="Unsafe path"):
+        stage_restore(path, "bad", str(tmp_path))
+    assert not os.path.exists(tmp_path / "evil.json")
+
+
+def test_symlinks_reject_the_archive(live, tmp_path):
+    link = zipfile.ZipInfo("uploads/link.png")
+    link.external_attr = (stat.S_IFLNK | 0o777) << 16
+    path = make_archive(str(tmp_path / "bad.zip"), {"data/people.json": people(PERSON), link: b"/etc/passwd"})
+    with pytest.raises(RestoreError, match="Symbolic link"):
+        stage_restore(path, "bad", str(tmp_path))
+
+
+def test_duplicate_entries_reject_the_archive(live, tmp_path):
+    path = str(tmp_path / "bad.zip")
+    with warnings.catch_warnings(), zipfile.ZipFile(path, "w") as zf:
+        warnings.simplefilter("ignore")
+        zf.writestr("data/people.json", people(PERSON))
+        zf.writestr("data/people.json", people())
+    with pytest.raises(RestoreError, match="Duplicate entry"):
+        stage_restore(path, "bad", str(tmp_path))
+
+
+@pytest.mark.parametrize("absolute", [False, True])
+def test_chain_archives_are_only_read_from_the_backup_dir(live, tmp_path, absolute):
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    # A real archive exists where the manifest points, but outside backup_dir
+    outside = make_archive(str(tmp_path / "outside.zip"), {"data/people.json": people(PERSON)})
+    holder = outside if absolute else "../outside.zip"
+    path = make_archive(str(backup_dir / "head.zip"), {"data/people.json": people(PERSON)}, holder=holder)
+    with pytest.raises(RestoreError, match="outside.zip, which is not in"):
+        stage_restore(path, "head", str(backup_dir))
+    assert os.path.exists(outside)
+
+
+def test_hash_mismatch_blocks_the_restore(live, tmp_path):
+    path = str(tmp_path / "tampered.zip")
+    make_archive(path, {"data/people.json": people(PERSON)})
+    with zipfile.ZipFile(path) as zf:
+        manifest = zf.read(MANIFEST_NAME)
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("data/people.json", people(dict(PERSON, name="Mallory")))
+        zf.writestr(MANIFEST_NAME, manifest)
+
+    staged = stage_restore(path, "tampered", str(tmp_path))
+    assert not staged.ok
+    assert any("does not match the backup manifest" in e for e in staged.errors)
+    with pytest.raises(RestoreError):
+        staged.apply()
+    staged.discard()
+
+
+def test_incremental_needs_its_base_archive(live, tmp_path):
+    backup_dir = str(tmp_path / "backups")
+    full = write_backup(plan_backup(False, backup_dir, live), backup_dir)
+    with open(os.path.join(live["uploads"], "new.png"), "wb") as f:
+        f.write(b"new")
+    incremental = write_backup(plan_backup(True, backup_dir, live), backup_dir)
+    assert "incremental" in incremental
+
+    os.remove(full)
+    with pytest.raises(RestoreError, match="needs .*full.zip"):
+        stage_restore(incremental, "incremental", backup_dir)
+
+
+def test_invalid_people_block_the_restore(live, tmp_path):
+    path = make_archive(str(tmp_path / "invalid.zip"), {"data/people.json": people({"id": "p2", "name": "No role"})})
+    staged = stage_restore(path, "invalid", str(tmp_path))
+    assert not staged.ok
+    assert any(e.startswith("people.json row 1") for e in staged.errors)
+    with pytest.raises(RestoreError, match="did not pass validation"):
+        staged.apply()
+    staged.discard()
+    assert json.loads(open(os.path.join(live["data"], "people.json")).read()) == [PERSON]
+
+
+def test_apply_swaps_in_the_backup_keeping_locks_but_not_trust_marks(live, tmp_path):
+    grace = dict(PERSON, id="p2", name="Grace")
+    path = make_archive(str(tmp_path / "good.zip"), {
+        "data/people.json": people(PERSON, grace),
+        "uploads/new.png": b"new",
+    })
+    staged = stage_restore(path, "good", str(tmp_path))
+    assert staged.ok, staged.errors
+    assert {"Item": "People", "Added": 1, "Removed": 0, "Changed": 0, "Unchanged": 1} in staged.diff
+
+    previous = staged.apply()
+    data, uploads = live["data"], live["uploads"]
+    assert json.loads(open(os.path.join(data, "people.json")).read()) == [PERSON, grace]
+    assert sorted(os.listdir(uploads)) == ["new.png"]
+    assert os.path.exists(os.path.join(data, ".locks", "people.json.lock"))
+    assert not [n for n in os.listdir(os.path.join(data, ".locks")) if n.endswith(".trusted")]
+    # The replaced data is kept, and the restore is logged in the restored data
+    assert os.path.exists(os.path.join(previous, "uploads", "old.png"))
+    assert json.loads(open(os.path.join(previous, "data", "people.json")).read()) == [PERSON]
+    assert data_manager.DataLayer().get_audit_logs()[0]["action"] == "RESTORE"
+    with pytest.raises(RestoreError, match="already applied"):
+        staged.apply()
@@ -0,0 +1,32 @@
+import json
+
+from data_manager import DataLayer, Person, Project
+from site_export import export_site
+
+PHOTO = {
+    "src": "/uploads/ada.jpg", "width": 3000, "height": 2000, "webp": "/uploads/_variants/ada.webp",
+    "variants": [{"width": 320, "src": "/uploads/_variants/ada.w320.webp"}],
+    "placeholder": "data:image/webp;base64,AAAA",
+}
+
+
+def test_records_carry_the_manifest_entries_of_their_images(tmp_path):
+    db = DataLayer(backend="json", data_dir=str(tmp_path / "data"))
+    (tmp_path / "data" / "image_manifest.json").write_text(json.dumps({PHOTO["src"]: PHOTO}))
+    db.save_people([
+        Person(name="Ada", role="PI", bio="", start_year=2020, photo="/uploads/ada.jpg"),
+        Person(name="Grace", role="PI", bio="", start_year=2020, photo="/uploads/not-ingested.jpg"),
+    ])
+    db.save_projects([Project(title="P", description="", status="Ongoing",
+                              images=["/uploads/not-ingested.jpg", "/uploads/ada.jpg"])])
+
+    out = tmp_path / "content"
+    export_site(db, str(out))
+    people = json.loads((out / "people.json").read_text())
+    projects = json.loads((out / "projects.json").read_text())
+
+    info = {k: v for k, v in PHOTO.items() if k != "src"}
+    assert people[0]["image_info"] == {"/uploads/ada.jpg": info}
+    assert "image_info" not in people[1]
+    assert projects[0]["image_info"] == {"/uploads/ada.jpg": info}
+    assert "image_info" not in json.loads((out / "profile.json").read_text())
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+from typing import Dict
+
+from PIL import Image, ImageOps
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THUMB_DIR = os.path.join(ROOT_DIR, ".cache", "thumbnails")
+
+# Total size the cache may grow to before the least recently used thumbnails are evicted.
+MAX_CACHE_BYTES = int(os.environ.get("LAB_THUMB_CACHE_MB", "200")) * 1024 * 1024
+
+_lock = threading.Lock()
+# (path, mtime_ns, size) -> content hash, so unchanged files are only hashed once per process
+_hash_memo: Dict[tuple, str] = {}
+_cache_bytes = None
+
+
+def source_hash(path: str) -> str:
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    digest = _hash_memo.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        digest = _hash_memo[key] = h.hexdigest()
+    return digest
+
+
+def _current_cache_bytes() -> int:
+    global _cache_bytes
+    if _cache_bytes is None:
+        _cache_bytes = sum(e.stat().st_size for e in os.scandir(THUMB_DIR) if e.is_file())
+    return _cache_bytes
+
+
+def _evict(keep: str):
+    """Drops least recently used thumbnails (oldest mtime) until the cache fits again, sparing `keep`."""
+    global _cache_bytes
+    entries = sorted((e for e in os.scandir(THUMB_DIR) if e.is_file()), key=lambda e: e.stat().st_mtime)
+    total = sum(e.stat().st_size for e in entries)
+    target = MAX_CACHE_BYTES * 0.8
+    for e in entries:
+        if total <= target:
+            break
+        if e.path == keep:
+            continue
+        try:
+            size = e.stat().st_size
+            os.remove(e.path)
+            total -= size
+        except FileNotFoundError:
+            pass
+    _cache_bytes = total
+
+
+def thumbnail(path: str, size: int = 256) -> str:
+    """
+    Path of a cached thumbnail (at most `size` px on the long side) for the image at `path`.
+    Thumbnails are keyed by source content hash and size, generated on first use, and
+    touched on every hit so eviction can drop the least recently used ones.
+    Falls back to the original path if the file cannot be decoded as an image.
+    """
+    global _cache_bytes
+    try:
+        digest = source_hash(path)
+    except OSError:
+        return path
+    thumb_path = os.path.join(THUMB_DIR, f"{digest[:24]}_{size}.webp")
+
+    if os.path.exists(thumb_path):
+        try:
+            os.utime(thumb_path)
+        except OSError:
+            pass
+        return thumb_path
+
+    os.makedirs(THUMB_DIR, exist_ok=True)
+    try:
+        with Image.open(path) as img:
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((size, size))
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            tmp = f"{thumb_path}.{threading.get_ident()}.tmp"
+            img.save(tmp, format="WEBP", quality=75)
+        os.replace(tmp, thumb_path)
+    except Exception:
+        return path
+
+    with _lock:
+        if _cache_bytes is None:
+            _current_cache_bytes()
+        else:
+            _cache_bytes += os.path.getsize(thumb_path)
+        if _cache_bytes > MAX_CACHE_BYTES:
+            _evict(thumb_path)
+    return thumb_path
@@ -1,32 +1,181 @@
 import os
+import base64
+import hashlib
+import io
+import json
+import uuid
+import threading
 import streamlit as st
-from PIL import Image
+from PIL import Image, ImageOps
 import shutil
 
-UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web", "public", "uploads")
+from image_metadata import strip_metadata
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOAD_DIR = os.path.join(ROOT_DIR, "web", "public", "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Derived images live in a subfolder so the Media Library only lists originals.
+VARIANTS_DIR = os.path.join(UPLOAD_DIR, "_variants")
+# The manifest changes on every upload, so it stays out of the immutable /uploads tree.
+MANIFEST_PATH = os.path.join(ROOT_DIR, "data", "image_manifest.json")
+
+# Largest accepted upload, configurable through LAB_MAX_UPLOAD_MB.
+MAX_UPLOAD_BYTES = int(os.environ.get("LAB_MAX_UPLOAD_MB", "20")) * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+RESPONSIVE_WIDTHS = (320, 640, 1280)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+_executor = None
+_manifest_lock = threading.Lock()
+
+# --- Image Ingestion ---
+
+def ingest_image(file_path: str) -> dict:
+    """
+    Writes the responsive variants of one uploaded image: WebP copies at
+    RESPONSIVE_WIDTHS (never upscaling) plus full size, turned upright by the
+    EXIF orientation. Returns the manifest entry with dimensions and a tiny blur
+    placeholder. The original is only read; its metadata was stripped before it
+    was named. Runs in a worker process, so it only touches the files it is given.
+    """
+    filename = os.path.basename(file_path)
+    stem = os.path.splitext(filename)[0]
+    os.makedirs(VARIANTS_DIR, exist_ok=True)
+
+    with Image.open(file_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+        width, height = img.size
+        variants = []
+        for target in RESPONSIVE_WIDTHS:
+            if target >= width:
+                break
+            resized = img.resize((target, round(height * target / width)), Image.LANCZOS)
+            name = f"{stem}.w{target}.webp"
+            resized.save(os.path.join(VARIANTS_DIR, name), format="WEBP", quality=80, method=4)
+            variants.append({"width": target, "src": f"/uploads/_variants/{name}"})
+
+        webp_name = f"{stem}.webp"
+        img.save(os.path.join(VARIANTS_DIR, webp_name), format="WEBP", quality=82, method=4)
+
+        thumb = img.copy()
+        thumb.thumbnail((16, 16))
+        buf = io.BytesIO()
+        thumb.save(buf, format="WEBP", quality=30)
+        placeholder = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+    return {
+        "src": f"/uploads/{filename}",
+        "width": width,
+        "height": height,
+        "webp": f"/uploads/_variants/{webp_name}",
+        "variants": variants,
+        "placeholder": placeholder,
+    }
+
+def load_image_manifest() -> dict:
+    """Manifest of ingested images, keyed by their /uploads/... path."""
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _record_ingest(future):
+    try:
+        entry = future.result()
+    except Exception as e:
+        print(f"Image ingestion failed: {e}")
+        return
+    with _manifest_lock:
+        manifest = load_image_manifest()
+        manifest[entry["src"]] = entry
+        tmp = MANIFEST_PATH + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, MANIFEST_PATH)
+
+def schedule_ingest(file_path: str):
+    """Queues an uploaded image for ingestion in the background process pool."""
+    global _executor
+    if os.path.splitext(file_path)[1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    if _executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Spawn rather than fork: the Streamlit server process is heavily threaded
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, min(4, (os.cpu_count() or 2) - 1)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    future = _executor.submit(ingest_image, file_path)
+    future.add_done_callback(_record_ingest)
+    return future
+
+class UploadTooLarge(Exception):
+    pass
+
+def fingerprinted_name(digest: str, original_name: str) -> str:
+    ext = os.path.splitext(original_name)[1].lower()
+    if ext == ".jpeg":
+        ext = ".jpg"
+    return f"{digest[:20]}{ext}"
+
 def save_uploaded_file(uploaded_file, old_path=None):
     """
     Saves an uploaded file to web/public/uploads and returns the relative path for Next.js.
-    If old_path is provided, it tries to preserve the filename or clean up (optional).
-    For now, simplicity: unique filename or overwrite if same name.
+    The file is streamed to a temporary name while being hashed, then stored under a
+    name derived from its SHA-256, so different files never collide and identical bytes
+    resolve to the one stored copy. Such names never change meaning, which lets the
+    site serve /uploads/* with far-future cache headers.
     """
     if uploaded_file is None:
         return None
 
+    tmp_path = os.path.join(UPLOAD_DIR, f".upload-{uuid.uuid4().hex}.part")
     try:
-        # Create a safe filename
-        filename = uploaded_file.name.replace(" ", "_")
+        digest = hashlib.sha256()
+        size = 0
+        uploaded_file.seek(0)
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = uploaded_file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge(f"{uploaded_file.name} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                digest.update(chunk)
+                f.write(chunk)
+
+        # GPS and camera metadata come out before the file is named, so the
+        # fingerprinted name always matches the bytes stored under it
+        if os.path.splitext(uploaded_file.name)[1].lower() in IMAGE_EXTENSIONS and strip_metadata(tmp_path):
+            digest = hashlib.sha256()
+            with open(tmp_path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+
+        filename = fingerprinted_name(digest.hexdigest(), uploaded_file.name)
         file_path = os.path.join(UPLOAD_DIR, filename)
-        
-        # Save the file
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
+        if os.path.exists(file_path):
+            # Same bytes already stored (and ingested)
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, file_path)
+            # Resizing and WebP encoding happen off the script thread
+            schedule_ingest(file_path)
+
         # Return path relative to 'public' folder for Next.js (e.g., /uploads/image.jpg)
         return f"/uploads/{filename}"
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         st.error(f"Error saving file: {e}")
         return None
 
@@ -47,7 +196,8 @@ def image_uploader_widget(label, current_path=None, key=None):
         
         local_full_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web", "public") + current_path
         if os.path.exists(local_full_path):
-             st.image(local_full_path, caption="Current Image", width=200)
+             from thumbnails import thumbnail
+             st.image(thumbnail(local_full_path, 400), caption="Current Image", width=200)
         else:
              st.warning(f"Constructed path not found: {local_full_path}")
              # If it's an external URL (legacy), try showing it directly
@@ -63,3 +213,36 @@ def image_uploader_widget(label, current_path=None, key=None):
             return new_path
     
     return current_path
+
+def save_uploaded_files(uploaded_files):
+    """Saves a batch of uploads; their ingestion runs in parallel in the process pool."""
+    paths = []
+    for uploaded in uploaded_files or []:
+        path = save_uploaded_file(uploaded)
+        if path:
+            paths.append(path)
+    return paths
+
+def multi_image_uploader_widget(label, key=None):
+    """Uploader for several images at once. Returns the list of new paths."""
+    uploaded = st.file_uploader(label, type=["jpg", "png", "jpeg", "webp"], accept_multiple_files=True, key=key)
+    paths = save_uploaded_files(uploaded)
+    if paths:
+        st.success(f"Uploaded {len(paths)} image(s). Responsive versions are being generated in the background.")
+    return paths
+
+def delete_upload(filename: str):
+    """Removes an upload together with its responsive variants and manifest entry."""
+    os.remove(os.path.join(UPLOAD_DIR, filename))
+    stem = os.path.splitext(filename)[0]
+    if os.path.isdir(VARIANTS_DIR):
+        for variant in os.listdir(VARIANTS_DIR):
+            if variant.startswith(stem + "."):
+                os.remove(os.path.join(VARIANTS_DIR, variant))
+    with _manifest_lock:
+        manifest = load_image_manifest()
+        if manifest.pop(f"/uploads/{filename}", None) is not None:
+            tmp = MANIFEST_PATH + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp, MANIFEST_PATH)
@@ -3,7 +3,7 @@ import "./globals.css";
 import Navbar from "@/components/Navbar";
 import Footer from "@/components/Footer";
 import { GlobalSearch } from "@/components/GlobalSearch";
-import { getPeople, getProjects, getNews } from "@/lib/api";
+import { getSearchIndexFile, getChatIndexFile } from "@/lib/api";
 import { ParticleBackground } from "@/components/ui/ParticleBackground";
 import { GridBackground } from "@/components/ui/GridBackground";
 import { Preloader } from "@/components/ui/Preloader";
@@ -58,13 +58,11 @@ export default async function RootLayout({
 }: Readonly<{
   children: React.ReactNode;
 }>) {
-  // Fetch data for global search
-  const people = await getPeople();
-  const projects = await getProjects();
-  const news = await getNews();
+  // Pages are listed inline; everything else is looked up in the sharded index the browser fetches on demand
+  const searchIndex = await getSearchIndexFile();
+  const chatIndex = await getChatIndexFile();
 
-  const searchItems = [
-    // Pages
+  const searchPages = [
     { id: 'page-home', title: 'Home', type: 'page', url: '/' },
     { id: 'page-lab', title: 'Lab Info', type: 'page', url: '/lab' },
     { id: 'page-people', title: 'People', type: 'page', url: '/people' },
@@ -72,15 +70,6 @@ export default async function RootLayout({
     { id: 'page-publications', title: 'Publications', type: 'page', url: '/publications' },
     { id: 'page-news', title: 'News', type: 'page', url: '/news' },
     { id: 'page-contact', title: 'Contact', type: 'page', url: '/contact' },
-
-    // People
-    ...people.map((p, i) => ({ id: `person-${i}`, title: p.name, type: 'person', url: '/people' })),
-
-    // Projects
-    ...projects.map((p, i) => ({ id: `project-${i}`, title: p.title, type: 'project', url: '/projects' })),
-
-    // News
-    ...news.map((n, i) => ({ id: `news-${i}`, title: n.title, type: 'news', url: '/news' })),
   ];
 
   return (
@@ -107,8 +96,8 @@ export default async function RootLayout({
             <ScrollProgress />
             <Navbar />
             {/* eslint-disable-next-line @typescript-eslint/no-explicit-any */}
-            <GlobalSearch items={searchItems as any} />
-            <AIChatWidget />
+            <GlobalSearch pages={searchPages as any} index={searchIndex} />
+            <AIChatWidget index={chatIndex} />
 
             {/* Main content z-10 relative. Removed backdrop-blur to show ParticleBackground cleanly */}
             <main className="flex-grow z-10 relative bg-background/0 mb-0 shadow-2xl border-b border-white/5">
@@ -1,4 +1,4 @@
-import { getProfile, getLabInfo, getNews } from '@/lib/api';
+import { getProfile, getLabInfo, getFeaturedNews } from '@/lib/api';
 import Link from 'next/link';
 import { SpotlightCard } from '@/components/ui/SpotlightCard';
 import { MagneticButton } from '@/components/ui/MagneticButton';
@@ -11,7 +11,7 @@ import { ParallaxImage } from '@/components/ui/ParallaxImage';
 export default async function Home() {
   const profile = await getProfile();
   const labInfo = await getLabInfo();
-  const news = (await getNews()).filter(n => n.featured).slice(0, 4); // Get 4 items for grid
+  const news = await getFeaturedNews(); // 4 items for grid
 
   return (
     <div className="min-h-screen text-foreground selection:bg-accent-500 selection:text-white">
@@ -51,6 +51,7 @@ export default async function Home() {
               {profile.profile_photo ? (
                 <ParallaxImage
                   src={profile.profile_photo}
+                  info={profile.image_info?.[profile.profile_photo]}
                   alt={profile.name}
                   fill
                   sizes="(max-width: 768px) 100vw, 50vw"
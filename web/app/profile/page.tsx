@@ -1,7 +1,7 @@
 import { getProfile } from '@/lib/api';
 import { FloatingShapes } from '@/components/ui/FloatingShapes';
 import { SpotlightCard } from '@/components/ui/SpotlightCard';
-import Image from 'next/image';
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage';
 
 export default async function Profile() {
     const profile = await getProfile();
@@ -18,7 +18,7 @@ export default async function Profile() {
                         <SpotlightCard className="p-2 border-border bg-card">
                             {profile.profile_photo ? (
                                 <div className="relative w-full aspect-[3/4] rounded-lg overflow-hidden">
-                                    <Image src={profile.profile_photo} alt={profile.name} fill sizes="(max-width: 768px) 100vw, 33vw" className="object-cover grayscale hover:grayscale-0 transition-all duration-700" />
+                                    <ResponsiveImage src={profile.profile_photo} info={profile.image_info?.[profile.profile_photo]} alt={profile.name} fill sizes="(max-width: 768px) 100vw, 33vw" className="object-cover grayscale hover:grayscale-0 transition-all duration-700" />
                                 </div>
                             ) : (
                                 <div className="w-full aspect-[3/4] bg-muted rounded-lg flex items-center justify-center text-6xl">👤</div>
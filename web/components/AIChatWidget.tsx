@@ -1,15 +1,79 @@
 "use client";
 
 import { useState, useRef, useEffect } from 'react';
+import Link from 'next/link';
 import { motion, AnimatePresence } from 'framer-motion';
+import { tokenize } from '@/lib/tokenize';
+
+interface Source {
+    title: string;
+    url: string;
+}
 
 interface Message {
     role: 'user' | 'assistant';
     content: string;
     suggestions?: string[];
+    sources?: Source[];
+}
+
+interface AIChatWidgetProps {
+    index: string | null;  // content-hashed BM25 index in /chat, fetched when the chat is first opened
+}
+
+// Parsed form of the file written by admin/chat_index.py
+interface ChatIndex {
+    scale: number;
+    terms: Map<string, number>;
+    sources: [string, string][];
+    chunks: [number, string][];
+    offsets: Uint32Array;
+    ids: Uint16Array;
+    weights: Uint8Array;
 }
 
-export function AIChatWidget() {
+const TOP_K = 3;
+
+// Typed array views read the little-endian file directly (every browser platform is little endian)
+function parseIndex(buf: ArrayBuffer): ChatIndex {
+    const headerLength = new DataView(buf).getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 8, headerLength)));
+    const termCount = header.terms.length;
+    let pos = 8 + headerLength;
+    const offsets = new Uint32Array(buf, pos, termCount + 1);
+    pos += 4 * (termCount + 1);
+    const total = offsets[termCount];
+    const ids = new Uint16Array(buf, pos, total);
+    const weights = new Uint8Array(buf, pos + 2 * total, total);
+    const terms = new Map<string, number>(header.terms.map((t: string, i: number) => [t, i]));
+    return { scale: header.scale, terms, sources: header.sources, chunks: header.chunks, offsets, ids, weights };
+}
+
+// Top passages by BM25 (weights precomputed at export), at most one per source
+function retrieve(index: ChatIndex, query: string): { source: Source; snippet: string }[] {
+    const scores = new Map<number, number>();
+    for (const token of new Set(tokenize(query))) {
+        const t = index.terms.get(token);
+        if (t === undefined) continue;
+        for (let j = index.offsets[t]; j < index.offsets[t + 1]; j++) {
+            scores.set(index.ids[j], (scores.get(index.ids[j]) || 0) + index.weights[j]);
+        }
+    }
+    const ranked = [...scores.entries()].sort((a, b) => b[1] - a[1]);
+    const results: { source: Source; snippet: string }[] = [];
+    const seen = new Set<number>();
+    for (const [chunk] of ranked) {
+        const [sourceId, snippet] = index.chunks[chunk];
+        if (seen.has(sourceId)) continue;
+        seen.add(sourceId);
+        const [title, url] = index.sources[sourceId];
+        results.push({ source: { title, url }, snippet });
+        if (results.length === TOP_K) break;
+    }
+    return results;
+}
+
+export function AIChatWidget({ index }: AIChatWidgetProps) {
     const [isOpen, setIsOpen] = useState(false);
     const [messages, setMessages] = useState<Message[]>([
         {
@@ -21,6 +85,16 @@ export function AIChatWidget() {
     const [input, setInput] = useState('');
     const [isTyping, setIsTyping] = useState(false);
     const scrollRef = useRef<HTMLDivElement>(null);
+    const [chatIndex, setChatIndex] = useState<ChatIndex | null>(null);
+
+    // The index is only downloaded once the chat is opened
+    useEffect(() => {
+        if (!isOpen || chatIndex || !index) return;
+        fetch(`${process.env.NEXT_PUBLIC_BASE_PATH || ''}/chat/${index}`)
+            .then(r => (r.ok ? r.arrayBuffer() : Promise.reject(new Error(`HTTP ${r.status}`))))
+            .then(buf => setChatIndex(parseIndex(buf)))
+            .catch(() => setChatIndex(null));
+    }, [isOpen, chatIndex, index]);
 
     // Auto-scroll
     useEffect(() => {
@@ -49,6 +123,19 @@ export function AIChatWidget() {
     const generateResponse = (query: string): Message => {
         const q = query.toLowerCase();
 
+        // 0. Passages from the lab's own content
+        if (chatIndex) {
+            const hits = retrieve(chatIndex, query);
+            if (hits.length > 0) {
+                const [best] = hits;
+                return {
+                    role: 'assistant',
+                    content: best.snippet ? `${best.snippet}${best.snippet.endsWith('.') ? '' : '…'}` : `You may find this in "${best.source.title}".`,
+                    sources: hits.map(h => h.source)
+                };
+            }
+        }
+
         // 1. PI / Lab Info
         if (q.includes('pi') || q.includes('who is') || q.includes('professor') || q.includes('lead')) {
             return {
@@ -138,6 +225,22 @@ export function AIChatWidget() {
                                         {msg.content}
                                     </div>
 
+                                    {/* Sources */}
+                                    {msg.sources && (
+                                        <div className="flex flex-col gap-1 mt-2 max-w-[80%]">
+                                            {msg.sources.map(src => (
+                                                <Link
+                                                    key={src.title + src.url}
+                                                    href={src.url}
+                                                    onClick={() => setIsOpen(false)}
+                                                    className="text-xs text-accent-500 hover:underline truncate"
+                                                >
+                                                    ↗ {src.title}
+                                                </Link>
+                                            ))}
+                                        </div>
+                                    )}
+
                                     {/* Suggestions */}
                                     {msg.suggestions && (
                                         <div className="flex flex-wrap gap-2 mt-2">
@@ -4,20 +4,103 @@ import * as React from "react";
 import { useRouter } from "next/navigation";
 import { Command } from "cmdk";
 import { motion, AnimatePresence } from "framer-motion";
+import { SearchManifest } from "@/lib/types";
+import { termLength, termPrefix, tokenize } from "@/lib/tokenize";
 
 interface SearchItem {
     id: string;
     title: string;
-    type: "page" | "person" | "project" | "news";
+    type: "page" | "person" | "publication" | "project" | "news";
     url: string;
+    subtitle?: string;
 }
 
 interface GlobalSearchProps {
-    items: SearchItem[];
+    pages: SearchItem[];
+    index: string | null;  // content-hashed index file in /search, fetched when search first opens
 }
 
-export function GlobalSearch({ items }: GlobalSearchProps) {
+interface TermShard {
+    t: string[];    // sorted terms
+    p: number[][];  // flat postings per term: doc id, weight, doc id, weight, ...
+}
+
+type DocRow = [string, string, SearchItem["type"], string];
+
+const BASE = `${process.env.NEXT_PUBLIC_BASE_PATH || ''}/search`;
+const MAX_RESULTS = 20;
+
+// Files are content-hashed, so one fetch per name is enough for the lifetime of the page
+const fileCache = new Map<string, Promise<unknown>>();
+function fetchJson<T>(name: string): Promise<T> {
+    if (!fileCache.has(name)) {
+        const request = fetch(`${BASE}/${name}`).then(r => {
+            if (!r.ok) throw new Error(`${name}: HTTP ${r.status}`);
+            return r.json();
+        });
+        request.catch(() => fileCache.delete(name));
+        fileCache.set(name, request);
+    }
+    return fileCache.get(name) as Promise<T>;
+}
+
+// Doc id -> summed weight over every term starting with `prefix`
+async function matchPrefix(manifest: SearchManifest, prefix: string): Promise<Map<number, number>> {
+    const scores = new Map<number, number>();
+    const file = manifest.terms[termPrefix(prefix, manifest.prefix_len)];
+    if (!file) return scores;
+    const shard = await fetchJson<TermShard>(file);
+    // Binary search for the first term >= prefix, then walk while terms share the prefix
+    let lo = 0, hi = shard.t.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (shard.t[mid] < prefix) lo = mid + 1; else hi = mid;
+    }
+    for (let i = lo; i < shard.t.length && shard.t[i].startsWith(prefix); i++) {
+        const exact = shard.t[i] === prefix ? 2 : 1;
+        const postings = shard.p[i];
+        for (let j = 0; j < postings.length; j += 2) {
+            scores.set(postings[j], (scores.get(postings[j]) || 0) + postings[j + 1] * exact);
+        }
+    }
+    return scores;
+}
+
+async function searchIndex(manifest: SearchManifest, query: string): Promise<SearchItem[]> {
+    const tokens = tokenize(query).filter(t => termLength(t) >= manifest.prefix_len);
+    if (tokens.length === 0) return [];
+
+    // Every token must match (as a prefix, so the last one can still be typed)
+    const perToken = await Promise.all(tokens.map(t => matchPrefix(manifest, t)));
+    const [first, ...rest] = perToken.sort((a, b) => a.size - b.size);
+    const ranked = [...first.entries()]
+        .filter(([id]) => rest.every(m => m.has(id)))
+        .map(([id, score]) => [id, rest.reduce((s, m) => s + (m.get(id) || 0), score)] as [number, number])
+        .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+        .slice(0, MAX_RESULTS);
+
+    return Promise.all(ranked.map(async ([id]) => {
+        const collection = Math.floor(id / manifest.id_stride);
+        const position = id % manifest.id_stride;
+        const chunk = await fetchJson<DocRow[]>(manifest.docs[`${collection}-${Math.floor(position / manifest.doc_chunk)}`]);
+        const [title, url, type, subtitle] = chunk[position % manifest.doc_chunk];
+        return { id: `doc-${id}`, title, url, type, subtitle };
+    }));
+}
+
+const GROUPS: { type: SearchItem["type"]; heading: string; icon: string }[] = [
+    { type: "page", heading: "Pages", icon: "📄" },
+    { type: "person", heading: "People", icon: "👤" },
+    { type: "publication", heading: "Publications", icon: "📚" },
+    { type: "project", heading: "Projects", icon: "🧪" },
+    { type: "news", heading: "News", icon: "📰" },
+];
+
+export function GlobalSearch({ pages, index }: GlobalSearchProps) {
     const [open, setOpen] = React.useState(false);
+    const [query, setQuery] = React.useState("");
+    const [results, setResults] = React.useState<SearchItem[]>([]);
+    const [manifest, setManifest] = React.useState<SearchManifest | null>(null);
     const router = useRouter();
 
     React.useEffect(() => {
@@ -32,6 +115,27 @@ export function GlobalSearch({ items }: GlobalSearchProps) {
         return () => document.removeEventListener("keydown", down);
     }, []);
 
+    // The index file is only fetched once search is first opened
+    React.useEffect(() => {
+        if (!open || manifest || !index) return;
+        fetchJson<SearchManifest>(index).then(setManifest).catch(() => setManifest(null));
+    }, [open, manifest, index]);
+
+    React.useEffect(() => {
+        if (!manifest) return;
+        let current = true;
+        searchIndex(manifest, query)
+            .then(found => { if (current) setResults(found); })
+            .catch(() => { if (current) setResults([]); });
+        return () => { current = false; };
+    }, [manifest, query]);
+
+    const visible = React.useMemo(() => {
+        const q = query.trim().toLowerCase();
+        const matchingPages = pages.filter(p => !q || p.title.toLowerCase().includes(q));
+        return [...matchingPages, ...(q ? results : [])];
+    }, [pages, results, query]);
+
     const runCommand = React.useCallback((command: () => unknown) => {
         setOpen(false);
         command();
@@ -57,11 +161,13 @@ export function GlobalSearch({ items }: GlobalSearchProps) {
                         exit={{ opacity: 0, scale: 0.95, y: -20 }}
                         className="relative w-full max-w-2xl bg-popover border border-border rounded-xl shadow-2xl overflow-hidden"
                     >
-                        <Command className="w-full bg-transparent">
+                        <Command className="w-full bg-transparent" shouldFilter={false}>
                             <div className="flex items-center border-b border-border px-4">
                                 <span className="text-muted-foreground mr-3">🔍</span>
                                 <Command.Input
-                                    placeholder="Search for people, projects, pages..."
+                                    value={query}
+                                    onValueChange={setQuery}
+                                    placeholder="Search for people, publications, projects, pages..."
                                     className="w-full bg-transparent py-4 text-lg text-foreground placeholder:text-muted-foreground focus:outline-none"
                                 />
                             </div>
@@ -69,57 +175,26 @@ export function GlobalSearch({ items }: GlobalSearchProps) {
                             <Command.List className="max-h-[60vh] overflow-y-auto p-2 scroll-py-2">
                                 <Command.Empty className="py-6 text-center text-muted-foreground">No results found.</Command.Empty>
 
-                                <Command.Group heading="Pages" className="mb-2 text-xs font-bold text-muted-foreground uppercase tracking-wider px-2">
-                                    {items.filter(i => i.type === 'page').map(item => (
-                                        <Command.Item
-                                            key={item.id}
-                                            onSelect={() => runCommand(() => router.push(item.url))}
-                                            className="flex items-center gap-3 px-3 py-3 rounded-lg text-muted-foreground aria-selected:bg-accent aria-selected:text-accent-foreground cursor-pointer transition-colors"
-                                        >
-                                            <span className="text-lg">📄</span>
-                                            <span className="text-base font-medium">{item.title}</span>
-                                        </Command.Item>
-                                    ))}
-                                </Command.Group>
-
-                                <Command.Group heading="People" className="mb-2 text-xs font-bold text-muted-foreground uppercase tracking-wider px-2">
-                                    {items.filter(i => i.type === 'person').map(item => (
-                                        <Command.Item
-                                            key={item.id}
-                                            onSelect={() => runCommand(() => router.push(item.url))}
-                                            className="flex items-center gap-3 px-3 py-3 rounded-lg text-muted-foreground aria-selected:bg-accent aria-selected:text-accent-foreground cursor-pointer transition-colors"
-                                        >
-                                            <span className="text-lg">👤</span>
-                                            <span className="text-base font-medium">{item.title}</span>
-                                        </Command.Item>
-                                    ))}
-                                </Command.Group>
-
-                                <Command.Group heading="Projects" className="mb-2 text-xs font-bold text-muted-foreground uppercase tracking-wider px-2">
-                                    {items.filter(i => i.type === 'project').map(item => (
-                                        <Command.Item
-                                            key={item.id}
-                                            onSelect={() => runCommand(() => router.push(item.url))}
-                                            className="flex items-center gap-3 px-3 py-3 rounded-lg text-muted-foreground aria-selected:bg-accent aria-selected:text-accent-foreground cursor-pointer transition-colors"
-                                        >
-                                            <span className="text-lg">🧪</span>
-                                            <span className="text-base font-medium">{item.title}</span>
-                                        </Command.Item>
-                                    ))}
-                                </Command.Group>
-
-                                <Command.Group heading="News" className="mb-2 text-xs font-bold text-muted-foreground uppercase tracking-wider px-2">
-                                    {items.filter(i => i.type === 'news').map(item => (
-                                        <Command.Item
-                                            key={item.id}
-                                            onSelect={() => runCommand(() => router.push(item.url))}
-                                            className="flex items-center gap-3 px-3 py-3 rounded-lg text-muted-foreground aria-selected:bg-accent aria-selected:text-accent-foreground cursor-pointer transition-colors"
-                                        >
-                                            <span className="text-lg">📰</span>
-                                            <span className="text-base font-medium">{item.title}</span>
-                                        </Command.Item>
-                                    ))}
-                                </Command.Group>
+                                {GROUPS.map(group => {
+                                    const groupItems = visible.filter(i => i.type === group.type);
+                                    if (groupItems.length === 0) return null;
+                                    return (
+                                        <Command.Group key={group.type} heading={group.heading} className="mb-2 text-xs font-bold text-muted-foreground uppercase tracking-wider px-2">
+                                            {groupItems.map(item => (
+                                                <Command.Item
+                                                    key={item.id}
+                                                    value={item.id}
+                                                    onSelect={() => runCommand(() => router.push(item.url))}
+                                                    className="flex items-center gap-3 px-3 py-3 rounded-lg text-muted-foreground aria-selected:bg-accent aria-selected:text-accent-foreground cursor-pointer transition-colors"
+                                                >
+                                                    <span className="text-lg">{group.icon}</span>
+                                                    <span className="text-base font-medium">{item.title}</span>
+                                                    {item.subtitle && <span className="ml-auto text-xs text-muted-foreground/70">{item.subtitle}</span>}
+                                                </Command.Item>
+                                            ))}
+                                        </Command.Group>
+                                    );
+                                })}
 
                             </Command.List>
 
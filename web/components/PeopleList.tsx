@@ -3,7 +3,7 @@
 import { Person } from '@/lib/types';
 import { SpotlightCard } from '@/components/ui/SpotlightCard';
 import { TiltCard } from '@/components/ui/TiltCard';
-import Image from 'next/image';
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage';
 import { motion } from 'framer-motion';
 
 interface PeopleListProps {
@@ -45,7 +45,7 @@ export const PeopleList = ({ people }: PeopleListProps) => {
                                         <SpotlightCard className="p-0 bg-card h-full flex flex-col border border-border">
                                             <div className="aspect-[4/3] overflow-hidden bg-muted relative group">
                                                 {person.photo ? (
-                                                    <Image src={person.photo} alt={person.name} fill sizes="(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw" className="object-cover transition-transform duration-700 group-hover:scale-105" />
+                                                    <ResponsiveImage src={person.photo} info={person.image_info?.[person.photo]} alt={person.name} fill sizes="(max-width: 768px) 100vw, (max-width: 1200px) 50vw, 33vw" className="object-cover transition-transform duration-700 group-hover:scale-105" />
                                                 ) : (
                                                     <div className="w-full h-full flex items-center justify-center text-6xl">👤</div>
                                                 )}
@@ -3,7 +3,7 @@
 import { Project } from '@/lib/types';
 import { SpotlightCard } from '@/components/ui/SpotlightCard';
 import { TiltCard } from '@/components/ui/TiltCard';
-import Image from 'next/image';
+import { ResponsiveImage } from '@/components/ui/ResponsiveImage';
 import { motion } from 'framer-motion';
 
 interface ProjectsListProps {
@@ -39,7 +39,7 @@ export const ProjectsList = ({ projects }: ProjectsListProps) => {
                         <SpotlightCard className="flex flex-col h-full bg-card border border-border">
                             <div className="h-64 bg-muted relative overflow-hidden group">
                                 {project.images && project.images.length > 0 ? (
-                                    <Image src={project.images[0]} alt={project.title} fill sizes="(max-width: 768px) 100vw, 50vw" className="object-cover transition-transform duration-700 group-hover:scale-110" />
+                                    <ResponsiveImage src={project.images[0]} info={project.image_info?.[project.images[0]]} alt={project.title} fill sizes="(max-width: 768px) 100vw, 50vw" className="object-cover transition-transform duration-700 group-hover:scale-110" />
                                 ) : (
                                     <div className="w-full h-full flex items-center justify-center text-4xl bg-gradient-to-br from-muted to-card">🧪</div>
                                 )}
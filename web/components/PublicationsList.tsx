@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useMemo } from 'react';
+import { useState, useMemo, useEffect } from 'react';
 import { Publication } from '@/lib/types';
 import { SpotlightCard } from '@/components/ui/SpotlightCard';
 import { motion, AnimatePresence } from 'framer-motion';
@@ -13,7 +13,18 @@ export function PublicationsList({ publications }: PublicationsListProps) {
     const [searchQuery, setSearchQuery] = useState('');
     const [selectedYear, setSelectedYear] = useState<string>('All');
     const [citationModalOpen, setCitationModalOpen] = useState<string | null>(null); // DOI or Title as key
+    const [loadedBibtex, setLoadedBibtex] = useState<Record<string, string>>({});
 
+    // List shards leave BibTeX out; fetch the publication's detail shard when its citation is opened
+    useEffect(() => {
+        const pub = publications.find(p => p.title === citationModalOpen);
+        if (!pub || pub.bibtex || !pub.has_bibtex || !pub.slug || loadedBibtex[pub.slug] !== undefined) return;
+        const slug = pub.slug;
+        fetch(`${process.env.NEXT_PUBLIC_BASE_PATH || ''}/content/publications/items/${slug}.json`)
+            .then(r => (r.ok ? r.json() : null))
+            .then((detail: Publication | null) => setLoadedBibtex(prev => ({ ...prev, [slug]: detail?.bibtex || '' })))
+            .catch(() => setLoadedBibtex(prev => ({ ...prev, [slug]: '' })));
+    }, [citationModalOpen, publications, loadedBibtex]);
 
 
     // Filter logic
@@ -38,6 +49,7 @@ export function PublicationsList({ publications }: PublicationsListProps) {
     // Helper to generate a fallback BibTeX if one isn't provided
     const getBibTeX = (pub: Publication) => {
         if (pub.bibtex) return pub.bibtex;
+        if (pub.slug && loadedBibtex[pub.slug]) return loadedBibtex[pub.slug];
         // Simple fallback generation
         const id = pub.authors.split(' ')[0].replace(/,/g, '') + pub.year + pub.title.split(' ')[0];
         return `@article{${id},
@@ -77,9 +89,9 @@ export function PublicationsList({ publications }: PublicationsListProps) {
                 animate="show"
             >
                 <AnimatePresence mode='popLayout'>
-                    {filteredPubs.map((pub, i) => (
+                    {filteredPubs.map((pub) => (
                         <motion.div
-                            key={pub.title + i}
+                            key={pub.id}
                             layout
                             variants={item}
                             exit={{ opacity: 0, scale: 0.95 }}
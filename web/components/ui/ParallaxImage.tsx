@@ -2,10 +2,10 @@
 
 import { useRef } from 'react';
 import { motion, useScroll, useTransform } from 'framer-motion';
-import Image, { ImageProps } from 'next/image';
+import { ResponsiveImage, ResponsiveImageProps } from '@/components/ui/ResponsiveImage';
 import { cn } from '@/lib/utils';
 
-interface ParallaxImageProps extends ImageProps {
+interface ParallaxImageProps extends ResponsiveImageProps {
     offset?: number;
 }
 
@@ -21,7 +21,7 @@ export function ParallaxImage({ className, offset = 50, alt, ...props }: Paralla
     return (
         <div ref={ref} className={cn("overflow-hidden h-full w-full relative", className)}>
             <motion.div style={{ y }} className="w-full h-[120%] relative -top-[10%]">
-                <Image
+                <ResponsiveImage
                     alt={alt}
                     {...props}
                     className="object-cover"
@@ -0,0 +1,26 @@
+import Image, { ImageProps } from 'next/image';
+import { ImageInfo } from '@/lib/types';
+
+const BASE = process.env.NEXT_PUBLIC_BASE_PATH || '';
+
+export interface ResponsiveImageProps extends Omit<ImageProps, 'src'> {
+    src: string;
+    info?: ImageInfo;  // from the record's image_info; without it the original is shown as before
+}
+
+// Images are exported unoptimized, so next/image cannot resize them. Ingested uploads
+// come with WebP copies at a few widths instead: the browser picks one from the srcset
+// and `sizes`, and the original stays the fallback for browsers without WebP.
+export function ResponsiveImage({ src, info, sizes, ...props }: ResponsiveImageProps) {
+    if (!info) return <Image src={src} sizes={sizes} {...props} />;
+    const srcSet = [...info.variants, { width: info.width, src: info.webp }]
+        .map(v => `${BASE}${v.src} ${v.width}w`)
+        .join(', ');
+    const dimensions = props.fill ? {} : { width: info.width, height: info.height };
+    return (
+        <picture>
+            <source type="image/webp" srcSet={srcSet} sizes={sizes} />
+            <Image src={src} sizes={sizes} placeholder="blur" blurDataURL={info.placeholder} {...dimensions} {...props} />
+        </picture>
+    );
+}
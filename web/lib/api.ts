@@ -1,8 +1,15 @@
 import fs from 'fs';
 import path from 'path';
-import { ProfessorProfile, LabInfo, Person, Publication, Project, NewsItem } from './types';
+import { ProfessorProfile, LabInfo, Person, Publication, Project, NewsItem, PublicationYear } from './types';
 
 const DATA_DIR = path.join(process.cwd(), '..', 'data');
+// Pre-filtered, pre-sorted shards written by `python admin/site_export.py`
+const CONTENT_DIR = path.join(process.cwd(), 'public', 'content');
+// Sharded search index written by `python admin/search_index.py`
+const SEARCH_DIR = path.join(process.cwd(), 'public', 'search');
+// BM25 passage index written by `python admin/chat_index.py`
+const CHAT_DIR = path.join(process.cwd(), 'public', 'chat');
+const SOURCE_FILES = ['profile.json', 'lab_info.json', 'people.json', 'publications.json', 'projects.json', 'news.json'];
 
 function readJson<T>(filename: string, defaultValue: T): T {
     try {
@@ -15,42 +22,114 @@ function readJson<T>(filename: string, defaultValue: T): T {
     }
 }
 
+// Shards are used only when the export ran after the last change to data/*.json;
+// otherwise (e.g. `npm run dev` right after editing) the raw files are read instead.
+function shardsFresh(): boolean {
+    try {
+        const exported = fs.statSync(path.join(CONTENT_DIR, 'manifest.json')).mtimeMs;
+        return SOURCE_FILES.every(name => {
+            const source = path.join(DATA_DIR, name);
+            return !fs.existsSync(source) || fs.statSync(source).mtimeMs <= exported;
+        });
+    } catch {
+        return false;
+    }
+}
+
+function readShard<T>(relPath: string, fallback: () => T): T {
+    if (!shardsFresh()) return fallback();
+    try {
+        return JSON.parse(fs.readFileSync(path.join(CONTENT_DIR, relPath), 'utf8'));
+    } catch {
+        return fallback();
+    }
+}
+
+function visibleOnly<T>(items: T[]): T[] {
+    return items.filter(x => (x as { visible?: boolean }).visible !== false);
+}
+
+function sortedNews(): NewsItem[] {
+    return visibleOnly(readJson<NewsItem[]>('news.json', []))
+        .sort((a, b) => b.publish_date.localeCompare(a.publish_date));
+}
+
+function sortedPublications(): Publication[] {
+    return visibleOnly(readJson<Publication[]>('publications.json', [])).sort((a, b) => b.year - a.year);
+}
+
 export async function getProfile(): Promise<ProfessorProfile> {
-    return readJson<ProfessorProfile>('profile.json', {
+    return readShard('profile.json', () => readJson<ProfessorProfile>('profile.json', {
         name: "Professor Name",
         title: "Title",
         affiliation: "Affiliation",
         bio_short: "Bio...",
         bio_long: "",
         email: "email@example.com"
-    });
+    }));
 }
 
 export async function getLabInfo(): Promise<LabInfo> {
-    return readJson<LabInfo>('lab_info.json', {
+    return readShard('lab_info.json', () => readJson<LabInfo>('lab_info.json', {
         lab_name: "My Lab",
         mission_statement: "",
         research_focus_areas: [],
         join_lab_text: ""
-    });
+    }));
 }
 
 export async function getPeople(): Promise<Person[]> {
-    const all = readJson<Person[]>('people.json', []);
-    return all.filter((x: Person & { visible?: boolean }) => x.visible !== false);
+    return readShard('people.json', () => visibleOnly(readJson<Person[]>('people.json', [])));
+}
+
+// Years with publications, newest first
+export async function getPublicationYears(): Promise<PublicationYear[]> {
+    return readShard('publications/index.json', () => {
+        const counts = new Map<number, number>();
+        for (const pub of sortedPublications()) counts.set(pub.year, (counts.get(pub.year) || 0) + 1);
+        return [...counts].map(([year, count]) => ({ year, count }));
+    });
+}
+
+// List fields only (no abstract/BibTeX); full records are in content/publications/items/<slug>.json
+export async function getPublicationsByYear(year: number): Promise<Publication[]> {
+    return readShard(`publications/${year}.json`, () => sortedPublications().filter(p => p.year === year));
 }
 
 export async function getPublications(): Promise<Publication[]> {
-    const all = readJson<Publication[]>('publications.json', []);
-    return all.filter((x: Publication & { visible?: boolean }) => x.visible !== false);
+    if (!shardsFresh()) return sortedPublications();
+    const years = await getPublicationYears();
+    const shards = await Promise.all(years.map(({ year }) => getPublicationsByYear(year)));
+    return shards.flat();
 }
 
 export async function getProjects(): Promise<Project[]> {
-    const all = readJson<Project[]>('projects.json', []);
-    return all.filter((x: Project & { visible?: boolean }) => x.visible !== false);
+    return readShard('projects.json', () => visibleOnly(readJson<Project[]>('projects.json', [])));
 }
 
+// Newest first
 export async function getNews(): Promise<NewsItem[]> {
-    const all = readJson<NewsItem[]>('news.json', []);
-    return all.filter((x: NewsItem & { visible?: boolean }) => x.visible !== false);
+    return readShard('news.json', sortedNews);
+}
+
+export async function getFeaturedNews(): Promise<NewsItem[]> {
+    return readShard('news_featured.json', () => sortedNews().filter(n => n.featured).slice(0, 4));
+}
+
+function readIndexPointer(dir: string): string | null {
+    try {
+        return JSON.parse(fs.readFileSync(path.join(dir, 'manifest.json'), 'utf8')).index || null;
+    } catch {
+        return null;
+    }
+}
+
+// Content-hashed name of the current search index file; null when the index has not been built
+export async function getSearchIndexFile(): Promise<string | null> {
+    return readIndexPointer(SEARCH_DIR);
+}
+
+// Content-hashed name of the chat retrieval index; null when it has not been built
+export async function getChatIndexFile(): Promise<string | null> {
+    return readIndexPointer(CHAT_DIR);
 }
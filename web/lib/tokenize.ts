@@ -0,0 +1,22 @@
+// Client-side counterpart of tokenize() in admin/search_index.py, which builds the
+// search and chat indexes. Queries only match if both split text the same way, so
+// change them together.
+
+export const STOPWORDS = new Set(["a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "the", "to", "with", "we", "our", "via", "using"]);
+
+// Python's \w: letters, digits and other numerics, and underscore
+const TOKEN = /[\p{L}\p{N}_]+/gu;
+
+// Lengths and prefixes count code points like Python str, not UTF-16 units
+export function termLength(term: string): number {
+    return Array.from(term).length;
+}
+
+export function termPrefix(term: string, length: number): string {
+    return Array.from(term).slice(0, length).join("");
+}
+
+export function tokenize(text: string): string[] {
+    return (text.toLowerCase().match(TOKEN) || []).filter(t => termLength(t) > 1 && !STOPWORDS.has(t));
+}
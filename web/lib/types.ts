@@ -1,3 +1,15 @@
+// Responsive versions of an uploaded image, attached by admin/site_export.py
+export interface ImageInfo {
+    width: number;
+    height: number;
+    webp: string;                                   // full-size WebP copy
+    variants: { width: number; src: string }[];     // smaller WebP copies, narrowest first
+    placeholder: string;                            // tiny blurred data URL
+}
+
+// Upload path -> its responsive versions, for the images that were ingested
+export type ImageInfoMap = Record<string, ImageInfo>;
+
 export interface ProfessorProfile {
     name: string;
     title: string;
@@ -12,6 +24,7 @@ export interface ProfessorProfile {
     linkedin_url?: string | null;
     phone?: string | null;
     office_location?: string | null;
+    image_info?: ImageInfoMap;
 }
 
 export interface LabInfo {
@@ -20,9 +33,11 @@ export interface LabInfo {
     research_focus_areas: string[];
     lab_photo?: string | null;
     join_lab_text: string;
+    image_info?: ImageInfoMap;
 }
 
 export interface Person {
+    id: string;
     name: string;
     role: string;
     bio: string;
@@ -31,22 +46,32 @@ export interface Person {
     end_year?: number | null;
     personal_website?: string | null;
     email?: string | null;
+    image_info?: ImageInfoMap;
 }
 
 export interface Publication {
+    id: string;
     title: string;
     authors: string;
     year: number;
     venue: string;
-    abstract: string;
+    abstract?: string;          // Only in the per-publication detail shard
     doi?: string | null;
     pdf_link?: string | null;
     code_link?: string | null;
-    bibtex?: string | null;
+    bibtex?: string | null;     // Only in the per-publication detail shard
     tags: string[];
+    slug?: string;
+    has_bibtex?: boolean;
+}
+
+export interface PublicationYear {
+    year: number;
+    count: number;
 }
 
 export interface Project {
+    id: string;
     title: string;
     description: string;
     status: "Ongoing" | "Completed";
@@ -54,11 +79,21 @@ export interface Project {
     images: string[];
     collaborators: string[];
     funding_source?: string | null;
+    image_info?: ImageInfoMap;
 }
 
 export interface NewsItem {
+    id: string;
     title: string;
     content: string;
     publish_date: string;
     featured: boolean;
 }
+
+export interface SearchManifest {
+    prefix_len: number;
+    id_stride: number;
+    doc_chunk: number;
+    terms: Record<string, string>;  // term prefix -> shard file
+    docs: Record<string, string>;   // "<collection>-<chunk>" -> doc file
+}
@@ -1,9 +1,15 @@
 import type { NextConfig } from "next";
 
+const basePath = '/sk_lab_website';
+
 const nextConfig: NextConfig = {
   /* config options here */
   output: 'export',
-  basePath: '/sk_lab_website',
+  basePath,
+  // Client code fetches files from public/ (e.g. content shards) and needs the prefix
+  env: {
+    NEXT_PUBLIC_BASE_PATH: basePath,
+  },
   reactCompiler: true,
   images: {
     unoptimized: true,